@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from node import Server
+from distributor import (RoundRobin, WeightedRoundRobin, WeightedRoundRobinStatic, LeastConnection,
+                         LeastConnectionHeap, WeightedLeastConnection, PowerOfDChoices, ConsistentHash)
+from server_pool import ServerPool
+
+# (имя в отчёте, класс, параметры конструктора)
+VARIANTS = [("RoundRobin", RoundRobin, {}),
+            ("WeightedRoundRobin", WeightedRoundRobin, {}),
+            ("WeightedRoundRobin[tree]", WeightedRoundRobin, {'use_tree': True}),
+            ("WeightedRoundRobinStatic", WeightedRoundRobinStatic, {}),
+            ("LeastConnection", LeastConnection, {}),
+            ("LeastConnectionHeap", LeastConnectionHeap, {}),
+            ("WeightedLeastConnection", WeightedLeastConnection, {}),
+            ("WeightedLeastConnection[tree]", WeightedLeastConnection, {'use_tree': True}),
+            ("PowerOfDChoices", PowerOfDChoices, {'seed': 0}),
+            ("PowerOfDChoices[headroom,weighted]", PowerOfDChoices,
+             {'criterion': 'headroom', 'weighted': True, 'seed': 0}),
+            ("ConsistentHash", ConsistentHash, {}),
+            ("ConsistentHash[bounded]", ConsistentHash, {'bounded': True, 'load_factor': 1.25})]
+
+# наборы мощностей, повторяются до нужного числа серверов (heterogeneous - как в configuration_2)
+MIXES = {'homogeneous': [1.22],
+         'heterogeneous': [1] * 4 + [1.22] * 7 + [2.2]}
+
+# начальная нагрузка нод (секунды работы из одной): light - задачи почти всегда помещаются,
+# saturated - почти все ноды заполнены, большинство задач отклоняется после полного перебора
+LOADS = {'light': (0.0, 0.5),
+         'saturated': (0.96, 1.0)}
+
+SIZES = [12, 1_000, 10_000, 100_000]
+INPUTS = ['servers', 'pool']    # список node.Server или ServerPool
+MODES = ['task', 'batch']       # distribute_task по одной задаче или distribute_batch
+
+task_time = 0.02
+task_size = 500
+bandwidth_bytes = 80_000
+
+
+def build_nodes(size: int, mix: str, kind: str):
+    powers = (MIXES[mix] * (size // len(MIXES[mix]) + 1))[:size]
+    if kind == 'pool':
+        return ServerPool(bu_power=powers, bandwidth_bytes=bandwidth_bytes)
+    return [Server(server_id=i + 1, bu_power=power, bandwidth_bytes=bandwidth_bytes)
+            for i, power in enumerate(powers)]
+
+
+def preload(nodes, loads: np.ndarray):
+    """Открывает новую секунду и задаёт нодам начальную нагрузку (вне замера)."""
+    if isinstance(nodes, ServerPool):
+        nodes.reset_for_new_second()
+        nodes.current_load[:] = loads
+        return
+    # без reset_for_new_second, чтобы не считать статистику секунд у сотен тысяч нод
+    for node, load in zip(nodes, loads.tolist()):
+        node.cpu_load_history.append(load * 100)
+        node.network_load_history.append(0.0)
+        node.tasks_history.append(0)
+        node.current_load = load
+        node.current_network_load_bytes = 0.0
+
+
+def run_case(nodes, distributor_class, options: dict, mode: str, loads: np.ndarray,
+             budget: float, max_decisions: int) -> dict:
+    """
+    Замеряет один распределитель: порции решений растут вдвое, пока не исчерпан бюджет времени.
+    Перед каждой порцией нагрузка нод восстанавливается, так что все решения принимаются
+    в одном и том же режиме (light или saturated). Первое решение каждой секунды (перестройка
+    дерева или кучи за O(n)) принимается вне замера порции и учитывается отдельно в first_decision_ns.
+    """
+    preload(nodes, loads)
+    distributor = distributor_class(nodes, **options)
+    times = np.full(4096, task_time)
+    sizes = np.full(4096, float(task_size))
+
+    def decide(count: int):
+        if mode == 'batch':
+            distributor.distribute_batch(times[:count], sizes[:count])
+        else:
+            distribute_task = distributor.distribute_task
+            for _ in range(count):
+                distribute_task(task_time, task_size)
+
+    decisions = 0
+    elapsed = 0.0
+    rejected_tasks = 0
+    warmups = 0
+    warmup_elapsed = 0.0
+    chunk = 1
+    while decisions < max_decisions:
+        chunk = min(chunk, max_decisions - decisions)
+        preload(nodes, loads)
+        # прогревочное решение открывает секунду у распределителя: перестройка индексов не попадает в замер
+        begin = time.perf_counter()
+        decide(1)
+        warmup_elapsed += time.perf_counter() - begin
+        warmups += 1
+
+        rejected_before = distributor.rejected_tasks
+        begin = time.perf_counter()
+        decide(chunk)
+        elapsed += time.perf_counter() - begin
+        rejected_tasks += distributor.rejected_tasks - rejected_before     # отказы только замеренных порций
+        decisions += chunk
+        if elapsed > budget:    # бюджет - на замеренное время, без восстановления нагрузки и прогрева
+            break
+        chunk = min(chunk * 2, len(times))
+
+    # равномерность: разброс нагрузки, добавленной нодам последней порцией (все порции стартуют с loads)
+    if isinstance(nodes, ServerPool):
+        current_load = nodes.current_load.copy()
+    else:
+        current_load = np.array([node.current_load for node in nodes])
+    load_std = float(np.std(current_load - loads))
+
+    # память - отдельным прогоном: создание распределителя и одна порция решений
+    preload(nodes, loads)
+    tracemalloc.start()
+    memory_distributor = distributor_class(nodes, **options)
+    memory_chunk = min(decisions, 256)
+    if mode == 'batch':
+        memory_distributor.distribute_batch(times[:memory_chunk], sizes[:memory_chunk])
+    else:
+        for _ in range(memory_chunk):
+            memory_distributor.distribute_task(task_time, task_size)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'decisions': decisions,
+            'seconds': elapsed,
+            'decisions_per_second': decisions / elapsed if elapsed > 0 else float('inf'),
+            'ns_per_decision': elapsed / decisions * 1e9,
+            'first_decision_ns': warmup_elapsed / warmups * 1e9,
+            'peak_memory_bytes': peak_memory,
+            'load_std': load_std,
+            'rejected_tasks': rejected_tasks}
+
+
+def environment() -> dict:
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ''
+    return {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'revision': revision,
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count()}
+
+
+def case_key(result: dict) -> tuple:
+    return tuple(result[name] for name in ('distributor', 'nodes', 'mix', 'load', 'input', 'mode'))
+
+
+def compare(results: list, previous_file: str):
+    """Печатает отношение скорости к предыдущему отчёту (меньше 1 - замедление)."""
+    with open(previous_file) as file:
+        previous = {case_key(result): result for result in json.load(file)['results']}
+    print(f"\nСравнение с {previous_file} (решений/сек, новое / старое):")
+    for result in results:
+        old = previous.get(case_key(result))
+        if old is None:
+            continue
+        ratio = result['decisions_per_second'] / old['decisions_per_second']
+        mark = "  <-- медленнее" if ratio < 0.8 else ""
+        print(f"{' '.join(map(str, case_key(result))):<80}{ratio:8.2f}{mark}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Скорость принятия решений распределителями")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--distributors', nargs='+', default=[name for name, _, _ in VARIANTS])
+    parser.add_argument('--mixes', nargs='+', default=list(MIXES))
+    parser.add_argument('--loads', nargs='+', default=list(LOADS))
+    parser.add_argument('--inputs', nargs='+', default=INPUTS)
+    parser.add_argument('--modes', nargs='+', default=MODES)
+    parser.add_argument('--budget', type=float, default=0.2, help="секунд на один случай")
+    parser.add_argument('--max-decisions', type=int, default=100_000)
+    parser.add_argument('--output', default=None, help="JSON-файл результатов")
+    parser.add_argument('--compare', default=None, help="предыдущий JSON-файл для сравнения")
+    args = parser.parse_args(argv)
+
+    variants = [variant for variant in VARIANTS if variant[0] in args.distributors]
+    rng = np.random.default_rng(0)
+    results = []
+    for size in args.sizes:
+        for mix in args.mixes:
+            for kind in args.inputs:
+                nodes = build_nodes(size, mix, kind)
+                for load in args.loads:
+                    loads = rng.uniform(*LOADS[load], size)
+                    for name, distributor_class, options in variants:
+                        for mode in args.modes:
+                            result = {'distributor': name, 'nodes': size, 'mix': mix, 'load': load,
+                                      'input': kind, 'mode': mode}
+                            result.update(run_case(nodes, distributor_class, options, mode, loads,
+                                                   args.budget, args.max_decisions))
+                            results.append(result)
+                            print(f"{name:<36}{size:>8} {mix:<14}{load:<10}{kind:<8}{mode:<6}"
+                                  f"{result['decisions_per_second']:>14.0f} реш/с"
+                                  f"{result['ns_per_decision']:>14.0f} нс"
+                                  f"{result['first_decision_ns']:>14.0f} нс (1-е)"
+                                  f"{result['peak_memory_bytes'] / 1024:>12.0f} КБ")
+
+    output = args.output
+    if output is None:
+        os.makedirs("results/benchmarks", exist_ok=True)
+        output = f"results/benchmarks/distributors_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as file:
+        json.dump({'environment': environment(),
+                   'parameters': {'task_time': task_time, 'task_size': task_size,
+                                  'bandwidth_bytes': bandwidth_bytes, 'loads': LOADS,
+                                  'budget': args.budget, 'max_decisions': args.max_decisions},
+                   'results': results}, file, indent=1)
+    print(f"Результаты сохранены в '{output}'.")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
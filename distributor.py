@@ -1,13 +1,201 @@
-import itertools
+import hashlib
+import heapq
+import random
+
+import numpy as np
+
+from server_pool import ServerPool
+from structures import HashRing, IndexedMinHeap, MaxCapacityTree
+
+
+def distribute_each(distributor, task_times, task_sizes) -> np.ndarray:
+    """
+    Распределяет пачку задач по одной через distribute_task.
+
+    :param distributor: Любой распределитель из этого модуля.
+    :param task_times: Массив вычислительной сложности задач.
+    :param task_sizes: Массив объемов данных задач (байты).
+    :return: Массив индексов нод (-1 для отклоненных задач).
+    """
+    task_times = np.asarray(task_times, dtype=np.float64).tolist()
+    task_sizes = np.asarray(task_sizes, dtype=np.float64).tolist()
+    assignment = np.full(len(task_times), -1, dtype=np.int64)
+    for i, (task_time, task_size) in enumerate(zip(task_times, task_sizes)):
+        assignment[i] = distributor.distribute_task(task_time, task_size)
+    return assignment
+
+
+def uniform_task(task_times: np.ndarray, task_sizes: np.ndarray):
+    """(сложность, объем данных), если все задачи пачки одинаковы, иначе None."""
+    if len(task_times) == 0 or not ((task_times == task_times[0]).all() and (task_sizes == task_sizes[0]).all()):
+        return None
+    return float(task_times[0]), float(task_sizes[0])
+
+
+def distribute_uniform_round_robin(distributor, count: int, task_compute_time: float, task_data_size: float) -> np.ndarray:
+    """
+    Round Robin для пачки из count одинаковых задач на пуле - без перебора задач.
+
+    Обход по кругу от current_node_index отдаёт задачу каждой ноде, у которой остались места,
+    поэтому за k полных кругов нода со slots местами получает min(slots, k) задач.
+    Число полных кругов находится бинарным поиском, остаток пачки достаётся первым по кругу
+    нодам с запасом мест, а указатель встаёт за ноду, получившую последнюю задачу.
+    Задачи сверх вместимости всех нод отклоняются и указатель не сдвигают - как в distribute_task.
+
+    :param distributor: RoundRobin (или WeightedRoundRobinStatic с одной группой серверов) на ServerPool.
+    :return: Массив индексов нод (-1 для отклоненных задач).
+    """
+    pool = distributor.pool
+    n = len(pool)
+    cyclic = (distributor.current_node_index + np.arange(n)) % n
+
+    # без точного учёта места считаются поштучно - не дальше, чем нужно для count задач
+    limit = count if pool.exact else -(-count // n)
+    while True:
+        slots = pool.slots(task_compute_time, task_data_size, limit=limit)
+        if pool.exact or slots.sum() >= count or (slots < limit).all():
+            break
+        limit *= 2
+    slots = slots[cyclic]
+
+    if count >= slots.sum():
+        counts = slots
+    else:
+        low, high = 0, int(slots.max())     # число полных кругов
+        while low < high:
+            middle = (low + high + 1) // 2
+            if np.minimum(slots, middle).sum() <= count:
+                low = middle
+            else:
+                high = middle - 1
+        counts = np.minimum(slots, low)
+        counts[np.flatnonzero(slots > low)[:count - counts.sum()]] += 1
+
+    accepted = int(counts.sum())
+    positions = np.repeat(np.arange(n), counts)
+    rounds = np.arange(accepted) - np.repeat(np.cumsum(counts) - counts, counts)
+    assignment = np.full(count, -1, dtype=np.int64)
+    assignment[:accepted] = cyclic[positions[np.lexsort((positions, rounds))]]
+
+    node_counts = np.zeros(n, dtype=np.int64)
+    node_counts[cyclic] = counts
+    pool.add_uniform_tasks(node_counts, task_compute_time, task_data_size)
+    if accepted:
+        distributor.current_node_index = int(assignment[accepted - 1] + 1) % n
+    distributor.rejected_tasks += count - accepted
+    return assignment
+
+
+def current_second(nodes) -> int:
+    """Номер текущей секунды симуляции: по счетчику пула или по длине истории нод."""
+    if isinstance(nodes, ServerPool):
+        return nodes.seconds
+    return len(nodes[0].tasks_history) if len(nodes) else 0
+
+
+def build_capacity_tree(nodes, weights) -> MaxCapacityTree:
+    """
+    Строит дерево отрезков по весам нод и их свободным ресурсам.
+    Свободные ресурсы берутся с небольшим запасом на ошибки округления:
+    дерево только отсекает заведомо неподходящие ноды, точная проверка остаётся за can_accept_task.
+    У отказавших нод свободного ресурса нет (-inf), и их поддеревья отсекаются целиком;
+    нода с местом в очереди (node.Server.queue_capacity) примет любую задачу (+inf).
+    """
+    if isinstance(nodes, ServerPool):
+        current_load, bu_power = nodes.current_load, nodes.bu_power
+        network, bandwidth = nodes.current_network_load_bytes, nodes.bandwidth_bytes
+        available = nodes.available
+    else:
+        current_load = np.array([node.current_load for node in nodes], dtype=np.float64)
+        bu_power = np.array([node.bu_power for node in nodes], dtype=np.float64)
+        network = np.array([node.current_network_load_bytes for node in nodes], dtype=np.float64)
+        bandwidth = np.array([node.bandwidth_bytes for node in nodes], dtype=np.float64)
+        available = np.array([node.available for node in nodes], dtype=bool)
+        queue_room = np.array([node.has_queue_room() for node in nodes], dtype=bool)
+        current_load = np.where(queue_room, float('-inf'), current_load)
+        network = np.where(queue_room, float('-inf'), network)
+    return MaxCapacityTree(weights,
+                           np.where(available, (1 - current_load) * bu_power * (1 + 1e-9) + 1e-12, float('-inf')),
+                           (bandwidth - network) * (1 + 1e-9) + 1e-9)
+
+
+def update_capacity_tree(tree: MaxCapacityTree, index: int, node, weight: float):
+    """Обновляет в дереве одну ноду после того, как она получила задачу."""
+    if not node.available:
+        tree.update(index, weight, float('-inf'), float('-inf'))
+    elif node.has_queue_room():
+        tree.update(index, weight, float('inf'), float('inf'))
+    else:
+        tree.update(index, weight, (1 - node.current_load) * node.bu_power * (1 + 1e-9) + 1e-12,
+                    (node.bandwidth_bytes - node.current_network_load_bytes) * (1 + 1e-9) + 1e-9)
+
+
+def swap_remove(values: list, index: int):
+    """Удаляет элемент списка за O(1): на его место встаёт последний элемент. :return: Удалённый элемент."""
+    value = values[index]
+    values[index] = values[-1]
+    values.pop()
+    return value
+
+
+def append_node(nodes, server) -> int:
+    """
+    Добавляет сервер в конец списка нод (add_server распределителей).
+    Если симуляция уже идёт, у нового сервера открывается текущая секунда, чтобы он сразу мог
+    принимать задачи, а пропущенные секунды записываются в его историю нулями: длина истории
+    у всех нод одна и та же, и по ней считается номер секунды (current_second).
+    В пустом списке (все серверы удалены) отсчёта секунд нет - новый сервер открывает свою следующую секунду.
+
+    :param nodes: Список нод; ServerPool имеет фиксированный размер и не поддерживается.
+    :return: Индекс нового сервера.
+    """
+    if isinstance(nodes, ServerPool):
+        raise TypeError("Состав ServerPool фиксирован: история и статистика хранятся массивами на n нод")
+    if not len(nodes):
+        server.reset_for_new_second()
+        nodes.append(server)
+        return 0
+    missing = current_second(nodes) - len(server.tasks_history)
+    if missing > 0:
+        server.reset_for_new_second()
+        server.cpu_load_history.extend([0.0] * (missing - 1))
+        server.network_load_history.extend([0.0] * (missing - 1))
+        server.tasks_history.extend([0] * (missing - 1))
+    nodes.append(server)
+    return len(nodes) - 1
+
+
+def remove_node(nodes, index: int):
+    """
+    Удаляет сервер из списка нод за O(1) (remove_server распределителей):
+    на место удалённого встаёт последний сервер списка, остальные индексы не меняются.
+
+    :return: Удалённый сервер.
+    """
+    if isinstance(nodes, ServerPool):
+        raise TypeError("Состав ServerPool фиксирован: история и статистика хранятся массивами на n нод")
+    return swap_remove(nodes, index)
+
+
+def pointer_after_remove(pointer: int, index: int, last: int) -> int:
+    """Указатель обхода по кругу после remove_node(index), когда нода last переехала на место index."""
+    if pointer == last:
+        pointer = index
+    return pointer if pointer < last else 0
+
 
 class RoundRobin:
+    # задача перебирает ноды, пока одна её не примет: отказ одной ноды не отклоняет задачу, dropped_tasks нод не растёт
+    records_node_refusals = False
+
     def __init__(self, nodes: list):
         """
         Класс для распределения задач между нодами по алгоритму Round Robin.
 
-        :param nodes: Список нод.
+        :param nodes: Список нод или ServerPool.
         """
         self.nodes = nodes
+        self.pool = nodes if isinstance(nodes, ServerPool) else None
         self.current_node_index = 0
         self.rejected_tasks = 0  # Счетчик отклоненных задач
 
@@ -17,36 +205,123 @@ class RoundRobin:
 
         :param task_compute_demand: Требуемая мощность задачи (FLOPS).
         :param task_data_size: Объем данных задачи (байты).
+        :return: Индекс ноды, получившей задачу, или -1, если задача отклонена.
         """
+        if self.pool is not None:
+            return self._distribute_task_pool(task_compute_time, task_data_size)
+
         n = len(self.nodes)
+        if n == 0:
+            self.rejected_tasks += 1
+            return -1
         start_index = self.current_node_index
 
         while True:
-            node = self.nodes[self.current_node_index]
+            node_index = self.current_node_index
+            node = self.nodes[node_index]
             if node.can_accept_task(task_compute_time, task_data_size):
                 node.add_task(task_compute_time, task_data_size)
                 self.current_node_index = (self.current_node_index + 1) % n
-                break
+                return node_index
 
             self.current_node_index = (self.current_node_index + 1) % n
             if self.current_node_index == start_index:
 
                 self.rejected_tasks += 1
-                break
+                return -1
         #print(self.current_node_index)
 
+    def _distribute_task_pool(self, task_compute_time: float, task_data_size: float) -> int:
+        """Тот же обход Round Robin, но поиск свободной ноды идёт по массивам пула."""
+        node_index = self.pool.first_fit(self.current_node_index, task_compute_time, task_data_size)
+        if node_index == -1:
+            self.rejected_tasks += 1
+            return -1
+        self.pool.add_task(node_index, task_compute_time, task_data_size)
+        self.current_node_index = (node_index + 1) % len(self.pool)
+        return node_index
+
+    def distribute_batch(self, task_times, task_sizes) -> np.ndarray:
+        """
+        Распределяет пачку задач (например, все задачи одной секунды) с тем же результатом,
+        что и последовательные вызовы distribute_task.
+        На пуле задачи раздаются по кругу целыми блоками, пока ни одна нода не отказывает,
+        и только отказ обрабатывается поштучно; пачка одинаковых задач раскладывается
+        в замкнутом виде (distribute_uniform_round_robin).
+
+        :param task_times: Массив вычислительной сложности задач.
+        :param task_sizes: Массив объемов данных задач (байты).
+        :return: Массив индексов нод (-1 для отклоненных задач).
+        """
+        if self.pool is None:
+            return distribute_each(self, task_times, task_sizes)
+
+        task_times = np.asarray(task_times, dtype=np.float64)
+        task_sizes = np.asarray(task_sizes, dtype=np.float64)
+        task = uniform_task(task_times, task_sizes)
+        if task is not None:
+            return distribute_uniform_round_robin(self, len(task_times), *task)
+
+        assignment = np.full(len(task_times), -1, dtype=np.int64)
+        n = len(self.pool)
+        pos = 0
+        chunk = n
+        while pos < len(task_times):
+            stop = min(pos + chunk, len(task_times))
+            indices = (self.current_node_index + np.arange(stop - pos)) % n
+            accepted = self.pool.fit_prefix(indices, task_times[pos:stop], task_sizes[pos:stop])
+            assignment[pos:pos + accepted] = indices[:accepted]
+            self.current_node_index = (self.current_node_index + accepted) % n
+            pos += accepted
+            if pos < stop:
+                # задачу не приняла очередная нода - дальше обычный обход с поиском свободной
+                assignment[pos] = self.distribute_task(task_times[pos], task_sizes[pos])
+                pos += 1
+                chunk = max(n, 2 * accepted)
+            else:
+                chunk *= 2
+        return assignment
+
+    def add_server(self, server) -> int:
+        """
+        Добавляет сервер в конец круга за O(1).
+
+        :return: Индекс нового сервера.
+        """
+        return append_node(self.nodes, server)
+
+    def remove_server(self, index: int):
+        """
+        Удаляет сервер за O(1): на его место в круге встаёт последний сервер списка.
+
+        :return: Удалённый сервер.
+        """
+        last = len(self.nodes) - 1
+        server = remove_node(self.nodes, index)
+        self.current_node_index = pointer_after_remove(self.current_node_index, index, last)
+        return server
+
 class WeightedRoundRobin:
-    def __init__(self, nodes: list):
+    records_node_refusals = False
+
+    def __init__(self, nodes: list, use_tree: bool = False):
         """
         Класс для распределения задач между нодами по алгоритму Round Robin.
 
-        :param nodes: Список нод.
+        :param nodes: Список нод или ServerPool.
+        :param use_tree: Хранить веса нод в дереве отрезков (MaxCapacityTree): выбор ноды за O(log n)
+            вместо пересчета всех весов. Назначения и rejected_tasks те же.
         """
         self.nodes = nodes
+        self.pool = nodes if isinstance(nodes, ServerPool) else None
         self.current_node_index = 0
         self.rejected_tasks = 0  # Счетчик отклоненных задач
         self.nodes_weights = [0.0] * len(nodes)
 
+        self.use_tree = use_tree
+        self._tree = None
+        self._second = None
+
     def calc_node_weights(self):
         """Считаем вес как количество свободных ресурсов в процегнтах
         чем больше свободных, тем приоритетнее сервер"""
@@ -66,7 +341,12 @@ class WeightedRoundRobin:
 
         :param task_compute_demand: Требуемая мощность задачи (FLOPS).
         :param task_data_size: Объем данных задачи (байты).
+        :return: Индекс ноды, получившей задачу, или -1, если задача отклонена.
         """
+        if self.use_tree:
+            return self._distribute_task_tree(task_compute_time, task_data_size)
+        if self.pool is not None:
+            return self._distribute_task_pool(task_compute_time, task_data_size)
 
         self.calc_node_weights()
 
@@ -82,7 +362,7 @@ class WeightedRoundRobin:
             if sum(self.nodes_weights) == 0:
                 #print(self.nodes_weights)
                 self.rejected_tasks += 1
-                break
+                return -1
 
             # определяем максимальный доступный вес оставшихся нод
             max_available_weights = max(self.nodes_weights)
@@ -93,36 +373,122 @@ class WeightedRoundRobin:
             # отдаем задачу
             self.nodes[node_index].add_task(task_compute_time, task_data_size)
            # print(self.nodes_weights, task_compute_time)
-            break
+            return node_index
+
+    def _distribute_task_pool(self, task_compute_time: float, task_data_size: float) -> int:
+        """Векторный вариант: веса и проверка доступности считаются сразу для всего пула."""
+        weights = np.abs(self.pool.current_load * 100 - 100)
+        weights[~self.pool.can_accept_tasks(task_compute_time, task_data_size)] = 0.0
+        self.nodes_weights = weights
+
+        if not weights.any():
+            self.rejected_tasks += 1
+            return -1
+
+        # argmax возвращает первый индекс максимума, как и list.index(max(...))
+        node_index = int(np.argmax(weights))
+        self.pool.add_task(node_index, task_compute_time, task_data_size)
+        return node_index
+
+    def _distribute_task_tree(self, task_compute_time: float, task_data_size: float) -> int:
+        """Вариант на дереве отрезков: после назначения обновляется вес только одной ноды."""
+        if self._second != current_second(self.nodes):
+            # новая секунда - нагрузка всех нод сброшена, дерево строится заново
+            if self.pool is None:
+                current_load = np.array([node.current_load for node in self.nodes], dtype=np.float64)
+            else:
+                current_load = self.pool.current_load
+            self._tree = build_capacity_tree(self.nodes, np.abs(current_load * 100 - 100))
+            self._second = current_second(self.nodes)
+
+        node_index = self._tree.argmax(task_compute_time, task_data_size,
+                                       lambda i: self.nodes[i].can_accept_task(task_compute_time, task_data_size))
+        if node_index == -1:
+            self.rejected_tasks += 1
+            return -1
+
+        self.nodes[node_index].add_task(task_compute_time, task_data_size)
+        self.refresh_node(node_index)
+        return node_index
+
+    def refresh_node(self, index: int):
+        """Обновляет вес ноды в дереве после изменения её нагрузки."""
+        if self._tree is not None:
+            node = self.nodes[index]
+            update_capacity_tree(self._tree, index, node, abs(node.current_load * 100 - 100))
+
+    def distribute_batch(self, task_times, task_sizes) -> np.ndarray:
+        """
+        Распределяет пачку задач. Выбор каждой задачи зависит от нагрузки после предыдущей,
+        поэтому задачи идут по одной, но на пуле каждая стоит несколько векторных операций.
+
+        :return: Массив индексов нод (-1 для отклоненных задач).
+        """
+        return distribute_each(self, task_times, task_sizes)
+
+    def add_server(self, server) -> int:
+        """
+        Добавляет сервер за O(1); дерево весов (use_tree) растёт на одну ноду за O(log n).
+
+        :return: Индекс нового сервера.
+        """
+        index = append_node(self.nodes, server)
+        self.nodes_weights.append(0.0)
+        if self._tree is not None:
+            self._tree.append(0.0, float('-inf'), float('-inf'))
+            self.refresh_node(index)
+        return index
+
+    def remove_server(self, index: int):
+        """
+        Удаляет сервер за O(1) (с деревом - O(log n)): на его место встаёт последний сервер списка.
+
+        :return: Удалённый сервер.
+        """
+        server = remove_node(self.nodes, index)
+        swap_remove(self.nodes_weights, index)
+        if self._tree is not None:
+            self._tree.swap_remove(index)
+        return server
 
 
-import itertools
 import math
+from fractions import Fraction
 from typing import Dict, List
 
 
 class WeightedRoundRobinStatic:
     """Веса задаются серверам  изначально и не меняются в ходе работы
-    распределяет задачи в пропорции мощности групп серверов, а внутри группы отдает задачи циклично"""
-    def __init__(self, servers: List['Server']):
+    распределяет задачи в пропорции мощности групп серверов, а внутри группы отдает задачи циклично.
+    Порядок серверов заранее строится на целый период (smooth weighted round robin),
+    выбор следующего сервера - обращение к массиву по индексу"""
+    # задача предлагается одному серверу по расписанию, и его отказ учитывается в dropped_tasks
+    records_node_refusals = True
+
+    def __init__(self, servers: List['Server'], max_schedule_length: int = 1_000_000):
         self.servers = servers
         self.nodes = servers
+        self.pool = servers if isinstance(servers, ServerPool) else None
         self.current_node_index = 0
         self.rejected_tasks = 0
 
         # Группировка серверов по мощности
         self.server_groups = self._group_servers_by_power()
+        self._group_indices = {}
+        self._group_position = {}   # индекс сервера -> его место в списке группы
+        for index, server in enumerate(self.servers):
+            group = self._group_indices.setdefault(server.bu_power, [])
+            self._group_position[index] = len(group)
+            group.append(index)
         self.group_weights = self._calculate_group_weights()
         self.total_weight = sum(self.group_weights.values())
 
-        # Подготовка детерминированного распределения
-        self._setup_weighted_distribution()
-
-        # Циклические генераторы для каждой группы
-        self.server_cycles = {
-            power: itertools.cycle(group)
-            for power, group in self.server_groups.items()
-        }
+        # Расписание серверов на один период и текущая позиция в нём
+        self.max_schedule_length = max_schedule_length
+        self.schedule = self._build_schedule()
+        self._schedule_position = 0
+        self._full_schedule = self.schedule
+        self._composition_changed = False   # были ли add_server / remove_server
 
         # Распределение нагрузки в процентах (для информации)
         self.group_distribution = {
@@ -147,88 +513,324 @@ class WeightedRoundRobinStatic:
             for power, servers in self.server_groups.items()
         }
 
-    def _setup_weighted_distribution(self):
-        """Настраивает детерминированное распределение для дробных весов."""
-        # Находим наименьший ненулевой вес
-        non_zero_weights = [w for w in self.group_weights.values() if w > 0]
-        if not non_zero_weights:
+    def _integer_server_weights(self) -> Dict[float, int]:
+        """
+        Переводит мощности серверов в целые веса с точным сохранением пропорций
+        (1 : 1.22 : 2.2 -> 50 : 61 : 110) без округления вверх.
+        Если период расписания получается длиннее max_schedule_length,
+        веса пропорционально уменьшаются (минимум 1).
+        """
+        fractions = {power: Fraction(power).limit_denominator(1000) for power in self.server_groups}
+        if not any(fraction > 0 for fraction in fractions.values()):
             raise ValueError("All server groups have zero weight")
 
-        min_weight = min(non_zero_weights)
-
-        # Масштабируем веса и округляем вверх
-        self._scaled_weights = []
-        self._total_scaled_weight = 0
-
-        for power, weight in sorted(self.group_weights.items()):
-            if weight > 0:
-                scaled = math.ceil(weight / min_weight)
-                self._scaled_weights.append((power, scaled))
-                self._total_scaled_weight += scaled
-
-        self._group_selection_counter = 0
-
-    def _select_group_by_weight(self) -> float:
-        """Выбирает группу серверов пропорционально их весу (дробные веса поддерживаются)."""
-        if not hasattr(self, '_scaled_weights'):
-            self._setup_weighted_distribution()
-
-        pos = self._group_selection_counter % self._total_scaled_weight
-        self._group_selection_counter += 1
-
-        cumulative = 0
-        for power, scaled_weight in self._scaled_weights:
-            cumulative += scaled_weight
-            if pos < cumulative:
-                return power
-
-        return self._scaled_weights[-1][0]  # fallback
+        common_denominator = 1
+        for fraction in fractions.values():
+            common_denominator = common_denominator * fraction.denominator // math.gcd(common_denominator, fraction.denominator)
+        weights = {power: int(fraction * common_denominator) for power, fraction in fractions.items()}
+        divisor = 0
+        for weight in weights.values():
+            divisor = math.gcd(divisor, weight)
+        weights = {power: weight // divisor for power, weight in weights.items()}
+
+        period = sum(weight * len(self.server_groups[power]) for power, weight in weights.items())
+        if period > self.max_schedule_length:
+            scale = self.max_schedule_length / period
+            weights = {power: max(1, round(weight * scale)) if weight else 0 for power, weight in weights.items()}
+        return weights
+
+    def _build_schedule(self) -> np.ndarray:
+        """
+        Строит один период расписания серверов по алгоритму smooth weighted round robin (как в nginx):
+        на каждом шаге вес каждой группы добавляется к её текущему значению, выбирается группа
+        с максимальным значением (при равенстве - с меньшей мощностью), и из её значения вычитается сумма весов.
+        Внутри группы серверы берутся по кругу. За период каждый сервер выбирается ровно столько раз,
+        каков его целый вес, поэтому расписание повторяется без искажений.
+        """
+        server_weights = self._integer_server_weights()
+        powers = [power for power in sorted(self.server_groups) if server_weights[power] > 0]
+        group_weights = [server_weights[power] * len(self.server_groups[power]) for power in powers]
+        total = sum(group_weights)
+
+        current = [0] * len(powers)
+        selected = np.empty(total, dtype=np.int32)
+        for step in range(total):
+            best = 0
+            for group in range(len(powers)):
+                current[group] += group_weights[group]
+                if current[group] > current[best]:
+                    best = group
+            current[best] -= total
+            selected[step] = best
+
+        schedule = np.empty(total, dtype=np.int32)
+        for group, power in enumerate(powers):
+            mask = selected == group
+            group_indices = np.asarray(self._group_indices[power], dtype=np.int32)
+            schedule[mask] = group_indices[np.arange(int(mask.sum())) % len(group_indices)]
+        return schedule
+
+    def _next_server_index(self) -> int:
+        """Возвращает индекс следующего сервера с учётом WRR."""
+        if self.schedule is None:
+            return self._step_server_index()
+        node_index = int(self.schedule[self._schedule_position])
+        self._schedule_position = (self._schedule_position + 1) % len(self.schedule)
+        return node_index
 
     def get_next_server(self) -> 'Server':
         """Возвращает следующий сервер для обработки задачи с учётом WRR."""
-        selected_power = self._select_group_by_weight()
-        return next(self.server_cycles[selected_power])
+        return self.servers[self._next_server_index()]
 
     def distribute_task(self, task_compute_time: float, task_data_size: float):
-        """Распределяет задачу на сервер с учётом WRR."""
-        if len(self.server_groups) == 1:
+        """Распределяет задачу на сервер с учётом WRR.
+        :return: Индекс сервера, получившего задачу, или -1, если задача отклонена."""
+        if len(self.server_groups) == 1 and self.pool is not None:
+            node_index = self.pool.first_fit(self.current_node_index, task_compute_time, task_data_size)
+            if node_index == -1:
+                self.rejected_tasks += 1
+            else:
+                self.pool.add_task(node_index, task_compute_time, task_data_size)
+                self.current_node_index = (node_index + 1) % len(self.pool)
+            return node_index
+        elif len(self.server_groups) == 1:
             # Все серверы одинаковые - простой Round Robin
             n = len(self.nodes)
             start_index = self.current_node_index
 
             while True:
-                node = self.nodes[self.current_node_index]
+                node_index = self.current_node_index
+                node = self.nodes[node_index]
                 if node.can_accept_task(task_compute_time, task_data_size):
                     node.add_task(task_compute_time, task_data_size)
                     self.current_node_index = (self.current_node_index + 1) % n
-                    break
+                    return node_index
 
                 self.current_node_index = (self.current_node_index + 1) % n
                 if self.current_node_index == start_index:
                     self.rejected_tasks += 1
-                    break
+                    return -1
         else:
-            server = self.get_next_server()
-            if server.can_accept_task(task_compute_time, task_data_size):
-                server.add_task(task_compute_time, task_data_size)
+            node_index = self._next_server_index()
+            server = self.servers[node_index] if node_index >= 0 else None
+            # задача предлагается ровно одному серверу по расписанию - его отказ учитывается в dropped_tasks
+            if server is not None and server.admit_task(task_compute_time, task_data_size):
+                return node_index
             else:
                 self.rejected_tasks += 1
+                return -1
+
+    def _next_server_indices(self, count: int) -> np.ndarray:
+        """Векторный аналог count вызовов _next_server_index."""
+        indices = self.schedule[(self._schedule_position + np.arange(count)) % len(self.schedule)]
+        self._schedule_position = (self._schedule_position + count) % len(self.schedule)
+        return indices.astype(np.int64)
+
+    def distribute_batch(self, task_times, task_sizes) -> np.ndarray:
+        """
+        Распределяет пачку задач с тем же результатом, что и последовательные вызовы distribute_task.
+        Порядок серверов WRR не зависит от их нагрузки, поэтому на пуле он строится сразу для всей пачки,
+        а приём задач проверяется блоками до первого отказа. Для пачки одинаковых задач сервер,
+        встречающийся в порядке c раз и вмещающий ещё slots задач, принимает первые min(c, slots)
+        из них, а остальные отклоняются - это считается сразу для всей пачки.
+
+        :param task_times: Массив вычислительной сложности задач.
+        :param task_sizes: Массив объемов данных задач (байты).
+        :return: Массив индексов серверов (-1 для отклоненных задач).
+        """
+        if self.pool is None:
+            return distribute_each(self, task_times, task_sizes)
+        if len(self.server_groups) == 1:
+            return RoundRobin.distribute_batch(self, task_times, task_sizes)
+        if self.schedule is None:
+            # без расписания серверы выбираются по шагам, задача за задачей
+            return distribute_each(self, task_times, task_sizes)
+
+        task_times = np.asarray(task_times, dtype=np.float64)
+        task_sizes = np.asarray(task_sizes, dtype=np.float64)
+        indices = self._next_server_indices(len(task_times))
+        task = uniform_task(task_times, task_sizes)
+        if task is not None:
+            return self._distribute_uniform(indices, *task)
+
+        assignment = indices.copy()
+        pos = 0
+        chunk = len(self.pool)
+        while pos < len(indices):
+            stop = min(pos + chunk, len(indices))
+            accepted = self.pool.fit_prefix(indices[pos:stop], task_times[pos:stop], task_sizes[pos:stop])
+            pos += accepted
+            chunk = max(len(self.pool), 2 * accepted)
+            if pos < stop:
+                # сервер не принял задачу - отказ, как и в distribute_task
+                if not self.pool.admit_task(indices[pos], task_times[pos], task_sizes[pos]):
+                    self.rejected_tasks += 1
+                    assignment[pos] = -1
+                pos += 1
+        return assignment
+
+    def _distribute_uniform(self, indices: np.ndarray, task_compute_time: float, task_data_size: float) -> np.ndarray:
+        """Приём пачки одинаковых задач по готовому порядку серверов indices (см. distribute_batch)."""
+        n = len(self.pool)
+        occurrences = np.bincount(indices, minlength=n)
+        slots = self.pool.slots(task_compute_time, task_data_size, limit=occurrences)
+
+        # номер появления сервера в порядке пачки
+        order = np.argsort(indices, kind='stable')
+        rank = np.empty(len(indices), dtype=np.int64)
+        rank[order] = np.arange(len(indices)) - np.repeat(np.cumsum(occurrences) - occurrences, occurrences)
+        accepted = rank < slots[indices]
+
+        self.pool.add_uniform_tasks(np.minimum(occurrences, slots), task_compute_time, task_data_size)
+        self.pool.dropped_tasks += occurrences - np.minimum(occurrences, slots)
+        self.rejected_tasks += int(len(indices) - accepted.sum())
+        return np.where(accepted, indices, -1)
 
     def get_distribution_stats(self) -> Dict[float, float]:
         """Возвращает распределение нагрузки между группами в процентах."""
         return self.group_distribution
 
+    def state_key(self):
+        """Состояние для ускорения симуляции (fast_forward): позиции в расписании и, без расписания, шаг SWRR."""
+        steps = None
+        if self.schedule is None:
+            steps = (tuple(self._current.items()), tuple(self._counters.items()))
+        return self.current_node_index, self._schedule_position, steps
+
+    def restore_state(self, state):
+        self.current_node_index, self._schedule_position, steps = state
+        if steps is not None:
+            self._current, self._counters = dict(steps[0]), dict(steps[1])
+
+    def _step_server_index(self) -> int:
+        """
+        Один шаг smooth weighted round robin по группам без готового расписания (после смены состава), O(g)
+        для g групп: выбор группы тот же, что и при построении расписания, внутри группы - по кругу.
+
+        :return: Индекс сервера или -1, если серверов с ненулевым весом нет.
+        """
+        if not self._powers:
+            return -1
+        best = self._powers[0]
+        for power in self._powers:
+            self._current[power] += self._step_weights[power]
+            if self._current[power] > self._current[best]:
+                best = power
+        self._current[best] -= self._step_total
+
+        group = self._group_indices[best]
+        position = self._counters[best]
+        self._counters[best] = (position + 1) % len(group)
+        return group[position]
+
+    def _regroup(self):
+        """
+        Пересчитывает веса групп после смены состава ротации за O(g) и переходит к выбору сервера
+        по шагам: готовое расписание на период описывает прежний состав, а его перестройка стоит O(период).
+        Когда в ротацию вернулись все исходные серверы, снова используется исходное расписание.
+        """
+        self.total_weight = sum(self.group_weights.values())
+        self.group_distribution = {
+            power: (weight / self.total_weight) * 100
+            for power, weight in self.group_weights.items()
+        } if self.total_weight else {}
+        self._schedule_position = 0
+        if not self._composition_changed and len(self._group_position) == len(self.servers):
+            self.schedule = self._full_schedule
+            return
+
+        server_weights = self._integer_server_weights() if self.server_groups else {}
+        self._powers = [power for power in sorted(self.server_groups) if server_weights[power] > 0]
+        self._step_weights = {power: server_weights[power] * len(self.server_groups[power]) for power in self._powers}
+        self._step_total = sum(self._step_weights.values())
+        self._current = dict.fromkeys(self._powers, 0)
+        self._counters = dict.fromkeys(self._powers, 0)
+        self.schedule = None
+
+    def _join_group(self, index: int):
+        """Добавляет сервер index в ротацию - в конец группы его мощности, O(1)."""
+        server = self.servers[index]
+        power = server.bu_power
+        self.server_groups.setdefault(power, []).append(server)
+        group = self._group_indices.setdefault(power, [])
+        self._group_position[index] = len(group)
+        group.append(index)
+        self.group_weights[power] = power * len(group)
+
+    def _leave_group(self, index: int, power: float):
+        """Убирает сервер index из ротации за O(1): на его место в группе встаёт последний сервер группы."""
+        position = self._group_position.pop(index)
+        group = self._group_indices[power]
+        swap_remove(group, position)
+        swap_remove(self.server_groups[power], position)
+        if position < len(group):
+            self._group_position[group[position]] = position
+        if group:
+            self.group_weights[power] = power * len(group)
+        else:
+            del self._group_indices[power], self.server_groups[power], self.group_weights[power]
+
+    def mark_down(self, index: int):
+        """Выводит отказавший сервер из ротации (failures.FailureModel): O(1) плюс O(g) на веса групп."""
+        if index in self._group_position:
+            self._leave_group(index, self.servers[index].bu_power)
+            self._regroup()
+
+    def mark_up(self, index: int):
+        """Возвращает восстановленный сервер в ротацию."""
+        if index not in self._group_position:
+            self._join_group(index)
+            self._regroup()
+
+    def add_server(self, server) -> int:
+        """
+        Добавляет сервер в группу его мощности за O(1) плюс O(g) на пересчёт весов групп.
+
+        :return: Индекс нового сервера.
+        """
+        index = append_node(self.servers, server)
+        if server.available:
+            self._join_group(index)
+        self._composition_changed = True
+        self._regroup()
+        return index
+
+    def remove_server(self, index: int):
+        """
+        Удаляет сервер за O(1) плюс O(g) на пересчёт весов групп: на его место в списке
+        (и в своей группе) встаёт последний сервер.
+
+        :return: Удалённый сервер.
+        """
+        last = len(self.servers) - 1
+        server = remove_node(self.servers, index)
+        if index in self._group_position:
+            self._leave_group(index, server.bu_power)
+        if index != last and last in self._group_position:
+            # последний сервер списка переехал на место удалённого
+            position = self._group_position.pop(last)
+            self._group_indices[self.servers[index].bu_power][position] = index
+            self._group_position[index] = position
+
+        self._composition_changed = True
+        self.current_node_index = pointer_after_remove(self.current_node_index, index, last)
+        self._regroup()
+        return server
+
 
 
 
 
 
 class LeastConnection:
+    records_node_refusals = False
+
     def __init__(self, nodes: list):
         """Класс для распределения задач между нодами по алгоритму Least Connection.
-            :param nodes: Список нод.
+            :param nodes: Список нод или ServerPool.
         """
         self.nodes = nodes
+        self.pool = nodes if isinstance(nodes, ServerPool) else None
         self.current_node_index = 0
         self.nodes_connections = [0] * len(nodes)
         self.rejected_tasks = 0  # Счетчик отклоненных задач
@@ -241,7 +843,11 @@ class LeastConnection:
         """ Распределяет задачу между нодами по алгоритму Least Connections.
         :param task_compute_demand: Требуемая мощность задачи (FLOPS).
         :param task_data_size: Объем данных задачи (байты).
-        :param task_id: Идентификатор задачи. """
+        :param task_id: Идентификатор задачи.
+        :return: Индекс ноды, получившей задачу, или -1, если задача отклонена. """
+        if self.pool is not None:
+            return self._distribute_task_pool(task_compute_demand, task_data_size)
+
           # обновляем количество подключений перед распределением задач
         self.updated_nodes_connections(self.nodes)
         #print(self.nodes_connections, self.rejected_tasks)
@@ -258,7 +864,7 @@ class LeastConnection:
             if all(conn == 5000 for conn in self.nodes_connections):  # если все ноды заняты или не могут взять задачу
                # print(self.nodes_connections)
                 self.rejected_tasks += 1
-                break
+                return -1
             #print(self.nodes_connections)
 
             min_connections = min(self.nodes_connections)   # определяем минимальное кол-во подключений среди доступных нод
@@ -270,15 +876,215 @@ class LeastConnection:
             # обновляем количество подключений
             self.updated_nodes_connections(self.nodes)
 
-            break
+            return min_connections_node_index
 
+    def _distribute_task_pool(self, task_compute_demand: float, task_data_size: float) -> int:
+        """Векторный вариант: подключения и доступность нод берутся из массивов пула."""
+        connections = self.pool.current_tasks.copy()
+        connections[~self.pool.can_accept_tasks(task_compute_demand, task_data_size)] = 5000
+        self.nodes_connections = connections
 
-class WeightedLeastConnection:
+        if (connections == 5000).all():
+            self.rejected_tasks += 1
+            return -1
+
+        # argmin возвращает первый индекс минимума, как и list.index(min(...))
+        node_index = int(np.argmin(connections))
+        self.pool.add_task(node_index, task_compute_demand, task_data_size)
+        return node_index
+
+    def distribute_batch(self, task_times, task_sizes) -> np.ndarray:
+        """
+        Распределяет пачку задач. Выбор каждой задачи зависит от подключений после предыдущей,
+        поэтому задачи идут по одной, но на пуле каждая стоит несколько векторных операций.
+
+        :return: Массив индексов нод (-1 для отклоненных задач).
+        """
+        return distribute_each(self, task_times, task_sizes)
+
+    def add_server(self, server) -> int:
+        """
+        Добавляет сервер за O(1).
+
+        :return: Индекс нового сервера.
+        """
+        index = append_node(self.nodes, server)
+        self.nodes_connections.append(0)
+        return index
+
+    def remove_server(self, index: int):
+        """
+        Удаляет сервер за O(1): на его место встаёт последний сервер списка.
+
+        :return: Удалённый сервер.
+        """
+        server = remove_node(self.nodes, index)
+        swap_remove(self.nodes_connections, index)
+        return server
+
+
+class LeastConnectionHeap(LeastConnection):
     def __init__(self, nodes: list):
+        """Least Connection на индексированной min-куче с ключом (подключения, индекс ноды).
+        Выбор ноды стоит O(log n): после назначения обновляется ключ только той ноды, что получила задачу,
+        а ноды, не вместившие задачу, убираются из кучи до прихода меньшей задачи или новой секунды.
+        Отказавшие задачи упорядочены по времени и по размеру, так что возврат нод смотрит только те из них,
+        что больше текущей задачи, - O(log n) на каждую вернувшуюся ноду, без обхода всех отказов.
+        При задачах разного размера (workload.HeavyTailedTasks) вернувшиеся ноды могут снова отказать
+        следующей большой задаче: каждая такая проверка стоит O(log n), но их число на задачу
+        ограничено лишь числом нод с меньшим числом подключений, которые не вмещают её.
+        Назначения (включая выбор ноды с меньшим индексом при равенстве) совпадают с LeastConnection.
+            :param nodes: Список нод или ServerPool.
+        """
+        super().__init__(nodes)
+        self._heap = IndexedMinHeap()
+        self._evicted = {}  # (время, размер) задачи -> ноды, которые её не вместили
+        self._evicted_task = {}     # нода -> задача, которую она не вместила
+        self._by_time = []  # кучи (-время, задача) и (-размер, задача) отказавших задач
+        self._by_size = []
+        self._second = None
+
+    def refresh_node(self, index: int):
+        """Пересчитывает ключ ноды, чья нагрузка изменилась вне распределителя (например, задача завершилась)."""
+        if self._second is None:
+            return
+        key = (self.nodes[index].get_current_tasks_on_node(), index)
+        if index in self._heap:
+            self._heap.update(index, key)
+            return
+        if self._detach(index) is not None:
+            self._heap.push(index, key)
+
+    def _rebuild_heap(self):
+        """Новая секунда: подключения и нагрузка нод сброшены, куча строится заново за O(n) из работающих нод."""
+        self._heap = IndexedMinHeap((i, (node.get_current_tasks_on_node(), i))
+                                    for i, node in enumerate(self.nodes) if node.available)
+        self._evicted = {}
+        self._evicted_task = {}
+        self._by_time = []
+        self._by_size = []
+        self._second = current_second(self.nodes)
+
+    def _evict(self, index: int, failed_task: tuple):
+        """Запоминает, что нода index не вместила задачу failed_task = (время, размер)."""
+        evicted = self._evicted.get(failed_task)
+        if evicted is None:
+            evicted = self._evicted[failed_task] = set()
+            heapq.heappush(self._by_time, (-failed_task[0], failed_task))
+            heapq.heappush(self._by_size, (-failed_task[1], failed_task))
+        evicted.add(index)
+        self._evicted_task[index] = failed_task
+
+    def _restore_evicted(self, task_compute_demand: float, task_data_size: float):
+        """
+        Возвращает в кучу ноды, отказавшие задаче, которая по времени или размеру больше текущей.
+        Задачи снимаются с вершин куч _by_time и _by_size; записи уже возвращённых задач
+        пропускаются (лишний возврат безопасен - нода просто откажет снова).
+        """
+        for order, demand in ((self._by_time, task_compute_demand), (self._by_size, task_data_size)):
+            while order and -order[0][0] > demand:
+                failed_task = heapq.heappop(order)[1]
+                for index in self._evicted.pop(failed_task, ()):
+                    del self._evicted_task[index]
+                    self._heap.push(index, (self.nodes[index].get_current_tasks_on_node(), index))
+
+    def distribute_task(self, task_compute_demand: float, task_data_size: float):
+        """ Распределяет задачу на доступную ноду с минимальным числом подключений.
+        :param task_compute_demand: Требуемая мощность задачи (FLOPS).
+        :param task_data_size: Объем данных задачи (байты).
+        :return: Индекс ноды, получившей задачу, или -1, если задача отклонена. """
+        if self._second != current_second(self.nodes):
+            self._rebuild_heap()
+        if self._evicted:
+            self._restore_evicted(task_compute_demand, task_data_size)
+
+        while len(self._heap):
+            node_index = self._heap.peek()
+            node = self.nodes[node_index]
+            connections = node.get_current_tasks_on_node()
+            if self._heap.key(node_index) != (connections, node_index):
+                # подключения ноды изменились в обход распределителя - исправляем ключ
+                self._heap.update(node_index, (connections, node_index))
+                continue
+
+            if node.can_accept_task(task_compute_demand, task_data_size):
+                node.add_task(task_compute_demand, task_data_size)
+                self._heap.update(node_index, (connections + 1, node_index))
+                return node_index
+
+            self._heap.remove(node_index)
+            self._evict(node_index, (task_compute_demand, task_data_size))
+
+        self.rejected_tasks += 1
+        return -1
+
+    def distribute_batch(self, task_times, task_sizes) -> np.ndarray:
+        """
+        Распределяет пачку задач по одной, каждая за O(log n).
+
+        :return: Массив индексов нод (-1 для отклоненных задач).
+        """
+        return distribute_each(self, task_times, task_sizes)
+
+    def _detach(self, index: int):
+        """
+        Убирает ноду из кучи или из нод, отказавших задаче.
+
+        :return: Задача, которую нода не вместила, или None, если нода была в куче (или не работает).
+        """
+        if index in self._heap:
+            self._heap.remove(index)
+            return None
+        failed_task = self._evicted_task.pop(index, None)
+        if failed_task is not None:
+            evicted = self._evicted[failed_task]
+            evicted.remove(index)
+            if not evicted:
+                del self._evicted[failed_task]
+        return failed_task
+
+    def add_server(self, server) -> int:
+        """
+        Добавляет сервер; в уже построенную кучу он попадает за O(log n).
+
+        :return: Индекс нового сервера.
+        """
+        index = super().add_server(server)
+        if self._second is not None and server.available:
+            self._heap.push(index, (server.get_current_tasks_on_node(), index))
+        return index
+
+    def remove_server(self, index: int):
+        """
+        Удаляет сервер за O(log n): на его место встаёт последний сервер списка,
+        а его ключ в куче получает новый индекс.
+
+        :return: Удалённый сервер.
+        """
+        last = len(self.nodes) - 1
+        if self._second is not None:
+            self._detach(index)
+            if index != last:
+                in_heap = last in self._heap
+                failed_task = self._detach(last)
+                if in_heap:
+                    self._heap.push(index, (self.nodes[last].get_current_tasks_on_node(), index))
+                elif failed_task is not None:
+                    self._evict(index, failed_task)
+        return super().remove_server(index)
+
+
+class WeightedLeastConnection:
+    records_node_refusals = False
+
+    def __init__(self, nodes: list, use_tree: bool = False):
         """Класс для распределения задач между нодами по алгоритму Weighted Least Connection.
-            :param nodes: Список нод.
+            :param nodes: Список нод или ServerPool.
+            :param use_tree: Хранить веса нод в дереве отрезков (MaxCapacityTree): выбор ноды за O(log n)
+                вместо пересчета всех весов. Назначения и rejected_tasks те же.
         """
         self.nodes = nodes
+        self.pool = nodes if isinstance(nodes, ServerPool) else None
         self.current_node_index = 0
         self.nodes_connections = [0] * len(nodes)
         self.rejected_tasks = 0  # Счетчик отклоненных задач
@@ -287,6 +1093,10 @@ class WeightedLeastConnection:
 
         self.wlc_weight = [node.bu_power for node in self.nodes]
 
+        self.use_tree = use_tree
+        self._tree = None
+        self._second = None
+
     def calc_node_weights(self):
         """Считаем вес как количество свободных ресурсов в процегнтах
         чем больше свободных, тем приоритетнее сервер"""
@@ -322,7 +1132,12 @@ class WeightedLeastConnection:
         """Распределяет задачу между нодами по алгоритму Weighted Least Connections.
         :param task_compute_demand: Требуемая мощность задачи (FLOPS).
         :param task_data_size: Объем данных задачи (байты).
+        :return: Индекс ноды, получившей задачу, или -1, если задача отклонена.
         """
+        if self.use_tree:
+            return self._distribute_task_tree(task_compute_demand, task_data_size)
+        if self.pool is not None:
+            return self._distribute_task_pool(task_compute_demand, task_data_size)
 
         # обновляем вес нод
         self.calc_wlc_node_weights(self.nodes)
@@ -339,7 +1154,7 @@ class WeightedLeastConnection:
         while True:
             if all(conn == 0 for conn in self.wlc_weight):  # если все ноды заняты или не могут взять задачу
                 self.rejected_tasks += 1
-                break
+                return -1
 
             min_available_weights = max(self.wlc_weight)   # определяем минимальный вес среди доступных нод
             min_weight_node_index = self.wlc_weight.index(min_available_weights)  # определяем первый индекс среди доступных нод
@@ -351,4 +1166,368 @@ class WeightedLeastConnection:
 
             # обновляем вес нод
             #self.calc_wlc_node_weights(self.nodes)
-            break
\ No newline at end of file
+            return min_weight_node_index
+
+    def _distribute_task_pool(self, task_compute_demand: float, task_data_size: float) -> int:
+        """Векторный вариант: w = свободный ресурс / (подключения + 1) считается сразу для всего пула."""
+        self.nodes_weights = np.abs(self.pool.current_load * 100 - 100)
+        self.nodes_connections = self.pool.current_tasks.copy()
+        wlc_weight = self.nodes_weights / (self.nodes_connections + 1)
+        wlc_weight[~self.pool.can_accept_tasks(task_compute_demand, task_data_size)] = 0
+        self.wlc_weight = wlc_weight
+
+        if not wlc_weight.any():
+            self.rejected_tasks += 1
+            return -1
+
+        node_index = int(np.argmax(wlc_weight))
+        self.pool.add_task(node_index, task_compute_demand, task_data_size)
+        return node_index
+
+    def _distribute_task_tree(self, task_compute_demand: float, task_data_size: float) -> int:
+        """Вариант на дереве отрезков: после назначения обновляется вес только одной ноды."""
+        if self._second != current_second(self.nodes):
+            # новая секунда - нагрузка и подключения всех нод сброшены, дерево строится заново
+            if self.pool is None:
+                current_load = np.array([node.current_load for node in self.nodes], dtype=np.float64)
+                connections = np.array([node.get_current_tasks_on_node() for node in self.nodes], dtype=np.int64)
+            else:
+                current_load, connections = self.pool.current_load, self.pool.current_tasks
+            self._tree = build_capacity_tree(self.nodes, np.abs(current_load * 100 - 100) / (connections + 1))
+            self._second = current_second(self.nodes)
+
+        node_index = self._tree.argmax(task_compute_demand, task_data_size,
+                                       lambda i: self.nodes[i].can_accept_task(task_compute_demand, task_data_size))
+        if node_index == -1:
+            self.rejected_tasks += 1
+            return -1
+
+        self.nodes[node_index].add_task(task_compute_demand, task_data_size)
+        self.refresh_node(node_index)
+        return node_index
+
+    def refresh_node(self, index: int):
+        """Обновляет вес ноды в дереве после изменения её нагрузки или подключений."""
+        if self._tree is not None:
+            node = self.nodes[index]
+            update_capacity_tree(self._tree, index, node,
+                                 abs(node.current_load * 100 - 100) / (node.get_current_tasks_on_node() + 1))
+
+    def distribute_batch(self, task_times, task_sizes) -> np.ndarray:
+        """
+        Распределяет пачку задач. Выбор каждой задачи зависит от весов после предыдущей,
+        поэтому задачи идут по одной, но на пуле каждая стоит несколько векторных операций.
+
+        :return: Массив индексов нод (-1 для отклоненных задач).
+        """
+        return distribute_each(self, task_times, task_sizes)
+
+    def add_server(self, server) -> int:
+        """
+        Добавляет сервер за O(1); дерево весов (use_tree) растёт на одну ноду за O(log n).
+
+        :return: Индекс нового сервера.
+        """
+        index = append_node(self.nodes, server)
+        self.nodes_connections.append(0)
+        self.nodes_weights.append(0.0)
+        self.wlc_weight.append(server.bu_power)
+        if self._tree is not None:
+            self._tree.append(0.0, float('-inf'), float('-inf'))
+            self.refresh_node(index)
+        return index
+
+    def remove_server(self, index: int):
+        """
+        Удаляет сервер за O(1) (с деревом - O(log n)): на его место встаёт последний сервер списка.
+
+        :return: Удалённый сервер.
+        """
+        server = remove_node(self.nodes, index)
+        for values in (self.nodes_connections, self.nodes_weights, self.wlc_weight):
+            swap_remove(values, index)
+        if self._tree is not None:
+            self._tree.swap_remove(index)
+        return server
+
+
+class PowerOfDChoices:
+    records_node_refusals = False   # отказ кандидата не отклоняет задачу (см. RoundRobin)
+
+    # критерии выбора среди кандидатов
+    CRITERIA = ('connections', 'headroom')
+
+    def __init__(self, nodes: list, d: int = 2, criterion: str = 'connections', weighted: bool = False,
+                 retries: int = 2, seed=None):
+        """Распределение по схеме "power of d choices": для каждой задачи выбираются d случайных нод,
+        и задача отдаётся лучшей из тех, что могут её принять. Стоимость решения O(d) и не зависит
+        от числа нод, поэтому схема годится для пулов из десятков тысяч серверов.
+            :param nodes: Список нод или ServerPool.
+            :param d: Сколько случайных кандидатов проверять (с повторениями).
+            :param criterion: 'connections' - меньше задач за текущую секунду (tasks_history[-1]),
+                'headroom' - больше свободного времени в секунде (1 - current_load).
+            :param weighted: Учитывать мощность: подключения делятся на bu_power,
+                свободное время умножается на bu_power (свободная мощность).
+            :param retries: Сколько раз выбрать новых кандидатов, если ни один не может принять задачу;
+                после этого задача отклоняется.
+            :param seed: Зерно генератора случайных чисел.
+        """
+        if criterion not in self.CRITERIA:
+            raise ValueError(f"Неизвестный критерий: {criterion}")
+        self.nodes = nodes
+        self.pool = nodes if isinstance(nodes, ServerPool) else None
+        self.d = d
+        self.criterion = criterion
+        self.weighted = weighted
+        self.retries = retries
+        self.rejected_tasks = 0
+        self._random = random.Random(seed)
+
+    def state_key(self):
+        """Выбор случайный, секунды не повторяются - ускорение симуляции (fast_forward) отключается."""
+        return None
+
+    def _score(self, index: int) -> float:
+        """Оценка кандидата: чем меньше, тем лучше."""
+        if self.pool is not None:
+            pool = self.pool
+            connections, current_load, bu_power = pool.current_tasks[index], pool.current_load[index], pool.bu_power[index]
+        else:
+            node = self.nodes[index]
+            connections, current_load, bu_power = node.get_current_tasks_on_node(), node.current_load, node.bu_power
+        if self.criterion == 'connections':
+            return connections / bu_power if self.weighted else connections
+        headroom = 1 - current_load
+        return -(headroom * bu_power if self.weighted else headroom)
+
+    def distribute_task(self, task_compute_time: float, task_data_size: float):
+        """Распределяет задачу среди d случайных нод.
+        :return: Индекс ноды, получившей задачу, или -1, если задача отклонена."""
+        n = len(self.nodes)
+        if n == 0:
+            self.rejected_tasks += 1
+            return -1
+        randrange = self._random.randrange
+        if self.pool is not None:
+            can_accept_task = lambda i: self.pool.can_accept_task(i, task_compute_time, task_data_size)
+        else:
+            can_accept_task = lambda i: self.nodes[i].can_accept_task(task_compute_time, task_data_size)
+
+        for _ in range(self.retries + 1):
+            best, best_score = -1, None
+            for _ in range(self.d):
+                index = randrange(n)
+                if not can_accept_task(index):
+                    continue
+                score = self._score(index)
+                if best_score is None or score < best_score:
+                    best, best_score = index, score
+            if best >= 0:
+                self.nodes[best].add_task(task_compute_time, task_data_size)
+                return best
+
+        self.rejected_tasks += 1
+        return -1
+
+    def distribute_batch(self, task_times, task_sizes) -> np.ndarray:
+        """
+        Распределяет пачку задач по одной: выбор каждой задачи зависит от нагрузки после предыдущей.
+
+        :return: Массив индексов нод (-1 для отклоненных задач).
+        """
+        return distribute_each(self, task_times, task_sizes)
+
+    def add_server(self, server) -> int:
+        """
+        Добавляет сервер за O(1): кандидаты выбираются среди текущих нод.
+
+        :return: Индекс нового сервера.
+        """
+        return append_node(self.nodes, server)
+
+    def remove_server(self, index: int):
+        """
+        Удаляет сервер за O(1): на его место встаёт последний сервер списка.
+
+        :return: Удалённый сервер.
+        """
+        return remove_node(self.nodes, index)
+
+
+def ring_hash(value) -> int:
+    """Стабильный (не зависящий от запуска) 64-битный хэш ключа или точки кольца."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'little')
+
+
+class ConsistentHash:
+    # без bounded задача предлагается только своей ноде, и её отказ учитывается в dropped_tasks
+    records_node_refusals = True
+
+    def __init__(self, nodes: list, points_per_power: int = 100, bounded: bool = False, load_factor: float = None):
+        """Согласованное хэширование: задача с ключом идёт на ноду, чья точка на кольце
+        первая по часовой стрелке от хэша ключа. Кольцо - отсортированные блоками точки (HashRing),
+        поиск - bisect за O(log n). Число точек ноды пропорционально её мощности.
+        Добавление или удаление ноды меняет только её точки (add_node_points / remove_node_points).
+            :param nodes: Список нод или ServerPool.
+            :param points_per_power: Сколько точек кольца приходится на единицу bu_power (минимум одна на ноду).
+            :param bounded: Вариант "bounded loads": если нода не может принять задачу, задача идёт
+                к следующей по кольцу ноде, пока не найдётся подходящая или не будут проверены все.
+                Без него задача предлагается только своей ноде (admit_task), и её отказ - отклонение.
+            :param load_factor: Для bounded - ограничение подключений ноды за секунду:
+                не больше ceil(load_factor * задач за секунду * доля мощности ноды) (например, 1.25).
+        """
+        self.nodes = nodes
+        self.pool = nodes if isinstance(nodes, ServerPool) else None
+        self.points_per_power = points_per_power
+        self.bounded = bounded
+        self.load_factor = load_factor
+        self.records_node_refusals = not bounded    # bounded перебирает ноды по кольцу, как сканирующие
+        self.rejected_tasks = 0
+
+        self._index = {}        # server_id -> индекс ноды в nodes
+        self._total_power = 0.0
+        self._sequence = 0      # номер задачи - ключ, если ключ не передан
+        self._second = None
+        self._assigned = 0      # открытых подключений всех нод за текущую секунду (как get_current_tasks_on_node)
+
+        # начальное кольцо (точки с server_id владельца) строится одной сортировкой, а не вставкой по одной
+        points = []
+        for index, node in enumerate(nodes):
+            server_id = int(node.server_id)
+            self._index[server_id] = index
+            self._total_power += node.bu_power
+            points.extend((ring_hash(f"{server_id}#{replica}"), server_id) for replica in range(self._points(node)))
+        self._ring = HashRing(points)
+
+    def state_key(self):
+        """Ключи задач (или их номера) не повторяются по секундам - fast_forward отключается."""
+        return None
+
+    def _points(self, node) -> int:
+        return max(1, round(self.points_per_power * node.bu_power))
+
+    def add_node_points(self, index: int):
+        """Добавляет на кольцо точки ноды nodes[index] (O(k log n) для k точек)."""
+        node = self.nodes[index]
+        server_id = int(node.server_id)
+        self._index[server_id] = index
+        self._total_power += node.bu_power
+        for replica in range(self._points(node)):
+            self._ring.insert(ring_hash(f"{server_id}#{replica}"), server_id)
+
+    def remove_node_points(self, server_id: int, bu_power: float):
+        """Удаляет с кольца точки ноды server_id; остальные точки не меняются."""
+        for replica in range(max(1, round(self.points_per_power * bu_power))):
+            self._ring.remove(ring_hash(f"{server_id}#{replica}"), server_id)
+        del self._index[server_id]
+        self._total_power -= bu_power
+
+    def add_server(self, server) -> int:
+        """
+        Добавляет сервер и его точки на кольцо; ключи переходят к нему только с соседних точек.
+
+        :return: Индекс нового сервера.
+        """
+        index = append_node(self.nodes, server)
+        self.add_node_points(index)
+        return index
+
+    def remove_server(self, index: int):
+        """
+        Удаляет сервер и его точки с кольца: на его место в списке встаёт последний сервер,
+        у которого меняется только индекс, а не точки.
+
+        :return: Удалённый сервер.
+        """
+        last = len(self.nodes) - 1
+        server = remove_node(self.nodes, index)
+        if self._second is not None:
+            self._assigned -= server.get_current_tasks_on_node()
+        if int(server.server_id) in self._index:
+            self.remove_node_points(int(server.server_id), server.bu_power)
+        if index != last and int(self.nodes[index].server_id) in self._index:
+            self._index[int(self.nodes[index].server_id)] = index
+        return server
+
+    def mark_down(self, index: int):
+        """Убирает точки отказавшего сервера с кольца (failures.FailureModel): его ключи переходят
+        к следующим по кольцу нодам, остальные ключи остаются на месте."""
+        node = self.nodes[index]
+        if int(node.server_id) in self._index:
+            self.remove_node_points(int(node.server_id), node.bu_power)
+
+    def mark_up(self, index: int):
+        """Возвращает точки восстановленного сервера на кольцо - и его ключи к нему."""
+        if int(self.nodes[index].server_id) not in self._index:
+            self.add_node_points(index)
+
+    def owner(self, key) -> int:
+        """Индекс ноды, которой принадлежит ключ (без учёта её нагрузки)."""
+        return self._index[self._ring.successor(ring_hash(key))]
+
+    def _open_connections(self) -> int:
+        """Открытые подключения всех нод: задачи секунды, в том числе запущенные из очередей, и ждущие в очередях."""
+        if self.pool is not None:
+            return int(self.pool.current_tasks.sum())
+        return sum(node.get_current_tasks_on_node() for node in self.nodes)
+
+    def _within_load_factor(self, node) -> bool:
+        if self.load_factor is None:
+            return True
+        limit = math.ceil(self.load_factor * (self._assigned + 1) * node.bu_power / self._total_power)
+        return node.get_current_tasks_on_node() + 1 <= limit
+
+    def distribute_task(self, task_compute_time: float, task_data_size: float, key=None):
+        """Распределяет задачу по ключу.
+        :param key: Ключ задачи (например, идентификатор объекта кэша); по умолчанию - номер задачи.
+        :return: Индекс ноды, получившей задачу, или -1, если задача отклонена."""
+        if key is None:
+            key = self._sequence
+        self._sequence += 1
+        if not len(self._ring):
+            self.rejected_tasks += 1
+            return -1
+
+        point = ring_hash(key)
+        if not self.bounded:
+            node_index = self._index[self._ring.successor(point)]
+            if self.nodes[node_index].admit_task(task_compute_time, task_data_size):
+                return node_index
+            self.rejected_tasks += 1
+            return -1
+
+        if self.load_factor is not None and self._second != current_second(self.nodes):
+            # предел считается по той же величине, что и подключения ноды: очереди и задачи,
+            # запущенные из них в начале секунды, учитываются с обеих сторон
+            self._second, self._assigned = current_second(self.nodes), self._open_connections()
+        seen = set()
+        for server_id in self._ring.walk(point):
+            if server_id in seen:
+                continue
+            seen.add(server_id)
+            node_index = self._index[server_id]
+            node = self.nodes[node_index]
+            if node.can_accept_task(task_compute_time, task_data_size) and self._within_load_factor(node):
+                node.add_task(task_compute_time, task_data_size)
+                self._assigned += 1
+                return node_index
+            if len(seen) == len(self._index):
+                break
+        self.rejected_tasks += 1
+        return -1
+
+    def distribute_batch(self, task_times, task_sizes, keys=None) -> np.ndarray:
+        """
+        Распределяет пачку задач по одной.
+
+        :param keys: Ключи задач (по умолчанию - номера задач).
+        :return: Массив индексов нод (-1 для отклоненных задач).
+        """
+        if keys is None:
+            return distribute_each(self, task_times, task_sizes)
+        task_times = np.asarray(task_times, dtype=np.float64).tolist()
+        task_sizes = np.asarray(task_sizes, dtype=np.float64).tolist()
+        assignment = np.full(len(task_times), -1, dtype=np.int64)
+        for i, (task_time, task_size, key) in enumerate(zip(task_times, task_sizes, keys)):
+            assignment[i] = self.distribute_task(task_time, task_size, key)
+        return assignment
@@ -0,0 +1,107 @@
+import heapq
+
+import numpy as np
+
+from server_pool import ServerPool
+
+# виды событий; при равном времени сначала освобождаются ресурсы, потом приходят задачи
+TASK_COMPLETED = 0
+NETWORK_RELEASED = 1
+
+
+class EventSimulation:
+    """
+    Событийная симуляция в непрерывном времени поверх существующих распределителей.
+
+    Нода выполняет задачи по очереди (FIFO): задача длительностью t / bu_power начинается, когда нода
+    освободилась от предыдущих, и не исчезает на границе секунды. current_load - суммарная работа
+    невыполненных задач ноды (в секундах), поэтому условие can_accept_task "current_load + t / bu_power <= 1"
+    означает очередь работы не длиннее одной секунды. Данные задачи занимают сеть ноды одну секунду
+    с момента прихода, так что bandwidth_bytes остаётся пропускной способностью в байтах за секунду.
+    current_tasks пула - число невыполненных задач (подключений), по нему работают
+    LeastConnection и WeightedLeastConnection.
+
+    Время продвигается от события к событию (приход задачи, завершение, освобождение сети),
+    поэтому простой между задачами ничего не стоит, а работа пропорциональна числу событий.
+
+    :param distributor: Распределитель, созданный на том же пуле.
+    :param pool: Пул серверов.
+    """
+
+    def __init__(self, distributor, pool: ServerPool):
+        self.distributor = distributor
+        self.pool = pool
+        self.now = 0.0
+        self.events_processed = 0
+        self.arrived_tasks = 0
+        self._events = []   # (время, вид события, порядковый номер, нода, величина)
+        self._busy_until = np.zeros(len(pool))  # когда нода закончит все принятые задачи
+        self._sequence = 0
+        self._refresh_node = getattr(distributor, 'refresh_node', None)
+
+    def _push(self, time: float, kind: int, node_index: int, amount: float):
+        heapq.heappush(self._events, (time, kind, self._sequence, node_index, amount))
+        self._sequence += 1
+
+    def _process_until(self, time: float):
+        """Обрабатывает все события освобождения ресурсов не позже time."""
+        pool = self.pool
+        events = self._events
+        while events and events[0][0] <= time:
+            self.now, kind, _, node_index, amount = heapq.heappop(events)
+            if kind == TASK_COMPLETED:
+                pool.release_task(node_index, amount)
+            else:
+                pool.release_network(node_index, amount)
+            self.events_processed += 1
+            if self._refresh_node is not None:
+                self._refresh_node(node_index)
+
+    def add_arrivals(self, arrival_times, task_times, task_sizes):
+        """
+        Проигрывает приход задач (время прихода должно не убывать и быть не меньше уже пройденного).
+
+        :param arrival_times: Моменты прихода задач (секунды).
+        :param task_times: Вычислительная сложность задач.
+        :param task_sizes: Объемы данных задач (байты).
+        """
+        bu_power = self.pool.bu_power
+        busy_until = self._busy_until
+        for arrival, task_time, task_size in zip(np.asarray(arrival_times, dtype=np.float64).tolist(),
+                                                 np.asarray(task_times, dtype=np.float64).tolist(),
+                                                 np.asarray(task_sizes, dtype=np.float64).tolist()):
+            self._process_until(arrival)
+            self.now = arrival
+            self.arrived_tasks += 1
+            self.events_processed += 1
+            node_index = self.distributor.distribute_task(task_time, task_size)
+            if node_index >= 0:
+                execution_time = task_time / bu_power[node_index]
+                busy_until[node_index] = max(arrival, busy_until[node_index]) + execution_time
+                self._push(busy_until[node_index], TASK_COMPLETED, node_index, task_time)
+                self._push(arrival + 1.0, NETWORK_RELEASED, node_index, task_size)
+
+    def run(self, arrivals, until: float = None) -> dict:
+        """
+        Проигрывает поток задач и дожидается завершения всех принятых задач.
+
+        :param arrivals: Итерируемые порции (arrival_times, task_times, task_sizes), упорядоченные по времени.
+        :param until: Конец симуляции; по умолчанию - момент последнего события.
+        :return: Итоги симуляции.
+        """
+        for arrival_times, task_times, task_sizes in arrivals:
+            self.add_arrivals(arrival_times, task_times, task_sizes)
+        self._process_until(float('inf') if until is None else until)
+        if until is not None:
+            self.now = max(self.now, until)
+        return self.summary()
+
+    def summary(self) -> dict:
+        """Итоги: загрузка нод за всё время симуляции и счетчики задач."""
+        horizon = self.now if self.now > 0 else 1.0
+        return {'duration': self.now,
+                'events': self.events_processed,
+                'arrived_tasks': self.arrived_tasks,
+                'processed_tasks': int(self.pool.processed_tasks.sum()),
+                'rejected_tasks': self.distributor.rejected_tasks,
+                'utilization': self.pool.total_work_time / horizon * 100}
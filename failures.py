@@ -0,0 +1,158 @@
+import numpy as np
+
+from server_pool import ServerPool
+from simulation import run_simulation
+
+
+class FailureModel:
+    """
+    Отказы серверов: в каждом такте для всех работающих серверов разом разыгрывается отказ
+    с вероятностью failure_probability сервера (один вызов генератора на весь пул), отказавший
+    сервер выходит из ротации на downtime_seconds тактов (не меньше одного) и затем восстанавливается.
+
+    Случайные числа тянутся для всех серверов в каждом такте, поэтому при одном seed
+    последовательность отказов одинакова для любых распределителей и их можно сравнивать.
+
+    Отказавший сервер помечается недоступным (available = False): его проверки вместимости
+    сразу возвращают False, так что распределители пропускают его без отдельного обхода нод.
+    Распределителям без проверок (расписание WeightedRoundRobinStatic, кольцо ConsistentHash)
+    передаются вызовы distributor.mark_down(index) и mark_up(index).
+    Состав серверов (add_server / remove_server) во время работы модели меняться не должен.
+
+    :param servers: Список node.Server или ServerPool.
+    :param seed: Зерно генератора.
+    :param active: False - отказов нет, модель только собирает статистику нагрузки (базовый прогон).
+    """
+
+    def __init__(self, servers, seed=None, active: bool = True):
+        self.servers = servers
+        self.active = active
+        if isinstance(servers, ServerPool):
+            self.failure_probability = servers.failure_probability.copy()
+            self.downtime_seconds = servers.downtime_seconds.copy()
+            self.bu_power = servers.bu_power.copy()
+        else:
+            self.failure_probability = np.array([server.failure_probability for server in servers], dtype=np.float64)
+            self.downtime_seconds = np.array([server.downtime_seconds for server in servers], dtype=np.float64)
+            self.bu_power = np.array([server.bu_power for server in servers], dtype=np.float64)
+        self._downtime_ticks = np.maximum(1, np.ceil(self.downtime_seconds)).astype(np.int64)
+        self.down_until = np.full(len(self.bu_power), -1, dtype=np.int64)     # такт восстановления, -1 - работает
+        self.rng = np.random.default_rng(seed)
+
+        self.ticks = 0
+        self.failures = 0
+        self.down_server_seconds = 0
+        self.capacity_lost = 0.0        # сумма мощности отказавших серверов по тактам (bu x секунды)
+        self.observed_ticks = 0
+        self.survivor_load_total = 0.0  # сумма по тактам средней загрузки работающих серверов (%)
+        self.survivor_load_peak = 0.0
+
+    @property
+    def down(self) -> np.ndarray:
+        """Маска отказавших серверов."""
+        return self.down_until >= 0
+
+    def step(self, tick: int, distributor=None):
+        """
+        Начало такта tick: восстанавливает серверы, чей простой закончился, и разыгрывает новые отказы.
+
+        :param distributor: Распределитель, которому передаются mark_down / mark_up (если он их определяет).
+        :return: Индексы отказавших и восстановленных в этом такте серверов.
+        """
+        recovered = np.flatnonzero((self.down_until >= 0) & (self.down_until <= tick))
+        self.down_until[recovered] = -1
+        draws = self.rng.random(len(self.down_until))
+        if self.active:
+            failed = np.flatnonzero((draws < self.failure_probability) & (self.down_until < 0))
+        else:
+            failed = np.zeros(0, dtype=np.int64)
+        self.down_until[failed] = tick + self._downtime_ticks[failed]
+
+        self._set_available(recovered, True)
+        self._set_available(failed, False)
+        if distributor is not None:
+            if hasattr(distributor, 'mark_up'):
+                for index in recovered.tolist():
+                    distributor.mark_up(index)
+            if hasattr(distributor, 'mark_down'):
+                for index in failed.tolist():
+                    distributor.mark_down(index)
+
+        down = self.down
+        self.ticks += 1
+        self.failures += len(failed)
+        self.down_server_seconds += int(np.count_nonzero(down))
+        self.capacity_lost += float(self.bu_power[down].sum())
+        return failed, recovered
+
+    def _set_available(self, indices: np.ndarray, available: bool):
+        if isinstance(self.servers, ServerPool):
+            self.servers.available[indices] = available
+            return
+        for index in indices.tolist():
+            self.servers[index].available = available
+
+    def observe(self, after: dict):
+        """
+        Учитывает загрузку работающих серверов по итогам такта.
+
+        :param after: Значения такта (simulation.snapshot), нужен ключ 'cpu' (%).
+        """
+        up = ~self.down
+        if not up.any():
+            return
+        cpu = after['cpu'][up]
+        self.observed_ticks += 1
+        self.survivor_load_total += float(cpu.mean())
+        self.survivor_load_peak = max(self.survivor_load_peak, float(cpu.max()))
+
+    def summary(self) -> dict:
+        """Число отказов, простой, потерянная мощность и загрузка работающих серверов."""
+        total_capacity = float(self.bu_power.sum()) * self.ticks
+        return {'ticks': self.ticks,
+                'failures': self.failures,
+                'down_server_seconds': self.down_server_seconds,
+                'capacity_lost': self.capacity_lost,
+                'capacity_lost_share': self.capacity_lost / total_capacity if total_capacity else 0.0,
+                'survivor_load_mean': self.survivor_load_total / self.observed_ticks if self.observed_ticks else 0.0,
+                'survivor_load_peak': self.survivor_load_peak}
+
+
+def failure_report(variants, make_servers, task_times, task_sizes, simulation_time: int, seed=0) -> list:
+    """
+    Сравнивает распределители при отказах: для каждого делаются базовый прогон без отказов
+    и прогон с отказами (одна и та же последовательность отказов для всех, общий seed)
+    на новых серверах из make_servers().
+
+    :param variants: Тройки (имя, класс распределителя, параметры конструктора), как benchmark.VARIANTS.
+    :param make_servers: Функция без аргументов, возвращающая новый список node.Server или ServerPool.
+    :param task_times: Вычислительная сложность задач одной секунды.
+    :param task_sizes: Объемы данных задач одной секунды (байты).
+    :param simulation_time: Длительность симуляции в секундах.
+    :param seed: Зерно генератора отказов.
+    :return: Строки отчёта: потерянная мощность, лишние отказы в приёме задач
+        и изменение загрузки работающих серверов (перебалансировка) относительно базового прогона.
+    """
+    rows = []
+    for name, distributor_class, options in variants:
+        runs = {}
+        for active in (False, True):
+            servers = make_servers()
+            distributor = distributor_class(servers, **options)
+            model = FailureModel(servers, seed=seed, active=active)
+            run_simulation(distributor, servers, task_times, task_sizes, simulation_time, failures=model)
+            runs[active] = (distributor.rejected_tasks, model.summary())
+        (base_rejected, base), (rejected, failed) = runs[False], runs[True]
+        rows.append({'distributor': name,
+                     'failures': failed['failures'],
+                     'down_server_seconds': failed['down_server_seconds'],
+                     'capacity_lost': failed['capacity_lost'],
+                     'capacity_lost_share': failed['capacity_lost_share'],
+                     'rejected_baseline': base_rejected,
+                     'rejected': rejected,
+                     'extra_rejections': rejected - base_rejected,
+                     'survivor_load_mean': failed['survivor_load_mean'],
+                     'survivor_load_mean_change': failed['survivor_load_mean'] - base['survivor_load_mean'],
+                     'survivor_load_peak': failed['survivor_load_peak'],
+                     'survivor_load_peak_change': failed['survivor_load_peak'] - base['survivor_load_peak']})
+    return rows
@@ -0,0 +1,139 @@
+import time
+
+import numpy as np
+
+from distributor import distribute_each
+from server_pool import ServerPool
+from structures import LogHistogram
+
+
+def _pool_probes(method: str, result, args, pool: ServerPool) -> int:
+    """
+    Сколько нод проверил вызов метода пула (сверх вложенных вызовов can_accept_task).
+
+    :param method: Имя метода пула.
+    :param result: Что вернул метод.
+    :param args: Аргументы вызова.
+    """
+    if method == 'can_accept_task':
+        return 1
+    if method == 'can_accept_tasks':
+        return len(pool)
+    if method == 'first_fit':
+        # стартовая нода уже посчитана вложенным can_accept_task
+        if result == -1:
+            return len(pool) - 1
+        return (result - args[0]) % len(pool)
+    # fit_prefix: принятые задачи и первая отклонённая
+    return min(result + 1, len(args[0]))
+
+
+POOL_PROBE_METHODS = ('can_accept_task', 'can_accept_tasks', 'first_fit', 'fit_prefix')
+
+
+class InstrumentedDistributor:
+    """
+    Обёртка распределителя, которая замеряет каждое решение distribute_task:
+    время вызова (гистограмма LogHistogram, секунды), число проверенных нод (вызовов can_accept_task)
+    и число отклонённых задач.
+
+    Проверки нод считаются через подмену can_accept_task у самих нод (у пула - методов проверки),
+    поэтому без обёртки распределители и ноды работают без каких-либо накладных расходов.
+    distribute_batch обёртки раздаёт задачи по одной, чтобы замерить каждое решение.
+    Остальные атрибуты (rejected_tasks, current_node_index, ...) читаются и пишутся
+    у исходного распределителя, так что обёртку можно передавать в run_simulation.
+
+    :param distributor: Распределитель из distributor.py.
+    :param histogram: Гистограмма для времени решений (по умолчанию LogHistogram()).
+    """
+
+    _own_attributes = ('distributor', 'latency', 'decisions', 'probes', 'rejections', '_patched')
+
+    def __init__(self, distributor, histogram: LogHistogram = None):
+        object.__setattr__(self, 'distributor', distributor)
+        object.__setattr__(self, 'latency', histogram if histogram is not None else LogHistogram())
+        object.__setattr__(self, 'decisions', 0)
+        object.__setattr__(self, 'probes', 0)
+        object.__setattr__(self, 'rejections', 0)
+        object.__setattr__(self, '_patched', [])
+        self._install_probe_counters()
+
+    def __getattr__(self, name):
+        return getattr(self.distributor, name)
+
+    def __setattr__(self, name, value):
+        if name in self._own_attributes:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.distributor, name, value)
+
+    def _install_probe_counters(self):
+        nodes = self.distributor.nodes
+        if isinstance(nodes, ServerPool):
+            for method in POOL_PROBE_METHODS:
+                self._patch(nodes, method, self._counting_pool_method(nodes, method))
+            return
+        for node in nodes:
+            self._patch(node, 'can_accept_task', self._counting_can_accept_task(node.can_accept_task))
+
+    def _patch(self, target, name: str, function):
+        target.__dict__[name] = function
+        self._patched.append((target, name))
+
+    def _counting_can_accept_task(self, can_accept_task):
+        def counted(task_compute_time, task_data_size):
+            self.probes += 1
+            return can_accept_task(task_compute_time, task_data_size)
+        return counted
+
+    def _counting_pool_method(self, pool: ServerPool, method: str):
+        original = getattr(pool, method)
+
+        def counted(*args):
+            result = original(*args)
+            self.probes += _pool_probes(method, result, args, pool)
+            return result
+        return counted
+
+    def uninstall(self):
+        """Возвращает нодам исходные методы проверки."""
+        for target, name in self._patched:
+            target.__dict__.pop(name, None)
+        self._patched.clear()
+
+    def add_server(self, server) -> int:
+        """Добавляет сервер в распределитель и считает проверки новой ноды."""
+        index = self.distributor.add_server(server)
+        self._patch(server, 'can_accept_task', self._counting_can_accept_task(server.can_accept_task))
+        return index
+
+    def distribute_task(self, task_compute_time: float, task_data_size: float):
+        distributor = self.distributor
+        rejected_before = distributor.rejected_tasks
+        start = time.perf_counter()
+        result = distributor.distribute_task(task_compute_time, task_data_size)
+        self.latency.record(time.perf_counter() - start)
+        self.decisions += 1
+        self.rejections += distributor.rejected_tasks - rejected_before
+        return result
+
+    def distribute_batch(self, task_times, task_sizes) -> np.ndarray:
+        return distribute_each(self, task_times, task_sizes)
+
+    def summary(self) -> dict:
+        """Число решений, проверок нод и отказов, а также время решения в секундах (count, mean, p50, p99, ...)."""
+        result = {'distributor': type(self.distributor).__name__,
+                  'decisions': self.decisions,
+                  'probes': self.probes,
+                  'probes_per_decision': self.probes / self.decisions if self.decisions else 0.0,
+                  'rejections': self.rejections}
+        result.update({f"latency_{name}": value for name, value in self.latency.summary().items()})
+        return result
+
+
+def instrument(distributor, enabled: bool = True):
+    """
+    Оборачивает распределитель в InstrumentedDistributor, если enabled;
+    иначе возвращает сам распределитель без изменений.
+    """
+    return InstrumentedDistributor(distributor) if enabled else distributor
@@ -1,47 +1,12 @@
 from node import Server
 from distributor import RoundRobin, WeightedRoundRobin, WeightedRoundRobinStatic, LeastConnection, WeightedLeastConnection
+from simulation import run_simulation
+from results_export import save_servers_to_csv, save_instrumentation_to_csv
+from instrumentation import instrument
 import random
-import csv
 from typing import List, Dict
 
 
-def save_servers_to_csv(servers, filename: str):
-    """
-    Сохраняет данные серверов в CSV файл
-
-    :param servers: Список словарей с данными серверов
-    :param filename: Имя файла для сохранения
-    """
-    headers = [
-        'Node',
-        'Power Load (%)',
-        'Network Load (%)',
-        'Tasks Load (pieces)',
-        'Work time (sec)',
-        'Total Calculated Tasks'
-    ]
-
-    with open(filename, mode='w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=headers)
-        writer.writeheader()
-
-        for server in servers:
-            # Рассчитываем средневзвешенные значения
-            weighted_load = sum(server.cpu_load_history) / len(server.cpu_load_history) if server.cpu_load_history else 0
-            weighted_network = sum(server.network_load_history) / len(server.network_load_history) if server.network_load_history else 0
-            weighted_tasks = sum(server.tasks_history) / len(server.tasks_history) if server.tasks_history else 0
-
-            writer.writerow({
-                'Node': server.server_id,
-                'Power Load (%)': round(weighted_load, 4),
-                'Network Load (%)': round(weighted_network, 4),
-                'Tasks Load (pieces)': round(weighted_tasks, 4),
-                'Work time (sec)': round(server.total_work_time),
-                'Total Calculated Tasks': server.processed_tasks
-            })
-
-
-
 def simulate_cpu_load(task_duration, tasks_per_second, simulation_time):
     """
     Рассчитывает нагрузку CPU с учетом отброшенных задач.
@@ -155,6 +120,8 @@ if __name__ == "__main__":
     task_size = 500
     tasks_per_second = 736  # 5 задач в секунду
     simulation_time = 120  # симулируем 10 секунд
+    fast_forward = True
+    measure_latency = False     # замерять время каждого решения распределителя (медленнее, без fast_forward)
 
     # task_time, task_size, tasks_per_second
     # 6 : 3 : 1
@@ -164,36 +131,11 @@ if __name__ == "__main__":
     #tasks = [[0.02, 200, 225], [0.02, 200, 225], [0.02, 200, 225]]
     # servers = [Server(server_id=1, bu_power=1, bandwidth_bytes=1000),
 
-    distributor = LeastConnection(servers)
-
-    for server in servers:
-        server.reset_for_new_second()
-    task_num = 1
-    for i in range(1, simulation_time+1):
-
-        # for task_type in tasks:
-        #     task_num += 1
-        #     task_time, task_size, tasks_per_second = task_type
-        #     for _ in range(tasks_per_second):
-        #         distributor.distribute_task(task_time, task_size)
+    distributor = instrument(LeastConnection(servers), enabled=measure_latency)
 
-        for task in range(tasks_per_second):
-            distributor.distribute_task(task_time, task_size)
-
-
-        # if type(distributor).__name__ == "LeastConnection" and (i % 2 == 0):
-        #     # потому что если обновлться каждое изменение подключений, то распредлеление будет идти косо
-        #     distributor.updated_nodes_connections(servers)
-
-
-
-        for server in servers:
-            server.reset_for_new_second()
-
-    for server in servers:
-        server.cpu_load_history.pop()
-        server.network_load_history.pop()
-        server.tasks_history.pop()
+    # fast_forward=False - полностью проигрывать каждую секунду (для проверки)
+    run_simulation(distributor, servers, [task_time] * tasks_per_second, [task_size] * tasks_per_second,
+                   simulation_time, fast_forward=fast_forward and not measure_latency)
 
 
     for server in servers:
@@ -208,9 +150,11 @@ if __name__ == "__main__":
 
         print("-"*60)
         print(f"Решено задач: {server.processed_tasks}")
-        print(f"Отклонено задач конкретно этим сервером: {server.dropped_tasks}")
-        print(f"Средняя загрузка сервера: {sum(server.cpu_load_history) / len(server.cpu_load_history)}")
-        print(f"Средняя загрузка сети сервера: {sum(server.network_load_history) / len(server.network_load_history)}")
+        # отказы отдельных серверов считают только распределители, которые предлагают задачу одному серверу
+        if distributor.records_node_refusals:
+            print(f"Отклонено задач конкретно этим сервером: {server.dropped_tasks}")
+        print(f"Средняя загрузка сервера: {server.cpu_stats.mean}")
+        print(f"Средняя загрузка сети сервера: {server.network_stats.mean}")
         print(f"Время работы: {server.total_work_time}")
         print("-" * 60)
 
@@ -227,30 +171,18 @@ if __name__ == "__main__":
                  "WeightedRoundRobin": "WRR.csv",
                  "LeastConnection": "LC.csv",
                  "WeightedLeastConnection": "WLC.csv"}
-    res_csv_name = csv_names[type(distributor).__name__]
+    distributor_name = type(getattr(distributor, 'distributor', distributor)).__name__
+    res_csv_name = csv_names[distributor_name]
     save_servers_to_csv(servers, folder_path + res_csv_name)
+    if measure_latency:
+        save_instrumentation_to_csv(distributor, folder_path + res_csv_name.replace(".csv", "_latency.csv"))
+        distributor.uninstall()
     #print(servers[-1].cpu_load_history)
 
 
-    servers_load = []
-    for server in servers:
-        weighted_load = sum(server.cpu_load_history) / len(server.cpu_load_history) if server.cpu_load_history else 0
-        weighted_network = sum(server.network_load_history) / len(server.network_load_history) if server.network_load_history else 0
-        weighted_tasks = sum(server.tasks_history) / len(server.tasks_history) if server.tasks_history else 0
-        servers_load.append(weighted_load)
-
-
-    def calculate_std_dev(data):
-        if len(data) == 0:
-            return 0  # Возвращаем 0 для пустого списка
-
-        mean = sum(data) / len(data)  # Вычисляем среднее
-        variance = sum((x - mean) ** 2 for x in data) / len(data)  # Вычисляем дисперсию
-        std_dev = variance ** 0.5  # Стандартное отклонение - это корень из дисперсии
-        return std_dev
+    servers_load = [float(server.cpu_stats.mean) for server in servers]
 
     print("Servers load from 1 to 12: ", servers_load)
     import numpy as np
     std_dev = np.std(servers_load)
     print(f"Стандартное отклонение: {std_dev}")
-    print(f"Стандартное отклонение: {calculate_std_dev(servers_load)}")
\ No newline at end of file
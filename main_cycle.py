@@ -1,109 +1,10 @@
 from node import Server
 from distributor import RoundRobin, WeightedRoundRobin, WeightedRoundRobinStatic, LeastConnection, WeightedLeastConnection
+from simulation import run_simulation
+from workload import MIX_6_3_1, PatternTasks
 import random
-import csv
 from typing import List, Dict
-import os
-import pandas as pd
-from openpyxl import Workbook
-
-
-def transfer_data_from_csv_to_exel(config):
-    # Базовая папка с результатами
-    base_folder = f"results/configuration_{config}/"
-
-    # Создаем Excel-файл
-    output_file = base_folder + "/experiment_results.xlsx"
-
-    # Создаем новый Workbook
-    wb = Workbook()
-    ws = wb.active
-
-    # Записываем название папки configuration_2 в ячейку A1
-    ws.cell(row=1, column=1, value=base_folder)
-
-    # Начальная колонка для размещения данных
-    start_columns = [1, 8, 15, 22, 29]  # Колонки A, H, N, T (2, 8, 14, 20 в индексации openpyxl)
-
-    # Запись текстовых меток в ячейки A2, G2, M2, S2
-    labels = ["RR", "WRRs", "WRR", "LC", "WLC"]
-    label_columns = [1, 8, 15, 22, 29]  # Колонки A, G, M, S (1, 7, 13, 19 в индексации openpyxl)
-    for col_idx, label in zip(label_columns, labels):
-        ws.cell(row=2, column=col_idx, value=label)
-
-    # Чтение всех CSV-файлов в базовой папке
-    csv_files = [f for f in os.listdir(base_folder) if f.endswith('.csv')]
-    if not csv_files:
-        print(f"В папке '{base_folder}' нет CSV-файлов.")
-    else:
-        # Разделяем файлы по меткам (RR, WRR, LC, WLC)
-        file_groups = {label: [] for label in labels}
-        for csv_file in csv_files:
-            for label in labels:
-                # Проверяем точное соответствие метки началу имени файла
-                if csv_file.startswith(label):
-                    file_groups[label].append(csv_file)
-                    break  # Переходим к следующему файлу после нахождения соответствия
-
-        # Обработка файлов для каждой метки
-        for label, start_col in zip(labels, start_columns):
-            if not file_groups[label]:
-                print(f"Нет CSV-файлов для метки '{label}'.")
-                continue
-
-            # Берем первый CSV-файл из группы
-            csv_file = os.path.join(base_folder, file_groups[label][0])
-            df = pd.read_csv(csv_file)
-
-            # Запись данных в Excel (начинаем с строки 4)
-            for row_idx, row in enumerate(df.values, start=4):  # Сдвиг на две строки вниз
-                for col_idx, value in enumerate(row, start=start_col):
-                    ws.cell(row=row_idx, column=col_idx, value=value)
-
-            # Запись заголовков (сдвиг на две строки вниз)
-            for col_idx, header in enumerate(df.columns, start=start_col):
-                ws.cell(row=3, column=col_idx, value=header)  # Заголовки пишутся в строке 3
-
-    # Сохраняем Excel-файл
-    wb.save(output_file)
-    print(f"Файл '{output_file}' успешно создан.")
-
-
-def save_servers_to_csv(servers, filename: str):
-    """
-    Сохраняет данные серверов в CSV файл
-
-    :param servers: Список словарей с данными серверов
-    :param filename: Имя файла для сохранения
-    """
-    headers = [
-        'Node',
-        'Power Load (%)',
-        'Network Load (%)',
-        'Tasks Load (pieces)',
-        'Work time (sec)',
-        'Total Calculated Tasks'
-    ]
-
-    with open(filename, mode='w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=headers)
-        writer.writeheader()
-
-        for server in servers:
-            # Рассчитываем средневзвешенные значения
-            weighted_load = sum(server.cpu_load_history) / len(server.cpu_load_history) if server.cpu_load_history else 0
-            weighted_network = sum(server.network_load_history) / len(server.network_load_history) if server.network_load_history else 0
-            weighted_tasks = sum(server.tasks_history) / len(server.tasks_history) if server.tasks_history else 0
-
-            writer.writerow({
-                'Node': server.server_id,
-                'Power Load (%)': round(weighted_load, 4),
-                'Network Load (%)': round(weighted_network, 4),
-                'Tasks Load (pieces)': round(weighted_tasks, 4),
-                'Work time (sec)': round(server.total_work_time),
-                'Total Calculated Tasks': server.processed_tasks
-            })
-
+from results_export import LABELS, server_rows, save_servers_to_csv, write_results_workbook
 
 
 def simulate_cpu_load(task_duration, tasks_per_second, simulation_time):
@@ -206,17 +107,9 @@ configurations = {
 
 
 def generate_repeating_task_list(total_tasks):
-    # Базовый паттерн
-    pattern = [0.02] * 6 + [0.1] * 3 + [0.28] * 1
-
-    # Вычисляем количество полных паттернов и остаток
-    full_patterns = total_tasks // len(pattern)
-    remainder = total_tasks % len(pattern)
-
-    # Формируем итоговый список
-    task_list = pattern * full_patterns + pattern[:remainder]
-
-    return task_list
+    # Базовый паттерн 6 : 3 : 1 (workload.MIX_6_3_1), одна секунда задач
+    task_times, _ = PatternTasks(MIX_6_3_1).generate(total_tasks, 0, None)
+    return task_times.tolist()
 
 
 # Пример использования
@@ -239,6 +132,7 @@ if __name__ == "__main__":
 
     # tasks_per_second = 184  # 5 задач в секунду
     simulation_time = 120  # симулируем 10 секунд
+    fast_forward = True
 
     # task_time, task_size, tasks_per_second
     # 6 : 3 : 1
@@ -257,40 +151,14 @@ if __name__ == "__main__":
                     LeastConnection(servers),
                     WeightedLeastConnection(servers)]
 
-    for distributor in distributors:
-        for server in servers:
-            server.reset_for_new_second()
-        task_num = 1
-        for i in range(1, simulation_time+1):
-
-            # for task_type in tasks:
-            #     task_num += 1
-            #     task_time, task_size, tasks_per_second = task_type
-            #     for _ in range(tasks_per_second):
-            #         distributor.distribute_task(task_time, task_size)
-
-            # for task in range(tasks_per_second):
-            #     distributor.distribute_task(task_time, task_size)
+    # итоговые строки по нодам для Excel, собираются до server.reset()
+    results = {}
 
-
-            # специально для 3 эксперимента такой обход:
-            for task in tasks:
-                distributor.distribute_task(task_time, task_size)
-
-
-            if type(distributor).__name__ == "LeastConnection" and (i % 2 == 0):
-                # потому что если обновлться каждое изменение подключений, то распредлеление будет идти косо
-                distributor.updated_nodes_connections(servers)
-
-
-
-            for server in servers:
-                server.reset_for_new_second()
-
-        for server in servers:
-            server.cpu_load_history.pop()
-            server.network_load_history.pop()
-            server.tasks_history.pop()
+    for distributor in distributors:
+        # специально для 3 эксперимента: задач столько же, сколько в tasks, но все с временем task_time
+        # fast_forward=False - полностью проигрывать каждую секунду (для проверки)
+        run_simulation(distributor, servers, [task_time] * len(tasks), [task_size] * len(tasks),
+                       simulation_time, fast_forward=fast_forward)
 
 
         for server in servers:
@@ -305,9 +173,11 @@ if __name__ == "__main__":
 
             print("-"*60)
             print(f"Решено задач: {server.processed_tasks}")
-            print(f"Отклонено задач конкретно этим сервером: {server.dropped_tasks}")
-            print(f"Средняя загрузка сервера: {sum(server.cpu_load_history) / len(server.cpu_load_history)}")
-            print(f"Средняя загрузка сети сервера: {sum(server.network_load_history) / len(server.network_load_history)}")
+            # отказы отдельных серверов считают только распределители, которые предлагают задачу одному серверу
+            if distributor.records_node_refusals:
+                print(f"Отклонено задач конкретно этим сервером: {server.dropped_tasks}")
+            print(f"Средняя загрузка сервера: {server.cpu_stats.mean}")
+            print(f"Средняя загрузка сети сервера: {server.network_stats.mean}")
             print(f"Время работы: {server.total_work_time}")
             print("-" * 60)
 
@@ -326,33 +196,18 @@ if __name__ == "__main__":
                      "WeightedLeastConnection": "WLC.csv"}
         res_csv_name = csv_names[type(distributor).__name__]
         save_servers_to_csv(servers, folder_path + res_csv_name)
+        results[LABELS.get(type(distributor).__name__, type(distributor).__name__)] = server_rows(servers)
         #print(servers[-1].cpu_load_history)
 
 
-        servers_load = []
-        for server in servers:
-            weighted_load = sum(server.cpu_load_history) / len(server.cpu_load_history) if server.cpu_load_history else 0
-            weighted_network = sum(server.network_load_history) / len(server.network_load_history) if server.network_load_history else 0
-            weighted_tasks = sum(server.tasks_history) / len(server.tasks_history) if server.tasks_history else 0
-            servers_load.append(weighted_load)
-
-
-        def calculate_std_dev(data):
-            if len(data) == 0:
-                return 0  # Возвращаем 0 для пустого списка
-
-            mean = sum(data) / len(data)  # Вычисляем среднее
-            variance = sum((x - mean) ** 2 for x in data) / len(data)  # Вычисляем дисперсию
-            std_dev = variance ** 0.5  # Стандартное отклонение - это корень из дисперсии
-            return std_dev
+        servers_load = [float(server.cpu_stats.mean) for server in servers]
 
         print("Servers load from 1 to 12: ", servers_load)
         import numpy as np
         std_dev = np.std(servers_load)
         print(f"Стандартное отклонение: {std_dev}")
-        print(f"Стандартное отклонение: {calculate_std_dev(servers_load)}")
 
         for server in servers:
             server.reset()
 
-    transfer_data_from_csv_to_exel(config)
\ No newline at end of file
+    write_results_workbook(folder_path + "experiment_results.xlsx", {"Sheet": (folder_path, results)})
\ No newline at end of file
@@ -1,111 +1,11 @@
 from node import Server
-from distributor import RoundRobin, WeightedRoundRobin, WeightedRoundRobinStatic, LeastConnection, WeightedLeastConnection
+from sweep import DISTRIBUTORS, make_jobs, run_sweep
+from result_cache import ResultCache
+import sys
 import random
-import csv
 from typing import List, Dict
 import os
-import pandas as pd
-from openpyxl import Workbook
-
-
-def transfer_data_from_csv_to_exel(config, task_frequency_name):
-    # Базовая папка с результатами
-    base_folder = f"results/experiment_1/configuration_{config}/{task_frequency_name}/"
-
-    #folder_path = f"results/experiment_1/configuration_{config}/{task_frequency_name}/"
-
-    # Создаем Excel-файл
-    output_file = base_folder + "/experiment_results.xlsx"
-
-    # Создаем новый Workbook
-    wb = Workbook()
-    ws = wb.active
-
-    # Записываем название папки configuration_2 в ячейку A1
-    ws.cell(row=1, column=1, value=base_folder)
-
-    # Начальная колонка для размещения данных
-    start_columns = [1, 8, 15, 22, 29]  # Колонки A, H, N, T (2, 8, 14, 20 в индексации openpyxl)
-
-    # Запись текстовых меток в ячейки A2, G2, M2, S2
-    labels = ["RR", "WRRs", "WRR", "LC", "WLC"]
-    label_columns = [1, 8, 15, 22, 29]  # Колонки A, G, M, S (1, 7, 13, 19 в индексации openpyxl)
-    for col_idx, label in zip(label_columns, labels):
-        ws.cell(row=2, column=col_idx, value=label)
-
-    # Чтение всех CSV-файлов в базовой папке
-    csv_files = [f for f in os.listdir(base_folder) if f.endswith('.csv')]
-    if not csv_files:
-        print(f"В папке '{base_folder}' нет CSV-файлов.")
-    else:
-        # Разделяем файлы по меткам (RR, WRR, LC, WLC)
-        file_groups = {label: [] for label in labels}
-        for csv_file in csv_files:
-            for label in labels:
-                # Проверяем точное соответствие метки началу имени файла
-                if csv_file.startswith(label):
-                    file_groups[label].append(csv_file)
-                    break  # Переходим к следующему файлу после нахождения соответствия
-
-        # Обработка файлов для каждой метки
-        for label, start_col in zip(labels, start_columns):
-            if not file_groups[label]:
-                print(f"Нет CSV-файлов для метки '{label}'.")
-                continue
-
-            # Берем первый CSV-файл из группы
-            csv_file = os.path.join(base_folder, file_groups[label][0])
-            df = pd.read_csv(csv_file)
-
-            # Запись данных в Excel (начинаем с строки 4)
-            for row_idx, row in enumerate(df.values, start=4):  # Сдвиг на две строки вниз
-                for col_idx, value in enumerate(row, start=start_col):
-                    ws.cell(row=row_idx, column=col_idx, value=value)
-
-            # Запись заголовков (сдвиг на две строки вниз)
-            for col_idx, header in enumerate(df.columns, start=start_col):
-                ws.cell(row=3, column=col_idx, value=header)  # Заголовки пишутся в строке 3
-
-    # Сохраняем Excel-файл
-    wb.save(output_file)
-    print(f"Файл '{output_file}' успешно создан.")
-
-
-def save_servers_to_csv(servers, filename: str):
-    """
-    Сохраняет данные серверов в CSV файл
-
-    :param servers: Список словарей с данными серверов
-    :param filename: Имя файла для сохранения
-    """
-    headers = [
-        'Node',
-        'Power Load (%)',
-        'Network Load (%)',
-        'Tasks Load (pieces)',
-        'Work time (sec)',
-        'Total Calculated Tasks'
-    ]
-
-    with open(filename, mode='w', newline='') as file:
-        writer = csv.DictWriter(file, fieldnames=headers)
-        writer.writeheader()
-
-        for server in servers:
-            # Рассчитываем средневзвешенные значения
-            weighted_load = sum(server.cpu_load_history) / len(server.cpu_load_history) if server.cpu_load_history else 0
-            weighted_network = sum(server.network_load_history) / len(server.network_load_history) if server.network_load_history else 0
-            weighted_tasks = sum(server.tasks_history) / len(server.tasks_history) if server.tasks_history else 0
-
-            writer.writerow({
-                'Node': server.server_id,
-                'Power Load (%)': round(weighted_load, 4),
-                'Network Load (%)': round(weighted_network, 4),
-                'Tasks Load (pieces)': round(weighted_tasks, 4),
-                'Work time (sec)': round(server.total_work_time),
-                'Total Calculated Tasks': server.processed_tasks
-            })
-
+from results_export import save_servers_to_csv, sweep_sheets, write_results_workbook
 
 
 def simulate_cpu_load(task_duration, tasks_per_second, simulation_time):
@@ -224,128 +124,80 @@ tasks_frequency_names = {183: "low", 184: "low", 175: "low", 265: "low",
 task_time = 0.02  # каждая задача выполняется 0.3 секунды
 task_size = 500
 simulation_time = 120  # симулируем 10 секунд
+fast_forward = True  # False - полностью проигрывать каждую секунду (для проверки)
+workers = None  # число процессов для перебора; None - по числу ядер, 1 - без отдельных процессов
+use_cache = "--no-cache" not in sys.argv  # --no-cache - пересчитать все ячейки, не читая кэш
+
+distributor_names = ["RoundRobin",
+                     "WeightedRoundRobin",
+                     "WeightedRoundRobinStatic",
+                     "LeastConnection",
+                     "WeightedLeastConnection"]
 
 # Пример использования
 if __name__ == "__main__":
 
-    for config in configurations.keys():
-
-        for tasks_per_second in tasks_frequency[config]:
-
-            task_frequency_name = tasks_frequency_names[tasks_per_second]
-            folder_path = f"results/experiment_1/configuration_{config}/{task_frequency_name}/"
-            servers = configurations[config] #[::-1]
+    # каждое задание (конфигурация, частота, распределитель) считается на своём пуле серверов
+    jobs = make_jobs(configurations, tasks_frequency, distributor_names,
+                     task_time, task_size, simulation_time, fast_forward=fast_forward)
+    # неизменённые ячейки (те же серверы, нагрузка, код распределителя) берутся из кэша
+    cache = ResultCache("results/cache/") if use_cache else None
+    results = run_sweep(jobs, workers=workers, cache=cache)
 
-            #tasks_per_second = 56  # 5 задач в секунду
+    for result in results:
+        config = result['job']['config']
+        tasks_per_second = result['job']['tasks_per_second']
+        task_frequency_name = tasks_frequency_names[tasks_per_second]
+        folder_path = f"results/experiment_1/configuration_{config}/{task_frequency_name}/"
+        servers = result['servers']
 
-            # task_time, task_size, tasks_per_second
-            # 6 : 3 : 1
-            # 0.02 0.1 0.28
-
-            #tasks = [[0.02, 500, 220], [0.02, 500, 110], [0.02, 500, 36]]
-            #tasks = [[0.02, 500, 221], [0.02, 500, 111], [0.02, 500, 37]]
-            #tasks = [[0.02, 500, 210], [0.02, 500, 105], [0.02, 500, 35]]
-            #tasks = [[0.02, 500, 318], [0.02, 500, 159], [0.02, 500, 53]]
-            # servers = [Server(server_id=1, bu_power=1, bandwidth_bytes=1000),
-
-            distributor = WeightedRoundRobin(servers)
-            distributors = [RoundRobin(servers),
-                            WeightedRoundRobin(servers),
-                            WeightedRoundRobinStatic(servers),
-                            LeastConnection(servers),
-                            WeightedLeastConnection(servers)]
-
-            for distributor in distributors:
-                for server in servers:
-                    server.reset_for_new_second()
-                task_num = 1
-                for i in range(1, simulation_time+1):
-
-                    # for task_type in tasks:
-                    #     task_num += 1
-                    #     task_time, task_size, tasks_per_second = task_type
-                    #     for _ in range(tasks_per_second):
-                    #         distributor.distribute_task(task_time, task_size)
-
-                    for task in range(tasks_per_second):
-                        distributor.distribute_task(task_time, task_size)
-
-
-                    if type(distributor).__name__ == "LeastConnection" and (i % 2 == 0):
-                        # потому что если обновлться каждое изменение подключений, то распредлеление будет идти косо
-                        distributor.updated_nodes_connections(servers)
-
-
-
-                    for server in servers:
-                        server.reset_for_new_second()
-
-                for server in servers:
-                    server.cpu_load_history.pop()
-                    server.network_load_history.pop()
-                    server.tasks_history.pop()
-
-
-                for server in servers:
-                    print(f"Server_{server.server_id}")
-                    #print(f"{'Секунда':<10}{'Нагрузка':<10}{'Нагрузка сети':<10}{'Задач решено':<5}")
-                    # for i in range(len(server.cpu_load_history)-1):
-                    #     load = round(server.cpu_load_history[i], 4)
-                    #     network_load = round(server.network_load_history[i], 4)
-                    #     tasks = server.tasks_history[i]
-                    #
-                    #     print(f"{i+1:<10}{load:<10.1f}{network_load:<16.1f}{tasks:<5}")
-
-                    print("-"*60)
-                    print(f"Решено задач: {server.processed_tasks}")
-                    print(f"Отклонено задач конкретно этим сервером: {server.dropped_tasks}")
-                    print(f"Средняя загрузка сервера: {sum(server.cpu_load_history) / len(server.cpu_load_history)}")
-                    print(f"Средняя загрузка сети сервера: {sum(server.network_load_history) / len(server.network_load_history)}")
-                    print(f"Время работы: {server.total_work_time}")
-                    print("-" * 60)
-
-                total_calculated = sum(server.processed_tasks for server in servers)
-                total_rejected = sum(server.dropped_tasks for server in servers)
-                total_generated_tasks = tasks_per_second * simulation_time
-                print(f"Всего создано задач: {total_generated_tasks}\n"
-                      f"Всего решено: {total_calculated}\n"
-                      f"Всего отклонено: {distributor.rejected_tasks}")
-
-
-                csv_names = {"RoundRobin": "RR.csv",
-                             "WeightedRoundRobinStatic": "WRRs.csv",
-                             "WeightedRoundRobin": "WRR.csv",
-                             "LeastConnection": "LC.csv",
-                             "WeightedLeastConnection": "WLC.csv"}
-                res_csv_name = csv_names[type(distributor).__name__]
-                save_servers_to_csv(servers, folder_path + res_csv_name)
-                #print(servers[-1].cpu_load_history)
-
-
-                servers_load = []
-                for server in servers:
-                    weighted_load = sum(server.cpu_load_history) / len(server.cpu_load_history) if server.cpu_load_history else 0
-                    weighted_network = sum(server.network_load_history) / len(server.network_load_history) if server.network_load_history else 0
-                    weighted_tasks = sum(server.tasks_history) / len(server.tasks_history) if server.tasks_history else 0
-                    servers_load.append(weighted_load)
-
-
-                def calculate_std_dev(data):
-                    if len(data) == 0:
-                        return 0  # Возвращаем 0 для пустого списка
-
-                    mean = sum(data) / len(data)  # Вычисляем среднее
-                    variance = sum((x - mean) ** 2 for x in data) / len(data)  # Вычисляем дисперсию
-                    std_dev = variance ** 0.5  # Стандартное отклонение - это корень из дисперсии
-                    return std_dev
-
-                print("Servers load from 1 to 12: ", servers_load)
-                import numpy as np
-                std_dev = np.std(servers_load)
-                print(f"Стандартное отклонение: {std_dev}")
-                print(f"Стандартное отклонение: {calculate_std_dev(servers_load)}")
-
-                for server in servers:
-                    server.reset()
-
-            transfer_data_from_csv_to_exel(config, task_frequency_name)
\ No newline at end of file
+        for server in servers:
+            print(f"Server_{server.server_id}")
+            #print(f"{'Секунда':<10}{'Нагрузка':<10}{'Нагрузка сети':<10}{'Задач решено':<5}")
+            # for i in range(len(server.cpu_load_history)-1):
+            #     load = round(server.cpu_load_history[i], 4)
+            #     network_load = round(server.network_load_history[i], 4)
+            #     tasks = server.tasks_history[i]
+            #
+            #     print(f"{i+1:<10}{load:<10.1f}{network_load:<16.1f}{tasks:<5}")
+
+            print("-"*60)
+            print(f"Решено задач: {server.processed_tasks}")
+            # отказы отдельных серверов считают только распределители, которые предлагают задачу одному серверу
+            if DISTRIBUTORS[result['job']['distributor']].records_node_refusals:
+                print(f"Отклонено задач конкретно этим сервером: {server.dropped_tasks}")
+            print(f"Средняя загрузка сервера: {server.cpu_stats.mean}")
+            print(f"Средняя загрузка сети сервера: {server.network_stats.mean}")
+            print(f"Время работы: {server.total_work_time}")
+            print("-" * 60)
+
+        total_calculated = sum(server.processed_tasks for server in servers)
+        total_rejected = sum(server.dropped_tasks for server in servers)
+        total_generated_tasks = tasks_per_second * simulation_time
+        print(f"Всего создано задач: {total_generated_tasks}\n"
+              f"Всего решено: {total_calculated}\n"
+              f"Всего отклонено: {result['rejected_tasks']}")
+
+
+        csv_names = {"RoundRobin": "RR.csv",
+                     "WeightedRoundRobinStatic": "WRRs.csv",
+                     "WeightedRoundRobin": "WRR.csv",
+                     "LeastConnection": "LC.csv",
+                     "WeightedLeastConnection": "WLC.csv"}
+        res_csv_name = csv_names[result['job']['distributor']]
+        if not (result['cached'] and os.path.exists(folder_path + res_csv_name)):
+            save_servers_to_csv(servers, folder_path + res_csv_name)
+        #print(servers[-1].cpu_load_history)
+
+
+        servers_load = [float(server.cpu_stats.mean) for server in servers]
+
+        print("Servers load from 1 to 12: ", servers_load)
+        import numpy as np
+        std_dev = np.std(servers_load)
+        print(f"Стандартное отклонение: {std_dev}")
+
+    # одна книга на весь перебор: лист на каждую пару конфигурация/частота, данные берутся из памяти
+    sheets = sweep_sheets(results, lambda config, tasks_per_second:
+                          f"configuration_{config}_{tasks_frequency_names[tasks_per_second]}")
+    write_results_workbook("results/experiment_1/experiment_results.xlsx", sheets)
@@ -0,0 +1,143 @@
+import numpy as np
+
+
+class NullSink:
+    """Приёмник, который ничего не сохраняет (когда нужны только счетчики нод)."""
+
+    def push(self, second: int, cpu, network, tasks):
+        """
+        Принимает значения одной секунды по всем нодам.
+
+        :param second: Номер секунды (с 0).
+        :param cpu: Загрузка CPU нод (%).
+        :param network: Загрузка сети нод (%).
+        :param tasks: Число задач нод за секунду.
+        """
+
+    def close(self):
+        """Завершает приём (вызывается в конце симуляции)."""
+
+
+class AggregatingSink(NullSink):
+    """
+    Накапливает суммы по секундам и считает средние по нодам без хранения историй.
+    Суммы складываются по секундам в том же порядке, что и sum(history), поэтому средние
+    совпадают со средними по истории node.Server.
+    """
+
+    def __init__(self):
+        self.seconds = 0
+        self.totals = None
+
+    def push(self, second: int, cpu, network, tasks):
+        if self.totals is None:
+            self.totals = {'cpu': np.zeros(len(cpu)), 'network': np.zeros(len(cpu)),
+                           'tasks': np.zeros(len(cpu), dtype=np.int64)}
+        self.totals['cpu'] += cpu
+        self.totals['network'] += network
+        self.totals['tasks'] += tasks
+        self.seconds += 1
+
+    def summary(self) -> dict:
+        """
+        Средние по секундам значения нод.
+
+        :return: {'cpu', 'network', 'tasks'} -> массивы средних (пустые, если секунд не было).
+        """
+        if self.totals is None:
+            return {'cpu': np.zeros(0), 'network': np.zeros(0), 'tasks': np.zeros(0)}
+        return {name: total / self.seconds for name, total in self.totals.items()}
+
+
+class ChunkedFileSink(NullSink):
+    """
+    Записывает значения по секундам в файл порциями по chunk_seconds секунд,
+    так что память не зависит от длительности симуляции.
+
+    Форматы:
+    - 'csv' - строки second,node,cpu,network,tasks;
+    - 'binary' - записи record_dtype(n) подряд (по одной на секунду),
+      читаются через np.fromfile(filename, dtype=ChunkedFileSink.record_dtype(n)) или np.memmap.
+
+    :param filename: Имя файла.
+    :param server_ids: Номера нод (для столбца node в CSV), по умолчанию 1..n.
+    :param chunk_seconds: Сколько секунд накапливать перед записью.
+    :param file_format: 'csv' или 'binary'.
+    """
+
+    def __init__(self, filename: str, server_ids=None, chunk_seconds: int = 1024, file_format: str = 'csv'):
+        if file_format not in ('csv', 'binary'):
+            raise ValueError(f"Неизвестный формат: {file_format}")
+        self.filename = filename
+        self.server_ids = None if server_ids is None else np.asarray(server_ids, dtype=np.int64)
+        self.chunk_seconds = chunk_seconds
+        self.file_format = file_format
+        self._file = open(filename, 'w' if file_format == 'csv' else 'wb')
+        if file_format == 'csv':
+            self._file.write("second,node,cpu,network,tasks\n")
+        self._chunk = None
+        self._filled = 0
+
+    @staticmethod
+    def record_dtype(n: int) -> np.dtype:
+        """Тип одной записи двоичного файла: номер секунды и значения n нод."""
+        return np.dtype([('second', np.int64), ('cpu', np.float64, (n,)),
+                         ('network', np.float64, (n,)), ('tasks', np.int64, (n,))])
+
+    def push(self, second: int, cpu, network, tasks):
+        if self._chunk is None:
+            n = len(cpu)
+            if self.server_ids is None:
+                self.server_ids = np.arange(1, n + 1)
+            self._chunk = np.zeros(self.chunk_seconds, dtype=self.record_dtype(n))
+        record = self._chunk[self._filled]
+        record['second'] = second
+        record['cpu'] = cpu
+        record['network'] = network
+        record['tasks'] = tasks
+        self._filled += 1
+        if self._filled == self.chunk_seconds:
+            self.flush()
+
+    def flush(self):
+        """Дописывает накопленные секунды в файл."""
+        if not self._filled:
+            return
+        chunk = self._chunk[:self._filled]
+        if self.file_format == 'binary':
+            chunk.tofile(self._file)
+        else:
+            n = len(self.server_ids)
+            seconds = np.repeat(chunk['second'], n)
+            nodes = np.tile(self.server_ids, self._filled)
+            for row in zip(seconds.tolist(), nodes.tolist(), chunk['cpu'].ravel().tolist(),
+                           chunk['network'].ravel().tolist(), chunk['tasks'].ravel().tolist()):
+                self._file.write("%d,%d,%r,%r,%d\n" % row)
+        self._file.flush()
+        self._filled = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class MultiSink(NullSink):
+    """Передаёт значения сразу нескольким приёмникам (например, файл и средние)."""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def push(self, second: int, cpu, network, tasks):
+        for sink in self.sinks:
+            sink.push(second, cpu, network, tasks)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
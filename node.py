@@ -1,35 +1,68 @@
+from collections import deque
+
+from running_stats import ScalarRunningStatistics
+from structures import LogHistogram
+
+# корзины гистограмм времени пребывания задач (секунды): от 0.1 мс до 10^4 с, 100 корзин на порядок
+SOJOURN_RANGE = {'lowest': 1e-4, 'highest': 1e4, 'buckets_per_decade': 100}
+
 
 class Server:
     def __init__(self, server_id: int, bu_power: float,
-                 bandwidth_bytes: float = 0.0, failure_probability: float = 0.0, downtime_seconds: float =0.0):
+                 bandwidth_bytes: float = 0.0, failure_probability: float = 0.0, downtime_seconds: float =0.0,
+                 queue_capacity: int = None):
         """
         Класс вычислительной ноды.
 
         :param node_id: Номер ноды.
         :param compute_power_flops: Мощность ноды в FLOPS.
+        :param failure_probability: Вероятность отказа в каждую секунду работы (failures.FailureModel).
+        :param downtime_seconds: Сколько секунд сервер простаивает после отказа.
+        :param queue_capacity: Режим очереди: задача, которой не хватило ресурсов секунды, ждёт в очереди FIFO
+            не длиннее queue_capacity и выполняется в следующих секундах (drain_queue), а время пребывания
+            каждой задачи попадает в гистограмму sojourn. None - без очереди, задача отклоняется.
         """
         self.server_id = server_id
         self.bu_power = bu_power
         self.bandwidth_bytes = bandwidth_bytes
+        self.failure_probability = failure_probability
+        self.downtime_seconds = downtime_seconds
+        self.available = True       # False - сервер отказал и не принимает задачи до восстановления
         self.current_load = 0.0     # текущая нагрузка в секундах
         self.current_network_load_bytes = 0.0
+        self.queue_capacity = queue_capacity
+        self.queue = deque()        # ждущие задачи: (секунда прихода, сложность, объем)
+        self.sojourn = LogHistogram(**SOJOURN_RANGE) if queue_capacity is not None else None
 
         self.cpu_load_history = []
         self.network_load_history = []
         self.tasks_history = []
 
+        # потоковая статистика по завершённым секундам
+        self.cpu_stats = ScalarRunningStatistics()
+        self.network_stats = ScalarRunningStatistics()
+        self.tasks_stats = ScalarRunningStatistics()
+
         self.processed_tasks = 0
-        self.dropped_tasks = 0
+        self.dropped_tasks = 0  # отказы admit_task и полной очереди (см. records_node_refusals распределителей)
         self.total_work_time = 0
 
     def reset(self):
         self.current_load = 0.0  # текущая нагрузка в секундах
         self.current_network_load_bytes = 0.0
+        self.available = True
+        self.queue.clear()
+        if self.sojourn is not None:
+            self.sojourn = LogHistogram(**SOJOURN_RANGE)
 
         self.cpu_load_history = []
         self.network_load_history = []
         self.tasks_history = []
 
+        self.cpu_stats = ScalarRunningStatistics()
+        self.network_stats = ScalarRunningStatistics()
+        self.tasks_stats = ScalarRunningStatistics()
+
         self.processed_tasks = 0
         self.dropped_tasks = 0
         self.total_work_time = 0
@@ -38,12 +71,35 @@ class Server:
         return task_bu / self.bu_power
 
     def can_accept_task(self, task_compute_time: float, task_data_size: float) -> bool:
-        if (self.current_load + self.calc_tasks_execution_time(task_compute_time) <= 1 and
-        self.current_network_load_bytes + task_data_size <= self.bandwidth_bytes):
-            return True
-        else:
-            self.dropped_tasks += 1
+        """
+        Работает ли нода и хватает ли ей ресурсов на задачу (в режиме очереди - или места в очереди).
+        Проверка ничего не меняет - отказы считает admit_task.
+        """
+        if not self.available:
             return False
+        if self.queue_capacity is not None and len(self.queue) < self.queue_capacity:
+            return True
+        return not self.queue and self.fits(task_compute_time, task_data_size)
+
+    def fits(self, task_compute_time: float, task_data_size: float) -> bool:
+        """Хватает ли ресурсов текущей секунды на задачу."""
+        return (self.current_load + self.calc_tasks_execution_time(task_compute_time) <= 1 and
+                self.current_network_load_bytes + task_data_size <= self.bandwidth_bytes)
+
+    def has_queue_room(self) -> bool:
+        return self.queue_capacity is not None and len(self.queue) < self.queue_capacity
+
+    def admit_task(self, task_compute_time: float, task_data_size: float) -> bool:
+        """
+        Допуск задачи на ноду: принимает её, если хватает ресурсов, иначе учитывает отказ в dropped_tasks.
+
+        :return: Принята ли задача.
+        """
+        if self.can_accept_task(task_compute_time, task_data_size):
+            self.add_task(task_compute_time, task_data_size)
+            return True
+        self.dropped_tasks += 1
+        return False
 
     def calculate_load(self):
         "Считаем нагрузку сервера в проценгтах за секунду"
@@ -53,6 +109,36 @@ class Server:
         return min(100.0, (self.current_network_load_bytes / self.bandwidth_bytes) * 100) if self.current_network_load_bytes > 0 else 0.0
 
     def add_task(self, task_compute_time, task_data_size):
+        if self.queue_capacity is not None:
+            if self.queue or not self.fits(task_compute_time, task_data_size):
+                if len(self.queue) >= self.queue_capacity:
+                    # очередь полна (задачу дали без проверки can_accept_task) - нода отказывает, как в admit_task
+                    self.dropped_tasks += 1
+                    return
+                # задачи выполняются по порядку прихода: пока очередь не пуста, новая встаёт в её конец
+                self.queue.append((len(self.tasks_history) - 1, task_compute_time, task_data_size))
+                return
+            self._run_task(task_compute_time, task_data_size)
+            self.sojourn.record(self.current_load)
+            return
+        self._run_task(task_compute_time, task_data_size)
+
+    def drain_queue(self):
+        """
+        Начало секунды: запускает задачи из головы очереди, пока им хватает ресурсов.
+        Все задачи секунды приходят в её начале и выполняются нодой по очереди, поэтому время
+        пребывания задачи - число секунд ожидания плюс нагрузка ноды (секунды) после её выполнения.
+        """
+        if not self.available:
+            return
+        second = len(self.tasks_history) - 1
+        queue = self.queue
+        while queue and self.fits(queue[0][1], queue[0][2]):
+            arrived, task_compute_time, task_data_size = queue.popleft()
+            self._run_task(task_compute_time, task_data_size)
+            self.sojourn.record(second - arrived + self.current_load)
+
+    def _run_task(self, task_compute_time, task_data_size):
         self.current_load += self.calc_tasks_execution_time(task_compute_time)
         self.total_work_time += task_compute_time / self.bu_power
         self.current_network_load_bytes += task_data_size
@@ -63,7 +149,16 @@ class Server:
         self.cpu_load_history[-1] = self.current_load * 100
         self.network_load_history[-1] = self.calculate_network_load()
 
+    def update_statistics(self, cpu_load: float, network_load: float, tasks: int):
+        """Добавляет значения завершённой секунды в потоковую статистику."""
+        self.cpu_stats.update(cpu_load)
+        self.network_stats.update(network_load)
+        self.tasks_stats.update(tasks)
+
     def reset_for_new_second(self):
+        if self.tasks_stats.count < len(self.tasks_history):
+            # последняя секунда завершена и ещё не учтена - её значения попадают в статистику
+            self.update_statistics(self.cpu_load_history[-1], self.network_load_history[-1], self.tasks_history[-1])
         self.current_load = 0.0
         self.current_network_load_bytes = 0.0
 
@@ -73,7 +168,8 @@ class Server:
 
     def get_current_tasks_on_node(self):
         #print(self.tasks_history[-1])
-        return self.tasks_history[-1]
+        # ждущие в очереди задачи - тоже открытые подключения ноды
+        return self.tasks_history[-1] + len(self.queue)
 
 
 
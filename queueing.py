@@ -0,0 +1,68 @@
+from node import SOJOURN_RANGE
+from simulation import run_simulation
+from structures import LogHistogram
+
+# квантили времени отклика в отчётах
+QUANTILES = (0.5, 0.95, 0.99, 0.999)
+
+
+def sojourn_histogram(servers) -> LogHistogram:
+    """
+    Общая гистограмма времени пребывания задач - объединение гистограмм нод.
+
+    :param servers: Список node.Server в режиме очереди (queue_capacity не None).
+    """
+    histogram = LogHistogram(**SOJOURN_RANGE)
+    for server in servers:
+        if server.sojourn is not None:
+            histogram.merge(server.sojourn)
+    return histogram
+
+
+def response_times(servers, quantiles=QUANTILES) -> dict:
+    """
+    Время отклика по всем нодам (секунды): число выполненных задач, среднее, минимум, максимум
+    и квантили (p50, p95, p99, p99.9), а также сколько задач ещё ждёт в очередях.
+    """
+    result = sojourn_histogram(servers).summary(quantiles)
+    result['queued'] = sum(len(server.queue) for server in servers)
+    return result
+
+
+def node_response_times(servers, quantiles=QUANTILES) -> list:
+    """
+    Время отклика по нодам: строки с server_id, сводкой гистограммы ноды и длиной её очереди.
+    Ноды без режима очереди (queue_capacity None) пропускаются - время пребывания их задач не записывается.
+    """
+    rows = []
+    for server in servers:
+        if server.sojourn is None:
+            continue
+        row = {'server_id': server.server_id}
+        row.update(server.sojourn.summary(quantiles))
+        row['queued'] = len(server.queue)
+        rows.append(row)
+    return rows
+
+
+def response_time_report(variants, make_servers, task_times, task_sizes, simulation_time: int,
+                         quantiles=QUANTILES) -> list:
+    """
+    Сравнивает распределители по времени отклика: каждый прогоняется на новых серверах из make_servers().
+
+    :param variants: Тройки (имя, класс распределителя, параметры конструктора), как benchmark.VARIANTS.
+    :param make_servers: Функция без аргументов, возвращающая новый список node.Server с queue_capacity.
+    :param task_times: Вычислительная сложность задач одной секунды.
+    :param task_sizes: Объемы данных задач одной секунды (байты).
+    :param simulation_time: Длительность симуляции в секундах.
+    :return: Строки отчёта: квантили времени отклика, отклонённые задачи и оставшиеся в очередях.
+    """
+    rows = []
+    for name, distributor_class, options in variants:
+        servers = make_servers()
+        distributor = distributor_class(servers, **options)
+        run_simulation(distributor, servers, task_times, task_sizes, simulation_time)
+        row = {'distributor': name, 'rejected': distributor.rejected_tasks}
+        row.update(response_times(servers, quantiles))
+        rows.append(row)
+    return rows
@@ -0,0 +1,166 @@
+import ast
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import os
+import time
+
+import numpy as np
+
+from server_pool import ServerPool
+
+# модули, от которых зависит результат любого распределителя; их изменение сбрасывает весь кэш
+ENGINE_MODULES = ('node', 'server_pool', 'structures', 'simulation')
+
+
+@functools.lru_cache(maxsize=None)
+def module_helpers_source(module_name: str) -> str:
+    """Исходный код модуля без определений классов: импорты, функции и константы верхнего уровня."""
+    source = inspect.getsource(importlib.import_module(module_name))
+    return "\n".join(ast.get_source_segment(source, statement) for statement in ast.parse(source).body
+                     if not isinstance(statement, ast.ClassDef))
+
+
+@functools.lru_cache(maxsize=None)
+def source_hash(distributor_class) -> str:
+    """
+    Хэш исходного кода распределителя: сам класс, его базовые классы, всё остальное содержимое
+    их модулей (функции вроде distribute_each и build_capacity_tree, константы) и модули движка симуляции.
+    Правка одного распределителя меняет только его хэш.
+    """
+    digest = hashlib.sha256()
+    modules = []
+    for cls in distributor_class.__mro__:
+        if cls is not object:
+            digest.update(inspect.getsource(cls).encode())
+            if cls.__module__ not in modules:
+                modules.append(cls.__module__)
+    for name in modules:
+        digest.update(module_helpers_source(name).encode())
+    for name in ENGINE_MODULES:
+        digest.update(inspect.getsource(importlib.import_module(name)).encode())
+    return digest.hexdigest()
+
+
+def job_key(job: dict, distributor_class) -> str:
+    """
+    Стабильный ключ ячейки перебора: конфигурация серверов, параметры нагрузки,
+    распределитель (имя и хэш исходного кода) и длительность симуляции.
+    Номер конфигурации в ключ не входит - важны только параметры серверов.
+    """
+    description = {'servers': [[int(server_id), float(bu_power), float(bandwidth)]
+                                for server_id, bu_power, bandwidth in job['servers']],
+                   'task_time': float(job['task_time']),
+                   'task_size': float(job['task_size']),
+                   'tasks_per_second': int(job['tasks_per_second']),
+                   'distributor': job['distributor'],
+                   'source': source_hash(distributor_class),
+                   'simulation_time': int(job['simulation_time']),
+                   'fast_forward': bool(job['fast_forward']),
+                   'precision': job['precision'],
+                   'exact': bool(job['exact'])}
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Кэш результатов ячеек перебора на диске: один файл .npz на ключ job_key.
+
+    Хранит по-нодовые счетчики и истории, из которых восстанавливаются node.Server.
+    Запись атомарная (через временный файл), поэтому параллельные запуски не видят недописанных файлов.
+    Время изменения файла обновляется при каждом чтении, evict удаляет давно не использованные записи.
+
+    :param folder: Папка кэша.
+    :param max_age_seconds: Записи, не использованные дольше, удаляются (None - без ограничения).
+    :param max_bytes: Предельный размер кэша, сверх него удаляются самые старые записи (None - без ограничения).
+    """
+
+    def __init__(self, folder: str = "results/cache/", max_age_seconds: float = 30 * 24 * 3600,
+                 max_bytes: int = 1024 ** 3):
+        self.folder = folder
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.folder, key + ".npz")
+
+    def load(self, key: str):
+        """
+        Результат ячейки из кэша или None.
+
+        :return: Словарь с полями servers, rejected_tasks, simulated_seconds, period.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                pool = ServerPool(bu_power=data['bu_power'], bandwidth_bytes=data['bandwidth_bytes'],
+                                  server_ids=data['server_id'])
+                pool.extend_history(data['cpu'], data['network'], data['tasks'])
+                for cpu_row, network_row, tasks_row in zip(data['cpu'], data['network'], data['tasks']):
+                    pool.update_statistics(cpu_row, network_row, tasks_row)
+                pool.processed_tasks[:] = data['processed_tasks']
+                pool.dropped_tasks[:] = data['dropped_tasks']
+                pool.total_work_time[:] = data['total_work_time']
+                pool.current_load[:] = data['current_load']
+                pool.current_network_load_bytes[:] = data['current_network_load_bytes']
+                info = data['info'].tolist()
+        except (OSError, KeyError, ValueError):
+            return None
+        os.utime(path)
+        return {'servers': pool.to_servers(),
+                'rejected_tasks': info[0],
+                'simulated_seconds': info[1],
+                'period': info[2]}
+
+    def store(self, key: str, result: dict):
+        """Сохраняет результат run_job под ключом key."""
+        servers = result['servers']
+        arrays = {'server_id': np.array([server.server_id for server in servers], dtype=np.int64),
+                  'bu_power': np.array([server.bu_power for server in servers], dtype=np.float64),
+                  'bandwidth_bytes': np.array([server.bandwidth_bytes for server in servers], dtype=np.float64),
+                  'cpu': np.array([server.cpu_load_history for server in servers], dtype=np.float64).T,
+                  'network': np.array([server.network_load_history for server in servers], dtype=np.float64).T,
+                  'tasks': np.array([server.tasks_history for server in servers], dtype=np.int64).T,
+                  'processed_tasks': np.array([server.processed_tasks for server in servers], dtype=np.int64),
+                  'dropped_tasks': np.array([server.dropped_tasks for server in servers], dtype=np.int64),
+                  'total_work_time': np.array([server.total_work_time for server in servers], dtype=np.float64),
+                  'current_load': np.array([server.current_load for server in servers], dtype=np.float64),
+                  'current_network_load_bytes': np.array([server.current_network_load_bytes for server in servers],
+                                                         dtype=np.float64),
+                  'info': np.array([result['rejected_tasks'], result['simulated_seconds'], result['period']],
+                                   dtype=np.int64)}
+        path = self._path(key)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temporary_path, path)
+
+    def evict(self) -> int:
+        """
+        Удаляет записи старше max_age_seconds, затем самые давно использованные, пока кэш больше max_bytes.
+
+        :return: Сколько записей удалено.
+        """
+        entries = []
+        for name in os.listdir(self.folder):
+            if name.endswith(".npz"):
+                path = os.path.join(self.folder, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        removed = 0
+        now = time.time()
+        total_size = sum(size for _, size, _ in entries)
+        for modified, size, path in entries:
+            too_old = self.max_age_seconds is not None and now - modified > self.max_age_seconds
+            too_big = self.max_bytes is not None and total_size > self.max_bytes
+            if not (too_old or too_big):
+                continue
+            os.remove(path)
+            total_size -= size
+            removed += 1
+        return removed
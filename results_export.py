@@ -0,0 +1,216 @@
+import csv
+import os
+
+from openpyxl import Workbook
+
+# столбцы итоговой таблицы по нодам (CSV и Excel)
+HEADERS = ['Node',
+           'Power Load (%)',
+           'Network Load (%)',
+           'Tasks Load (pieces)',
+           'Work time (sec)',
+           'Total Calculated Tasks']
+
+# короткие метки распределителей в порядке блоков на листе Excel
+LABELS = {"RoundRobin": "RR",
+          "WeightedRoundRobinStatic": "WRRs",
+          "WeightedRoundRobin": "WRR",
+          "LeastConnection": "LC",
+          "WeightedLeastConnection": "WLC"}
+LABELS_ORDER = ["RR", "WRRs", "WRR", "LC", "WLC"]
+# распределители без короткой метки (LeastConnectionHeap, PowerOfDChoices, ...) подписываются именем класса
+BLOCK_WIDTH = 7     # блок распределителя - 6 столбцов данных и один пустой (A, H, O, V, AC)
+
+
+def server_rows(servers, averages: dict = None) -> list:
+    """
+    Итоговые строки по нодам: средние по секундам загрузки, работа и число решённых задач.
+
+    :param servers: Список node.Server (или ServerPool).
+    :param averages: Средние по секундам из metrics.AggregatingSink.summary();
+        по умолчанию берутся из потоковой статистики серверов (cpu_stats, ...).
+    :return: Строки в порядке HEADERS.
+    """
+    rows = []
+    for index, server in enumerate(servers):
+        if averages is not None:
+            weighted_load = averages['cpu'][index]
+            weighted_network = averages['network'][index]
+            weighted_tasks = averages['tasks'][index]
+        else:
+            # средние по секундам, без прохода по историям
+            weighted_load = server.cpu_stats.mean
+            weighted_network = server.network_stats.mean
+            weighted_tasks = server.tasks_stats.mean
+
+        rows.append([server.server_id,
+                     round(float(weighted_load), 4),
+                     round(float(weighted_network), 4),
+                     round(float(weighted_tasks), 4),
+                     round(server.total_work_time),
+                     server.processed_tasks])
+    return rows
+
+
+def save_servers_to_csv(servers, filename: str, averages: dict = None):
+    """
+    Сохраняет данные серверов в CSV файл
+
+    :param servers: Список серверов
+    :param filename: Имя файла для сохранения
+    :param averages: Средние по секундам из metrics.AggregatingSink, если истории не хранились
+    """
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(HEADERS)
+        writer.writerows(server_rows(servers, averages))
+
+
+def save_instrumentation_to_csv(instrumented, filename: str):
+    """
+    Сохраняет замеры instrumentation.InstrumentedDistributor в CSV файл:
+    сначала сводка (метрика, значение), после пустой строки - непустые корзины гистограммы
+    времени решения (границы в секундах).
+
+    :param instrumented: Обёрнутый распределитель.
+    :param filename: Имя файла для сохранения (например, рядом с LC.csv - LC_latency.csv)
+    """
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Metric', 'Value'])
+        writer.writerows(instrumented.summary().items())
+        writer.writerow([])
+        writer.writerow(['Latency from (sec)', 'Latency to (sec)', 'Decisions'])
+        writer.writerows(instrumented.latency.buckets())
+
+
+def _save_rows_to_csv(rows: list, filename: str):
+    """Сохраняет строки-словари в CSV файл, столбцы - ключи первой строки."""
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]) if rows else ['distributor'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def save_failure_report_to_csv(rows: list, filename: str):
+    """
+    Сохраняет отчёт об отказах (failures.failure_report) в CSV файл: строка на распределитель.
+
+    :param rows: Строки отчёта.
+    :param filename: Имя файла для сохранения
+    """
+    _save_rows_to_csv(rows, filename)
+
+
+def save_response_times_to_csv(rows: list, filename: str):
+    """
+    Сохраняет время отклика в CSV файл: строки queueing.response_time_report (по распределителям)
+    или queueing.node_response_times (по нодам).
+
+    :param rows: Строки отчёта.
+    :param filename: Имя файла для сохранения
+    """
+    _save_rows_to_csv(rows, filename)
+
+
+def sheet_rows(title: str, results: dict):
+    """
+    Строки листа с блоками распределителей бок о бок:
+    строка 1 - заголовок, 2 - метки распределителей, 3 - названия столбцов, с 4 - данные нод.
+
+    :param title: Текст ячейки A1.
+    :param results: Метка распределителя (RR, WRRs, ...) -> строки server_rows;
+        блоки прочих меток идут после пяти основных.
+    """
+    labels = LABELS_ORDER + [label for label in results if label not in LABELS_ORDER]
+    width = BLOCK_WIDTH * len(labels)
+    yield [title]
+
+    labels_row = [None] * width
+    headers_row = [None] * width
+    for block, label in enumerate(labels):
+        labels_row[block * BLOCK_WIDTH] = label
+        if label in results:
+            headers_row[block * BLOCK_WIDTH:block * BLOCK_WIDTH + len(HEADERS)] = HEADERS
+    yield labels_row
+    yield headers_row
+
+    height = max((len(rows) for rows in results.values()), default=0)
+    for row_index in range(height):
+        row = [None] * width
+        for block, label in enumerate(labels):
+            rows = results.get(label, [])
+            if row_index < len(rows):
+                values = rows[row_index]
+                row[block * BLOCK_WIDTH:block * BLOCK_WIDTH + len(values)] = values
+        yield row
+
+
+def write_results_workbook(output_file: str, sheets: dict):
+    """
+    Записывает книгу Excel в потоковом (write-only) режиме openpyxl: строки листа пишутся
+    целиком по одной, без хранения отдельных ячеек в памяти.
+
+    :param output_file: Имя файла .xlsx.
+    :param sheets: Имя листа -> (заголовок, {метка распределителя: строки server_rows}).
+    """
+    wb = Workbook(write_only=True)
+    for sheet_name, (title, results) in sheets.items():
+        ws = wb.create_sheet(title=sheet_name[:31])    # Excel ограничивает имя листа 31 символом
+        for row in sheet_rows(title, results):
+            ws.append(row)
+    wb.save(output_file)
+    print(f"Файл '{output_file}' успешно создан.")
+
+
+def sweep_sheets(results: list, sheet_name=None) -> dict:
+    """
+    Группирует результаты run_sweep в листы: один лист на пару (конфигурация, частота).
+
+    :param results: Результаты sweep.run_sweep.
+    :param sheet_name: Функция (config, tasks_per_second) -> имя листа.
+    :return: Словарь для write_results_workbook.
+    """
+    if sheet_name is None:
+        sheet_name = lambda config, tasks_per_second: f"configuration_{config}_{tasks_per_second}"
+    sheets = {}
+    for result in results:
+        job = result['job']
+        name = sheet_name(job['config'], job['tasks_per_second'])
+        title, by_label = sheets.setdefault(name, (name, {}))
+        by_label[LABELS.get(job['distributor'], job['distributor'])] = server_rows(result['servers'])
+    return sheets
+
+
+def _number(value: str):
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def transfer_data_from_csv_to_exel(base_folder: str, output_file: str = None):
+    """
+    Собирает CSV-файлы распределителей (RR.csv, WRRs.csv, ...) из папки в experiment_results.xlsx.
+    Для результатов, которые есть в памяти, удобнее сразу вызывать write_results_workbook.
+
+    :param base_folder: Папка с CSV-файлами.
+    :param output_file: Имя книги, по умолчанию base_folder/experiment_results.xlsx.
+    """
+    if output_file is None:
+        output_file = os.path.join(base_folder, "experiment_results.xlsx")
+
+    results = {}
+    for label in LABELS_ORDER:
+        csv_file = os.path.join(base_folder, label + ".csv")
+        if not os.path.exists(csv_file):
+            print(f"Нет CSV-файлов для метки '{label}'.")
+            continue
+        with open(csv_file, newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            results[label] = [[_number(value) for value in row] for row in reader]
+
+    write_results_workbook(output_file, {"Sheet": (base_folder, results)})
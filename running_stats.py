@@ -0,0 +1,223 @@
+import numpy as np
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RunningStatistics:
+    """
+    Потоковая статистика величины по секундам: среднее, дисперсия (Уэлфорд), минимум, максимум
+    и квантили (алгоритм P² Джейна-Хламтача) без хранения значений - O(1) памяти на ноду.
+
+    Работает сразу для массива величин формы shape (например, по всем нодам пула),
+    все элементы обновляются одновременно. Среднее считается как сумма / число значений,
+    поэтому совпадает с sum(history) / len(history).
+
+    :param shape: Форма массива величин; () - одна величина (node.Server).
+    :param quantiles: Оцениваемые квантили (доли от 0 до 1).
+    """
+
+    def __init__(self, shape=(), quantiles=DEFAULT_QUANTILES):
+        self.shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        self.quantiles = tuple(quantiles)
+        self.count = 0
+        self.total = np.zeros(self.shape)
+        self._mean = np.zeros(self.shape)   # среднее Уэлфорда, нужно для дисперсии
+        self._m2 = np.zeros(self.shape)
+        self.minimum = np.full(self.shape, np.inf)
+        self.maximum = np.full(self.shape, -np.inf)
+
+        # P²: пять маркеров на каждый квантиль - высоты, позиции (с 1) и желаемые позиции
+        p = np.array(self.quantiles, dtype=np.float64)[:, None]
+        self._heights = np.zeros(self.shape + (len(self.quantiles), 5))
+        self._positions = np.tile(np.arange(1.0, 6.0), self.shape + (len(self.quantiles), 1))
+        self._desired = np.hstack([np.ones_like(p), 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, np.full_like(p, 5.0)])
+        self._increments = np.hstack([np.zeros_like(p), p / 2, p, (1 + p) / 2, np.ones_like(p)])
+
+    def update(self, values):
+        """Добавляет значения одной секунды (массив формы shape)."""
+        values = np.asarray(values, dtype=np.float64)
+        self.count += 1
+        self.total = self.total + values
+        delta = values - self._mean
+        self._mean = self._mean + delta / self.count
+        self._m2 = self._m2 + delta * (values - self._mean)
+        self.minimum = np.minimum(self.minimum, values)
+        self.maximum = np.maximum(self.maximum, values)
+        self._update_quantiles(values[..., None])
+
+    def _update_quantiles(self, x):
+        q = self._heights
+        if self.count <= 5:
+            q[..., self.count - 1] = x
+            if self.count == 5:
+                q.sort(axis=-1)
+            return
+
+        q[..., 0] = np.minimum(q[..., 0], x)
+        q[..., 4] = np.maximum(q[..., 4], x)
+        cell = (x >= q[..., 1]).astype(np.int64) + (x >= q[..., 2]) + (x >= q[..., 3])
+        positions = self._positions
+        positions[..., 1:] += np.arange(1, 5) > cell[..., None]
+        self._desired = self._desired + self._increments
+
+        for i in (1, 2, 3):
+            d = self._desired[:, i] - positions[..., i]
+            up = (d >= 1) & (positions[..., i + 1] - positions[..., i] > 1)
+            down = (d <= -1) & (positions[..., i - 1] - positions[..., i] < -1)
+            move = up | down
+            if not move.any():
+                continue
+            step = np.where(up, 1.0, -1.0)
+            qm, qi, qp = q[..., i - 1], q[..., i], q[..., i + 1]
+            nm, ni, np_ = positions[..., i - 1], positions[..., i], positions[..., i + 1]
+            parabolic = qi + step / (np_ - nm) * ((ni - nm + step) * (qp - qi) / (np_ - ni) +
+                                                  (np_ - ni - step) * (qi - qm) / (ni - nm))
+            linear = qi + step * (np.where(up, qp, qm) - qi) / (np.where(up, np_, nm) - ni)
+            height = np.where((qm < parabolic) & (parabolic < qp), parabolic, linear)
+            q[..., i] = np.where(move, height, qi)
+            positions[..., i] += np.where(move, step, 0.0)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else np.zeros(self.shape)
+
+    @property
+    def variance(self):
+        """Дисперсия по секундам (как np.var, ddof=0)."""
+        return self._m2 / self.count if self.count else np.zeros(self.shape)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    def quantile(self, p: float):
+        """
+        Оценка квантиля p (должен быть среди quantiles); пока значений меньше пяти - точный квантиль.
+        """
+        j = self.quantiles.index(p)
+        if self.count == 0:
+            return np.full(self.shape, np.nan)
+        if self.count < 5:
+            return np.quantile(self._heights[..., j, :self.count], p, axis=-1)
+        return self._heights[..., j, 2].copy()[()]
+
+    def element(self, index) -> 'RunningStatistics':
+        """Копия статистики одного элемента массива (например, одной ноды пула)."""
+        statistics = RunningStatistics((), self.quantiles)
+        statistics.count = self.count
+        statistics.total = self.total[index].copy()
+        statistics._mean = self._mean[index].copy()
+        statistics._m2 = self._m2[index].copy()
+        statistics.minimum = self.minimum[index].copy()
+        statistics.maximum = self.maximum[index].copy()
+        statistics._heights = self._heights[index].copy()
+        statistics._positions = self._positions[index].copy()
+        statistics._desired = self._desired.copy()
+        return statistics
+
+    def summary(self) -> dict:
+        """Число значений, среднее, стандартное отклонение, минимум, максимум и квантили (p50, p95, ...)."""
+        result = {'count': self.count, 'mean': self.mean, 'std': self.std,
+                  'min': self.minimum if self.count else np.zeros(self.shape),
+                  'max': self.maximum if self.count else np.zeros(self.shape)}
+        for p in self.quantiles:
+            result[f"p{p * 100:g}"] = self.quantile(p)
+        return result
+
+
+class ScalarRunningStatistics:
+    """
+    То же, что RunningStatistics для одной величины, но на чистом Python:
+    обновление в десятки раз дешевле операций NumPy над 0-мерными массивами.
+    Используется в node.Server, где статистика обновляется каждую секунду у каждой ноды.
+
+    :param quantiles: Оцениваемые квантили (доли от 0 до 1).
+    """
+
+    def __init__(self, quantiles=DEFAULT_QUANTILES):
+        self.shape = ()
+        self.quantiles = tuple(quantiles)
+        self.count = 0
+        self.total = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self._heights = [[] for _ in self.quantiles]
+        self._positions = [[1, 2, 3, 4, 5] for _ in self.quantiles]
+        self._desired = [[1.0, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5.0] for p in self.quantiles]
+        self._increments = [(0.0, p / 2, p, (1 + p) / 2, 1.0) for p in self.quantiles]
+
+    def update(self, value):
+        value = float(value)
+        self.count += 1
+        self.total += value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+        for q, n, desired, increments in zip(self._heights, self._positions, self._desired, self._increments):
+            if self.count <= 5:
+                q.append(value)
+                if self.count == 5:
+                    q.sort()
+                continue
+
+            if value < q[0]:
+                q[0] = value
+            elif value > q[4]:
+                q[4] = value
+            cell = (value >= q[1]) + (value >= q[2]) + (value >= q[3])
+            for j in range(cell + 1, 5):
+                n[j] += 1
+            for j in range(5):
+                desired[j] += increments[j]
+
+            for i in (1, 2, 3):
+                d = desired[i] - n[i]
+                if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                    step = 1 if d > 0 else -1
+                    height = q[i] + step / (n[i + 1] - n[i - 1]) * (
+                        (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                        (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                    if not q[i - 1] < height < q[i + 1]:
+                        height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                    q[i] = height
+                    n[i] += step
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self):
+        """Дисперсия по секундам (как np.var, ddof=0)."""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+    def quantile(self, p: float):
+        """
+        Оценка квантиля p (должен быть среди quantiles); пока значений меньше пяти - точный квантиль.
+        """
+        q = self._heights[self.quantiles.index(p)]
+        if self.count == 0:
+            return float('nan')
+        if self.count < 5:
+            return float(np.quantile(q, p))
+        return q[2]
+
+    def summary(self) -> dict:
+        """Число значений, среднее, стандартное отклонение, минимум, максимум и квантили (p50, p95, ...)."""
+        result = {'count': self.count, 'mean': self.mean, 'std': self.std,
+                  'min': self.minimum if self.count else 0.0,
+                  'max': self.maximum if self.count else 0.0}
+        for p in self.quantiles:
+            result[f"p{p * 100:g}"] = self.quantile(p)
+        return result
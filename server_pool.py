@@ -0,0 +1,635 @@
+import numpy as np
+
+from node import Server
+from running_stats import RunningStatistics
+
+
+class ServerView:
+    """
+    Тонкое представление одного сервера из ServerPool с интерфейсом node.Server.
+    Собственных данных не хранит, все значения читаются и пишутся в массивы пула.
+
+    :param pool: Пул, которому принадлежит сервер.
+    :param index: Индекс сервера в массивах пула.
+    """
+    __slots__ = ('pool', 'index')
+
+    def __init__(self, pool: 'ServerPool', index: int):
+        self.pool = pool
+        self.index = index
+
+    @property
+    def server_id(self) -> int:
+        return int(self.pool.server_id[self.index])
+
+    @property
+    def bu_power(self) -> float:
+        return float(self.pool.bu_power[self.index])
+
+    @property
+    def bandwidth_bytes(self) -> float:
+        return float(self.pool.bandwidth_bytes[self.index])
+
+    @property
+    def failure_probability(self) -> float:
+        return float(self.pool.failure_probability[self.index])
+
+    @property
+    def downtime_seconds(self) -> float:
+        return float(self.pool.downtime_seconds[self.index])
+
+    @property
+    def available(self) -> bool:
+        return bool(self.pool.available[self.index])
+
+    @available.setter
+    def available(self, value: bool):
+        self.pool.available[self.index] = value
+
+    @property
+    def queue_capacity(self):
+        return None     # у пула нет очередей (см. ServerPool.from_servers)
+
+    def has_queue_room(self) -> bool:
+        return False
+
+    @property
+    def current_load(self) -> float:
+        return float(self.pool.current_load[self.index])
+
+    @current_load.setter
+    def current_load(self, value: float):
+        self.pool.current_load[self.index] = value
+
+    @property
+    def current_network_load_bytes(self) -> float:
+        return float(self.pool.current_network_load_bytes[self.index])
+
+    @current_network_load_bytes.setter
+    def current_network_load_bytes(self, value: float):
+        self.pool.current_network_load_bytes[self.index] = value
+
+    @property
+    def processed_tasks(self) -> int:
+        return int(self.pool.processed_tasks[self.index])
+
+    @property
+    def dropped_tasks(self) -> int:
+        return int(self.pool.dropped_tasks[self.index])
+
+    @property
+    def total_work_time(self) -> float:
+        return float(self.pool.total_work_time[self.index])
+
+    @property
+    def cpu_stats(self) -> RunningStatistics:
+        return self.pool.statistics['cpu'].element(self.index)
+
+    @property
+    def network_stats(self) -> RunningStatistics:
+        return self.pool.statistics['network'].element(self.index)
+
+    @property
+    def tasks_stats(self) -> RunningStatistics:
+        return self.pool.statistics['tasks'].element(self.index)
+
+    # Истории - представления столбца буфера пула только для чтения (см. ServerPool.history).
+    # Изменять их, как списки node.Server (pop, append), нельзя - для этого есть ServerPool.pop_history
+    # и extend_history; попытка изменить представление даёт ошибку, а не молча меняет копию.
+
+    @property
+    def cpu_load_history(self) -> np.ndarray:
+        return self._history_column('cpu')
+
+    @property
+    def network_load_history(self) -> np.ndarray:
+        return self._history_column('network')
+
+    @property
+    def tasks_history(self) -> np.ndarray:
+        return self._history_column('tasks')
+
+    def _history_column(self, name: str) -> np.ndarray:
+        column = self.pool.history(name)[:, self.index]
+        column.flags.writeable = False
+        return column
+
+    def calc_tasks_execution_time(self, task_bu):
+        return task_bu / self.pool.bu_power[self.index]
+
+    def can_accept_task(self, task_compute_time: float, task_data_size: float) -> bool:
+        return self.pool.can_accept_task(self.index, task_compute_time, task_data_size)
+
+    def admit_task(self, task_compute_time: float, task_data_size: float) -> bool:
+        return self.pool.admit_task(self.index, task_compute_time, task_data_size)
+
+    def calculate_load(self):
+        "Считаем нагрузку сервера в процентах за секунду"
+        return float(self.pool.calculate_load()[self.index])
+
+    def calculate_network_load(self):
+        return float(self.pool.calculate_network_load()[self.index])
+
+    def add_task(self, task_compute_time, task_data_size):
+        self.pool.add_task(self.index, task_compute_time, task_data_size)
+
+    def get_current_tasks_on_node(self):
+        return int(self.pool.current_tasks[self.index])
+
+
+# единиц точного учёта (exact=True) в одной BU мощности/сложности и в одном байте
+MICRO_UNITS = 1_000_000
+
+
+def to_units(values):
+    """Переводит сложность задач, мощность или байты в целые микроединицы (с округлением)."""
+    return np.rint(np.asarray(values, dtype=np.float64) * MICRO_UNITS).astype(np.int64)
+
+
+# типы историй: (загрузка CPU и сети, число задач)
+HISTORY_PRECISIONS = {'double': (np.float64, np.int64),
+                      'single': (np.float32, np.uint32)}
+
+
+class HistoryBuffer:
+    """
+    История одной величины по секундам: заранее выделенный массив (секунды x серверы).
+    Строки дописываются на место без создания объектов Python; при нехватке места массив
+    увеличивается вдвое. Одна строка всегда в запасе, чтобы history() мог дописать
+    незавершённую секунду и вернуть представление без копирования.
+
+    :param n: Число серверов.
+    :param capacity: Сколько секунд выделить сразу.
+    :param dtype: Тип значений.
+    """
+
+    def __init__(self, n: int, capacity: int, dtype):
+        self.data = np.zeros((max(capacity, 0) + 1, n), dtype=dtype)
+        self.length = 0
+
+    def reserve(self, capacity: int):
+        """Гарантирует место под capacity секунд (и ещё одну строку запаса)."""
+        if capacity + 1 > len(self.data):
+            data = np.zeros((max(capacity + 1, 2 * len(self.data)), self.data.shape[1]), dtype=self.data.dtype)
+            data[:self.length] = self.data[:self.length]
+            self.data = data
+
+    def append(self, row):
+        self.reserve(self.length + 1)
+        self.data[self.length] = row
+        self.length += 1
+
+    def extend(self, rows):
+        rows = np.asarray(rows)
+        self.reserve(self.length + len(rows))
+        self.data[self.length:self.length + len(rows)] = rows
+        self.length += len(rows)
+
+    def pop(self):
+        self.length -= 1
+
+    def view(self, current_row=None) -> np.ndarray:
+        """Записанные секунды (и, если передана, незавершённая секунда) - представление массива."""
+        if current_row is None:
+            return self.data[:self.length]
+        self.data[self.length] = current_row
+        return self.data[:self.length + 1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+
+class ServerPool:
+    """
+    Пул серверов, хранящий состояние всех нод в непрерывных массивах NumPy.
+    Арифметика та же, что и в node.Server, поэтому распределители на пуле
+    дают те же результаты, что и на списке объектов Server.
+
+    :param bu_power: Мощности серверов.
+    :param bandwidth_bytes: Пропускная способность серверов в байтах за секунду.
+    :param server_ids: Номера серверов, по умолчанию 1..n.
+    :param horizon: Сколько секунд истории выделить заранее (например, длительность симуляции).
+    :param precision: Точность истории: 'double' (float64/int64, как у node.Server)
+        или 'single' (float32/uint32, вдвое меньше памяти).
+    :param record_history: False - не хранить истории по секундам (значения секунд можно
+        передавать в приёмник метрик, см. metrics.py); счетчики нод ведутся как обычно.
+    :param exact: Точный учёт: сложность задач, мощность и байты хранятся в целых микроединицах
+        (MICRO_UNITS), и проверка "задача помещается" - сравнение целых чисел без ошибок округления.
+        current_load и current_network_load_bytes при этом вычисляются из целых счетчиков и только
+        читаются. Результаты могут отличаться от node.Server там, где сумма float решала исход проверки.
+    :param failure_probability: Вероятность отказа серверов в каждую секунду (failures.FailureModel).
+    :param downtime_seconds: Длительность простоя серверов после отказа (секунды).
+    """
+
+    def __init__(self, bu_power, bandwidth_bytes, server_ids=None, horizon: int = 0, precision: str = 'double',
+                 record_history: bool = True, exact: bool = False, failure_probability=0.0, downtime_seconds=0.0):
+        self.bu_power = np.array(bu_power, dtype=np.float64)
+        n = len(self.bu_power)
+        self.bandwidth_bytes = np.broadcast_to(np.asarray(bandwidth_bytes, dtype=np.float64), (n,)).copy()
+        if server_ids is None:
+            server_ids = np.arange(1, n + 1)
+        self.server_id = np.array(server_ids, dtype=np.int64)
+        self.failure_probability = np.broadcast_to(np.asarray(failure_probability, dtype=np.float64), (n,)).copy()
+        self.downtime_seconds = np.broadcast_to(np.asarray(downtime_seconds, dtype=np.float64), (n,)).copy()
+        self.available = np.ones(n, dtype=bool)     # False - сервер отказал и не принимает задачи
+
+        self.current_load = np.zeros(n)     # текущая нагрузка в секундах
+        self.current_network_load_bytes = np.zeros(n)
+        self.current_tasks = np.zeros(n, dtype=np.int64)  # задач за текущую секунду (tasks_history[-1])
+
+        self.processed_tasks = np.zeros(n, dtype=np.int64)
+        self.dropped_tasks = np.zeros(n, dtype=np.int64)
+        self.total_work_time = np.zeros(n)
+
+        self.exact = exact
+        if exact:
+            self.capacity_units = to_units(self.bu_power)
+            self.bandwidth_units = to_units(self.bandwidth_bytes)
+            self.load_units = np.zeros(n, dtype=np.int64)   # сложность принятых за секунду задач
+            self.network_units = np.zeros(n, dtype=np.int64)
+
+        # завершённые секунды, текущая секунда берётся из current_* массивов
+        self.precision = precision
+        self.record_history = record_history
+        self._history = self._new_history(horizon)
+        self.statistics = self._new_statistics()    # потоковая статистика по завершённым секундам
+        self._second_open = False
+        self.seconds = 0    # сколько раз открывалась новая секунда
+
+        self.servers = [ServerView(self, i) for i in range(n)]
+
+    @classmethod
+    def from_servers(cls, servers: list, horizon: int = 0, precision: str = 'double',
+                     record_history: bool = True, exact: bool = False) -> 'ServerPool':
+        """
+        Строит пул с теми же параметрами, что и у списка node.Server.
+        Режим очереди (queue_capacity) пулом не поддерживается: задачи пула не откладываются.
+        """
+        if any(server.queue_capacity is not None for server in servers):
+            raise ValueError("ServerPool не поддерживает очереди задач (queue_capacity), нужен список node.Server")
+        return cls(bu_power=[server.bu_power for server in servers],
+                   bandwidth_bytes=[server.bandwidth_bytes for server in servers],
+                   server_ids=[server.server_id for server in servers],
+                   horizon=horizon, precision=precision, record_history=record_history, exact=exact,
+                   failure_probability=[server.failure_probability for server in servers],
+                   downtime_seconds=[server.downtime_seconds for server in servers])
+
+    def __len__(self):
+        return len(self.servers)
+
+    def __getitem__(self, index):
+        return self.servers[index]
+
+    def __iter__(self):
+        return iter(self.servers)
+
+    def reset(self):
+        self._clear_load()
+        self.current_tasks[:] = 0
+        self.available[:] = True
+
+        self.processed_tasks[:] = 0
+        self.dropped_tasks[:] = 0
+        self.total_work_time[:] = 0.0
+
+        self._history = self._new_history(len(self._history['cpu'].data) - 1)
+        self.statistics = self._new_statistics()
+        self._second_open = False
+        self.seconds = 0
+
+    def _new_history(self, horizon: int) -> dict:
+        load_dtype, tasks_dtype = HISTORY_PRECISIONS[self.precision]
+        n = len(self.bu_power)
+        if not self.record_history:
+            horizon = 0
+        return {'cpu': HistoryBuffer(n, horizon, load_dtype),
+                'network': HistoryBuffer(n, horizon, load_dtype),
+                'tasks': HistoryBuffer(n, horizon, tasks_dtype)}
+
+    def _new_statistics(self) -> dict:
+        n = len(self.bu_power)
+        return {'cpu': RunningStatistics(n), 'network': RunningStatistics(n), 'tasks': RunningStatistics(n)}
+
+    def update_statistics(self, cpu_row, network_row, tasks_row):
+        """Добавляет значения завершённой секунды (по всем нодам) в потоковую статистику."""
+        self.statistics['cpu'].update(cpu_row)
+        self.statistics['network'].update(network_row)
+        self.statistics['tasks'].update(tasks_row)
+
+    def reserve_history(self, seconds: int):
+        """Выделяет место ещё под seconds секунд истории, чтобы она не перевыделялась в ходе симуляции."""
+        if not self.record_history:
+            return
+        for buffer in self._history.values():
+            buffer.reserve(buffer.length + seconds)
+
+    @property
+    def history_nbytes(self) -> int:
+        """Память, занятая историями."""
+        return sum(buffer.nbytes for buffer in self._history.values())
+
+    def _current_row(self, name: str) -> np.ndarray:
+        if name == 'cpu':
+            return self.current_load * 100
+        if name == 'network':
+            return self.calculate_network_load()
+        return self.current_tasks.copy()
+
+    def reset_for_new_second(self):
+        """Закрывает текущую секунду (записывает её в историю) и открывает новую."""
+        if self._second_open:
+            rows = {name: self._current_row(name) for name in self._history}
+            self.update_statistics(rows['cpu'], rows['network'], rows['tasks'])
+            if self.record_history:
+                for name, buffer in self._history.items():
+                    buffer.append(rows[name])
+        self._clear_load()
+        self.current_tasks[:] = 0
+        self._second_open = True
+        self.seconds += 1
+
+    def pop_history(self):
+        """Отбрасывает последнюю (незавершённую) секунду, аналог history.pop() у node.Server."""
+        if self._second_open:
+            self._second_open = False
+        elif self.record_history:
+            for buffer in self._history.values():
+                buffer.pop()
+
+    def extend_history(self, cpu_rows, network_rows, tasks_rows):
+        """Дописывает завершённые секунды (массивы секунды x серверы) в историю пула."""
+        if not self.record_history:
+            return
+        self._history['cpu'].extend(cpu_rows)
+        self._history['network'].extend(network_rows)
+        self._history['tasks'].extend(tasks_rows)
+
+    def history(self, name: str) -> np.ndarray:
+        """
+        История по секундам в виде массива (секунды x серверы).
+        Возвращается представление внутреннего буфера без копирования, оно действительно
+        до следующего изменения истории.
+
+        :param name: 'cpu', 'network' или 'tasks'.
+        """
+        current_row = self._current_row(name) if self._second_open else None
+        return self._history[name].view(current_row)
+
+    def _clear_load(self):
+        self.current_load[:] = 0.0
+        self.current_network_load_bytes[:] = 0.0
+        if self.exact:
+            self.load_units[:] = 0
+            self.network_units[:] = 0
+
+    def _sync_load(self, index):
+        """Точный учёт: пересчитывает current_load и current_network_load_bytes из целых счетчиков."""
+        self.current_load[index] = self.load_units[index] / self.capacity_units[index]
+        self.current_network_load_bytes[index] = self.network_units[index] / MICRO_UNITS
+
+    def calc_tasks_execution_time(self, task_bu):
+        return task_bu / self.bu_power
+
+    def fits(self, task_compute_time: float, task_data_size: float) -> np.ndarray:
+        """Маска работающих нод, способных принять задачу."""
+        if self.exact:
+            return ((self.load_units + to_units(task_compute_time) <= self.capacity_units) &
+                    (self.network_units + to_units(task_data_size) <= self.bandwidth_units) & self.available)
+        return ((self.current_load + self.calc_tasks_execution_time(task_compute_time) <= 1) &
+                (self.current_network_load_bytes + task_data_size <= self.bandwidth_bytes) & self.available)
+
+    def can_accept_task(self, index: int, task_compute_time: float, task_data_size: float) -> bool:
+        """Аналог Server.can_accept_task для одной ноды пула (без побочных эффектов)."""
+        if not self.available[index]:
+            return False
+        if self.exact:
+            return bool(self.load_units[index] + to_units(task_compute_time) <= self.capacity_units[index] and
+                        self.network_units[index] + to_units(task_data_size) <= self.bandwidth_units[index])
+        return bool(self.current_load[index] + task_compute_time / self.bu_power[index] <= 1 and
+                    self.current_network_load_bytes[index] + task_data_size <= self.bandwidth_bytes[index])
+
+    def slots(self, task_compute_time: float, task_data_size: float, limit=None) -> np.ndarray:
+        """
+        Сколько ещё одинаковых задач поместится на каждую ноду при последовательных add_task.
+
+        При точном учёте (exact=True) ответ считается в замкнутом виде за O(n). С float-суммами
+        он зависит от ошибок округления, поэтому добавления проигрываются по шагам сразу для всех нод,
+        которые ещё вмещают задачи (работа пропорциональна сумме ответов).
+
+        :param limit: Больше скольких задач на ноду не считать - число или массив по нодам
+            (обязателен без точного учёта).
+        """
+        if self.exact:
+            demand, size = int(to_units(task_compute_time)), int(to_units(task_data_size))
+            free_load, free_network = self.capacity_units - self.load_units, self.bandwidth_units - self.network_units
+            big = np.iinfo(np.int64).max
+            by_load = free_load // demand if demand > 0 else np.where(free_load >= 0, big, 0)
+            by_network = free_network // size if size > 0 else np.where(free_network >= 0, big, 0)
+            slots = np.where(self.available, np.maximum(np.minimum(by_load, by_network), 0), 0)
+            return slots if limit is None else np.minimum(slots, limit)
+
+        if limit is None:
+            raise ValueError("slots() без точного учёта (exact=False) требует limit")
+        limit = np.broadcast_to(np.asarray(limit, dtype=np.int64), (len(self),))
+        slots = np.zeros(len(self), dtype=np.int64)
+        active = np.flatnonzero((limit > 0) & self.available)
+        execution_time = self.calc_tasks_execution_time(task_compute_time)[active]
+        load = self.current_load[active]
+        network = self.current_network_load_bytes[active]
+        step = 0
+        while active.size:
+            load = load + execution_time
+            network = network + task_data_size
+            fits = (load <= 1) & (network <= self.bandwidth_bytes[active])
+            slots[active[fits]] += 1
+            step += 1
+            keep = fits & (limit[active] > step)
+            active, execution_time, load, network = active[keep], execution_time[keep], load[keep], network[keep]
+        return slots
+
+    def add_uniform_tasks(self, counts, task_compute_time: float, task_data_size: float):
+        """
+        Добавляет на ноды по counts[i] одинаковых задач без цикла по задачам
+        (вместимость нужно проверить заранее, например через slots()).
+
+        При точном учёте нагрузка меняется арифметически за O(n), а total_work_time увеличивается
+        на counts * t / bu_power и может отличаться от суммы последовательных add_task в последних знаках.
+        Без точного учёта сложения повторяются по шагам (O(n) на шаг, шагов - max(counts)),
+        и результат побитово совпадает с последовательными add_task.
+
+        :param counts: Число задач на каждую ноду (массив длины пула).
+        """
+        counts = np.asarray(counts, dtype=np.int64)
+        if self.exact:
+            self.load_units += counts * to_units(task_compute_time)
+            self.network_units += counts * to_units(task_data_size)
+            self._sync_load(slice(None))
+            self.total_work_time += counts * (task_compute_time / self.bu_power)
+        else:
+            execution_time = self.calc_tasks_execution_time(task_compute_time)
+            for step in range(int(counts.max(initial=0))):
+                mask = counts > step
+                self.current_load[mask] += execution_time[mask]
+                self.total_work_time[mask] += execution_time[mask]
+                self.current_network_load_bytes[mask] += task_data_size
+        self.processed_tasks += counts
+        self.current_tasks += counts
+
+    def can_accept_tasks(self, task_compute_time: float, task_data_size: float) -> np.ndarray:
+        """Аналог вызова Server.can_accept_task на каждой ноде пула: маска нод без побочных эффектов."""
+        return self.fits(task_compute_time, task_data_size)
+
+    def admit_task(self, index: int, task_compute_time: float, task_data_size: float) -> bool:
+        """Аналог Server.admit_task: принимает задачу на ноду или учитывает отказ в dropped_tasks."""
+        if self.can_accept_task(index, task_compute_time, task_data_size):
+            self.add_task(index, task_compute_time, task_data_size)
+            return True
+        self.dropped_tasks[index] += 1
+        return False
+
+    def first_fit(self, start: int, task_compute_time: float, task_data_size: float) -> int:
+        """
+        Аналог обхода RoundRobin: ищет по кругу от start первую ноду, способную принять задачу.
+
+        :return: Индекс ноды или -1, если задачу не может принять ни одна нода.
+        """
+        if self.can_accept_task(start, task_compute_time, task_data_size):
+            return start
+        n = len(self)
+        order = np.concatenate((np.arange(start + 1, n), np.arange(0, start)))
+        mask = self.fits(task_compute_time, task_data_size)[order]
+        if not mask.any():
+            return -1
+        return int(order[int(np.argmax(mask))])
+
+    def fit_prefix(self, indices, task_compute_times, task_data_sizes) -> int:
+        """
+        Пробует по порядку отдать задачи нодам indices (задача i -> нода indices[i])
+        и останавливается на первой задаче, которую нода не может принять.
+        Принятые задачи добавляются так же, как последовательные вызовы add_task:
+        нагрузка каждой ноды накапливается через cumsum в том же порядке сложений.
+
+        :return: Количество принятых задач с начала последовательности.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        count = len(indices)
+        if count == 0:
+            return 0
+        task_compute_times = np.asarray(task_compute_times, dtype=np.float64)
+        execution_time = task_compute_times / self.bu_power[indices]
+        task_data_sizes = np.asarray(task_data_sizes, dtype=np.float64)
+
+        # номер задачи среди задач той же ноды (rank) и столбец ноды (column)
+        order = np.argsort(indices, kind='stable')
+        sorted_indices = indices[order]
+        starts = np.flatnonzero(np.r_[True, sorted_indices[1:] != sorted_indices[:-1]])
+        counts = np.diff(np.r_[starts, count])
+        rank = np.empty(count, dtype=np.int64)
+        rank[order] = np.arange(count) - np.repeat(starts, counts)
+        column = np.empty(count, dtype=np.int64)
+        column[order] = np.repeat(np.arange(len(starts)), counts)
+        nodes = sorted_indices[starts]
+
+        def accumulate(initial, values):
+            table = np.zeros((counts.max() + 1, len(nodes)), dtype=initial.dtype)
+            table[0] = initial
+            table[rank + 1, column] = values
+            return np.cumsum(table, axis=0)
+
+        if self.exact:
+            load = accumulate(self.load_units[nodes], to_units(task_compute_times))
+            network = accumulate(self.network_units[nodes], to_units(task_data_sizes))
+            fits = ((load[rank + 1, column] <= self.capacity_units[nodes][column]) &
+                    (network[rank + 1, column] <= self.bandwidth_units[nodes][column]))
+        else:
+            load = accumulate(self.current_load[nodes], execution_time)
+            network = accumulate(self.current_network_load_bytes[nodes], task_data_sizes)
+            fits = (load[rank + 1, column] <= 1) & (network[rank + 1, column] <= self.bandwidth_bytes[nodes][column])
+
+        fits &= self.available[indices]
+        refused = np.flatnonzero(~fits)
+        accepted = int(refused[0]) if refused.size else count
+        if accepted == 0:
+            return 0
+
+        added = np.bincount(column[:accepted], minlength=len(nodes))
+        nodes_range = np.arange(len(nodes))
+        work_time = accumulate(self.total_work_time[nodes], execution_time)
+        if self.exact:
+            self.load_units[nodes] = load[added, nodes_range]
+            self.network_units[nodes] = network[added, nodes_range]
+            self._sync_load(nodes)
+        else:
+            self.current_load[nodes] = load[added, nodes_range]
+            self.current_network_load_bytes[nodes] = network[added, nodes_range]
+        self.total_work_time[nodes] = work_time[added, nodes_range]
+        self.processed_tasks[nodes] += added
+        self.current_tasks[nodes] += added
+        return accepted
+
+    def calculate_load(self) -> np.ndarray:
+        "Считаем нагрузку серверов в процентах за секунду"
+        load = np.minimum(100.0, (self.current_load / self.bu_power) * 100)
+        return np.where(self.current_load > 0, load, 0.0)
+
+    def calculate_network_load(self) -> np.ndarray:
+        load = np.zeros(len(self))
+        busy = self.current_network_load_bytes > 0
+        load[busy] = np.minimum(100.0, (self.current_network_load_bytes[busy] / self.bandwidth_bytes[busy]) * 100)
+        return load
+
+    def add_task(self, index: int, task_compute_time, task_data_size):
+        if self.exact:
+            self.load_units[index] += to_units(task_compute_time)
+            self.network_units[index] += to_units(task_data_size)
+            self._sync_load(index)
+        else:
+            self.current_load[index] += task_compute_time / self.bu_power[index]
+            self.current_network_load_bytes[index] += task_data_size
+        self.total_work_time[index] += task_compute_time / self.bu_power[index]
+
+        self.processed_tasks[index] += 1
+        self.current_tasks[index] += 1
+
+    def release_task(self, index: int, task_compute_time: float):
+        """Снимает с ноды завершённую задачу (событийная симуляция): подключение и её работу."""
+        self.current_tasks[index] -= 1
+        if self.exact:
+            self.load_units[index] -= to_units(task_compute_time)
+            self._sync_load(index)
+            return
+        self.current_load[index] -= task_compute_time / self.bu_power[index]
+        if self.current_tasks[index] == 0:
+            self.current_load[index] = 0.0     # убираем накопленную ошибку округления
+
+    def release_network(self, index: int, task_data_size: float):
+        """Освобождает сеть ноды от данных задачи (событийная симуляция)."""
+        if self.exact:
+            self.network_units[index] -= to_units(task_data_size)
+            self._sync_load(index)
+            return
+        self.current_network_load_bytes[index] -= task_data_size
+        if self.current_network_load_bytes[index] < 1e-9:
+            self.current_network_load_bytes[index] = 0.0
+
+    def to_servers(self) -> list:
+        """Копирует состояние пула в независимые объекты node.Server."""
+        servers = []
+        for view in self.servers:
+            server = Server(server_id=view.server_id, bu_power=view.bu_power,
+                            bandwidth_bytes=view.bandwidth_bytes, failure_probability=view.failure_probability,
+                            downtime_seconds=view.downtime_seconds)
+            server.current_load = view.current_load
+            server.current_network_load_bytes = view.current_network_load_bytes
+            server.cpu_load_history = view.cpu_load_history.tolist()
+            server.network_load_history = view.network_load_history.tolist()
+            server.tasks_history = view.tasks_history.tolist()
+            server.processed_tasks = view.processed_tasks
+            server.dropped_tasks = view.dropped_tasks
+            server.total_work_time = view.total_work_time
+            server.cpu_stats = view.cpu_stats
+            server.network_stats = view.network_stats
+            server.tasks_stats = view.tasks_stats
+            servers.append(server)
+        return servers
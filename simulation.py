@@ -0,0 +1,262 @@
+import numpy as np
+
+from server_pool import ServerPool
+
+# Атрибуты распределителей, которые переходят из секунды в секунду.
+# Всё остальное (кучи, деревья, веса) пересчитывается в начале каждой секунды.
+STATE_ATTRIBUTES = ('current_node_index', '_schedule_position')
+
+
+def distributor_state(distributor):
+    """
+    Состояние распределителя, от которого зависит ход следующей секунды.
+    Распределитель может определить собственный метод state_key();
+    None означает, что состояние не повторяется (например, случайный выбор).
+    """
+    if hasattr(distributor, 'state_key'):
+        return distributor.state_key()
+    return tuple(getattr(distributor, name, None) for name in STATE_ATTRIBUTES)
+
+
+def restore_distributor_state(distributor, state):
+    if hasattr(distributor, 'restore_state'):
+        distributor.restore_state(state)
+        return
+    for name, value in zip(STATE_ATTRIBUTES, state):
+        if value is not None:
+            setattr(distributor, name, value)
+
+
+def start_seconds(servers):
+    if isinstance(servers, ServerPool):
+        servers.reset_for_new_second()
+    else:
+        for server in servers:
+            server.reset_for_new_second()
+
+
+def has_queues(servers) -> bool:
+    """Работают ли ноды в режиме очереди (node.Server.queue_capacity)."""
+    return not isinstance(servers, ServerPool) and any(server.queue_capacity is not None for server in servers)
+
+
+def drain_queues(servers):
+    """Начало секунды: ноды запускают ждущие в очередях задачи."""
+    for server in servers:
+        if server.queue:
+            server.drain_queue()
+
+
+def finish_seconds(servers):
+    """Отбрасывает последнюю пустую секунду, открытую после окончания симуляции."""
+    if isinstance(servers, ServerPool):
+        servers.pop_history()
+    else:
+        for server in servers:
+            server.cpu_load_history.pop()
+            server.network_load_history.pop()
+            server.tasks_history.pop()
+
+
+def snapshot(servers) -> dict:
+    """Счетчики нод и значения текущей секунды в виде массивов."""
+    if isinstance(servers, ServerPool):
+        return {'cpu': servers.current_load * 100,
+                'network': servers.calculate_network_load(),
+                'tasks': servers.current_tasks.copy(),
+                'processed': servers.processed_tasks.copy(),
+                'dropped': servers.dropped_tasks.copy(),
+                'work_time': servers.total_work_time.copy()}
+    return {'cpu': np.array([server.cpu_load_history[-1] for server in servers], dtype=np.float64),
+            'network': np.array([server.network_load_history[-1] for server in servers], dtype=np.float64),
+            'tasks': np.array([server.tasks_history[-1] for server in servers], dtype=np.int64),
+            'processed': np.array([server.processed_tasks for server in servers], dtype=np.int64),
+            'dropped': np.array([server.dropped_tasks for server in servers], dtype=np.int64),
+            'work_time': np.array([server.total_work_time for server in servers], dtype=np.float64)}
+
+
+def repeat_seconds(servers, records: list, seconds: int, sink=None, first_second: int = 0):
+    """
+    Дописывает seconds секунд, циклически повторяя записанные секунды records:
+    истории дополняются строками, счетчики увеличиваются на накопленные приращения,
+    значения секунд передаются в приёмник метрик sink (нумерация с first_second).
+    """
+    def order():
+        return (records[i % len(records)] for i in range(seconds))
+
+    processed = sum(record['processed'] for record in order())
+    dropped = sum(record['dropped'] for record in order())
+    work_time = sum(record['work_time'] for record in order())
+    if sink is not None:
+        for second, record in enumerate(order(), start=first_second):
+            sink.push(second, record['cpu'], record['network'], record['tasks'])
+
+    if isinstance(servers, ServerPool):
+        for record in order():
+            servers.update_statistics(record['cpu'], record['network'], record['tasks'])
+        if servers.record_history:
+            servers.extend_history([record['cpu'] for record in order()],
+                                   [record['network'] for record in order()],
+                                   [record['tasks'] for record in order()])
+        servers.processed_tasks += processed
+        servers.dropped_tasks += dropped
+        servers.total_work_time += work_time
+        return
+
+    cpu = np.array([record['cpu'] for record in order()])
+    network = np.array([record['network'] for record in order()])
+    tasks = np.array([record['tasks'] for record in order()])
+    for i, server in enumerate(servers):
+        server.cpu_load_history.extend(cpu[:, i].tolist())
+        server.network_load_history.extend(network[:, i].tolist())
+        server.tasks_history.extend(tasks[:, i].tolist())
+        for cpu_load, network_load, tasks_count in zip(cpu[:, i].tolist(), network[:, i].tolist(), tasks[:, i].tolist()):
+            server.update_statistics(cpu_load, network_load, tasks_count)
+        server.processed_tasks += int(processed[i])
+        server.dropped_tasks += int(dropped[i])
+        server.total_work_time += float(work_time[i])
+
+
+def run_simulation(distributor, servers, task_times, task_sizes, simulation_time: int,
+                   fast_forward: bool = True, sink=None, failures=None) -> dict:
+    """
+    Прогоняет симуляцию: каждую секунду распределяет одни и те же задачи и сбрасывает нагрузку нод.
+
+    Так как задачи каждой секунды одинаковы, ход секунды полностью определяется состоянием
+    распределителя на её начало. Как только секунда заканчивается в уже встречавшемся состоянии
+    (та же раскладка задач по нодам и то же состояние распределителя), дальнейшие секунды
+    повторяют найденный период и дописываются в истории и счетчики целиком, без раздачи задач.
+    Суммы с плавающей точкой (total_work_time) при этом могут отличаться от полного прогона
+    в последних знаках.
+
+    :param distributor: Распределитель, работающий с servers.
+    :param servers: Список node.Server или ServerPool.
+    :param task_times: Вычислительная сложность задач одной секунды.
+    :param task_sizes: Объемы данных задач одной секунды (байты).
+    :param simulation_time: Длительность симуляции в секундах.
+    :param fast_forward: False - полностью проигрывать каждую секунду (для проверки).
+    :param sink: Приёмник метрик (metrics.py), получает значения нод за каждую секунду;
+        закрывается в конце симуляции.
+    :param failures: Модель отказов (failures.FailureModel), разыгрывает отказы в начале каждой секунды;
+        секунды с отказами не повторяются, поэтому fast_forward отключается.
+    :return: Сколько секунд было проиграно и найденный период повторения (0, если не найден).
+    """
+    queues = has_queues(servers)
+    if failures is not None or queues:
+        # ход секунды зависит ещё от отказов или очередей - повторы по состоянию распределителя не ищутся
+        fast_forward = False
+    task_times = np.asarray(task_times, dtype=np.float64)
+    task_sizes = np.asarray(task_sizes, dtype=np.float64)
+
+    if isinstance(servers, ServerPool):
+        # +1 - пустая секунда, открытая после окончания симуляции
+        servers.reserve_history(simulation_time + 1)
+
+    records = []
+    seen = {}
+    period = 0
+    start_seconds(servers)
+    second = 0
+    while second < simulation_time:
+        before = snapshot(servers)
+        rejected_before = distributor.rejected_tasks
+        if failures is not None:
+            failures.step(second, distributor)
+        if queues:
+            drain_queues(servers)
+        distributor.distribute_batch(task_times, task_sizes)
+        after = snapshot(servers)
+        if failures is not None:
+            failures.observe(after)
+        start_seconds(servers)
+        if sink is not None:
+            sink.push(second, after['cpu'], after['network'], after['tasks'])
+        second += 1
+        if not fast_forward:
+            continue
+
+        state = distributor_state(distributor)
+        if state is None:
+            fast_forward = False
+            continue
+        record = {'cpu': after['cpu'], 'network': after['network'], 'tasks': after['tasks'],
+                  'processed': after['processed'] - before['processed'],
+                  'dropped': after['dropped'] - before['dropped'],
+                  'work_time': after['work_time'] - before['work_time'],
+                  'rejected': distributor.rejected_tasks - rejected_before,
+                  'state': state}
+        signature = (state, record['rejected'],
+                     record['tasks'].tobytes(), record['cpu'].tobytes(), record['network'].tobytes(),
+                     record['processed'].tobytes(), record['dropped'].tobytes())
+        records.append(record)
+        if signature not in seen:
+            seen[signature] = len(records) - 1
+            continue
+
+        # секунды после seen[signature] повторяются с периодом period
+        cycle = records[seen[signature] + 1:]
+        period = len(cycle)
+        remaining = simulation_time - second
+        if remaining > 0:
+            # повторённые секунды встают перед открытой пустой секундой
+            finish_seconds(servers)
+            repeat_seconds(servers, cycle, remaining, sink, first_second=second)
+            start_seconds(servers)
+            distributor.rejected_tasks += sum(cycle[i % period]['rejected'] for i in range(remaining))
+            restore_distributor_state(distributor, cycle[(remaining - 1) % period]['state'])
+        break
+
+    finish_seconds(servers)
+    if sink is not None:
+        sink.close()
+    return {'simulated_seconds': second, 'period': period}
+
+
+def run_workload(distributor, servers, workload, sink=None, failures=None) -> dict:
+    """
+    Прогоняет симуляцию с задачами из потока workload (workload.Workload): каждую секунду (такт)
+    распределяются задачи этого такта, после чего нагрузка нод сбрасывается, как в run_simulation.
+    Задачи разных секунд различаются, поэтому секунды не повторяются и всегда проигрываются полностью.
+
+    :param distributor: Распределитель, работающий с servers.
+    :param servers: Список node.Server или ServerPool.
+    :param workload: Итерируемые порции (такт, сложности, объемы), такты идут подряд с 0.
+    :param sink: Приёмник метрик (metrics.py), получает значения нод за каждую секунду;
+        закрывается в конце симуляции.
+    :param failures: Модель отказов (failures.FailureModel), разыгрывает отказы в начале каждого такта.
+    :return: Сколько секунд было проиграно и сколько задач пришло.
+    """
+    queues = has_queues(servers)
+    if isinstance(servers, ServerPool) and hasattr(workload, 'ticks'):
+        servers.reserve_history(workload.ticks + 1)
+
+    def close_second(second):
+        if sink is not None or failures is not None:
+            after = snapshot(servers)
+            if sink is not None:
+                sink.push(second, after['cpu'], after['network'], after['tasks'])
+            if failures is not None:
+                failures.observe(after)
+        start_seconds(servers)
+
+    start_seconds(servers)
+    second = None
+    arrived_tasks = 0
+    for tick, task_times, task_sizes in workload:
+        if second is not None and tick != second:
+            close_second(second)
+        if tick != second:
+            if failures is not None:
+                failures.step(tick, distributor)
+            if queues:
+                drain_queues(servers)
+        second = tick
+        distributor.distribute_batch(task_times, task_sizes)
+        arrived_tasks += len(task_times)
+    if second is not None:
+        close_second(second)
+
+    finish_seconds(servers)
+    if sink is not None:
+        sink.close()
+    return {'simulated_seconds': 0 if second is None else second + 1, 'arrived_tasks': arrived_tasks}
@@ -0,0 +1,379 @@
+import bisect
+import math
+
+import numpy as np
+
+
+class IndexedMinHeap:
+    """
+    Двоичная min-куча с индексом позиций: кроме push/pop поддерживает изменение ключа
+    и удаление произвольного элемента за O(log n).
+
+    :param items: Начальные пары (элемент, ключ); элементы должны быть хешируемыми.
+    """
+
+    def __init__(self, items=()):
+        self._heap = []     # элементы в порядке кучи
+        self._keys = {}     # элемент -> ключ
+        self._positions = {}    # элемент -> позиция в self._heap
+        for item, key in items:
+            self._positions[item] = len(self._heap)
+            self._heap.append(item)
+            self._keys[item] = key
+        for position in reversed(range(len(self._heap) // 2)):
+            self._sift_down(position)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item):
+        return item in self._positions
+
+    def key(self, item):
+        return self._keys[item]
+
+    def peek(self):
+        """Элемент с минимальным ключом (без удаления)."""
+        return self._heap[0]
+
+    def push(self, item, key):
+        self._keys[item] = key
+        self._positions[item] = len(self._heap)
+        self._heap.append(item)
+        self._sift_up(len(self._heap) - 1)
+
+    def pop(self):
+        """Удаляет и возвращает элемент с минимальным ключом."""
+        item = self._heap[0]
+        self.remove(item)
+        return item
+
+    def remove(self, item):
+        position = self._positions.pop(item)
+        del self._keys[item]
+        last = self._heap.pop()
+        if position < len(self._heap):
+            self._heap[position] = last
+            self._positions[last] = position
+            self._sift_up(position)
+            self._sift_down(self._positions[last])
+
+    def update(self, item, key):
+        """Меняет ключ элемента (в любую сторону)."""
+        old_key = self._keys[item]
+        self._keys[item] = key
+        if key < old_key:
+            self._sift_up(self._positions[item])
+        else:
+            self._sift_down(self._positions[item])
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._positions[heap[i]] = i
+        self._positions[heap[j]] = j
+
+    def _sift_up(self, position):
+        heap, keys = self._heap, self._keys
+        while position > 0:
+            parent = (position - 1) // 2
+            if keys[heap[position]] < keys[heap[parent]]:
+                self._swap(position, parent)
+                position = parent
+            else:
+                break
+
+    def _sift_down(self, position):
+        heap, keys = self._heap, self._keys
+        size = len(heap)
+        while True:
+            smallest = position
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < size and keys[heap[child]] < keys[heap[smallest]]:
+                    smallest = child
+            if smallest == position:
+                break
+            self._swap(position, smallest)
+            position = smallest
+
+
+class MaxCapacityTree:
+    """
+    Дерево отрезков над нодами. В каждой вершине хранятся максимум веса и максимумы свободного
+    вычислительного ресурса и свободной сети в поддереве. Поддерживает точечное обновление
+    и поиск ноды с максимальным весом среди тех, что могут принять задачу, за O(log n)
+    в типичном случае (поддеревья без подходящих нод отсекаются целиком).
+
+    :param weights: Веса нод.
+    :param free_compute: Свободный вычислительный ресурс нод (в единицах сложности задачи).
+    :param free_network: Свободная сеть нод (байты).
+    """
+
+    def __init__(self, weights, free_compute, free_network):
+        self.n = len(weights)
+        self.size = 1
+        while self.size < max(self.n, 1):
+            self.size *= 2
+        self._weights = self._build(weights, -1.0)
+        self._free_compute = self._build(free_compute, float('-inf'))
+        self._free_network = self._build(free_network, float('-inf'))
+
+    def _build(self, values, padding) -> list:
+        tree = [padding] * (2 * self.size)
+        tree[self.size:self.size + self.n] = [float(value) for value in values]
+        for v in range(self.size - 1, 0, -1):
+            tree[v] = max(tree[2 * v], tree[2 * v + 1])
+        return tree
+
+    def update(self, index: int, weight: float, free_compute: float, free_network: float):
+        v = index + self.size
+        self._weights[v] = weight
+        self._free_compute[v] = free_compute
+        self._free_network[v] = free_network
+        v //= 2
+        while v:
+            self._weights[v] = max(self._weights[2 * v], self._weights[2 * v + 1])
+            self._free_compute[v] = max(self._free_compute[2 * v], self._free_compute[2 * v + 1])
+            self._free_network[v] = max(self._free_network[2 * v], self._free_network[2 * v + 1])
+            v //= 2
+
+    def append(self, weight: float, free_compute: float, free_network: float) -> int:
+        """
+        Добавляет ноду в конец за O(log n); если листья кончились, их число удваивается
+        (перестройка O(n) раз на удвоение, то есть амортизированно O(1) на ноду).
+
+        :return: Индекс новой ноды.
+        """
+        if self.n == self.size:
+            leaves = [tree[self.size:self.size + self.n]
+                      for tree in (self._weights, self._free_compute, self._free_network)]
+            self.size *= 2
+            self._weights = self._build(leaves[0], -1.0)
+            self._free_compute = self._build(leaves[1], float('-inf'))
+            self._free_network = self._build(leaves[2], float('-inf'))
+        self.n += 1
+        self.update(self.n - 1, weight, free_compute, free_network)
+        return self.n - 1
+
+    def swap_remove(self, index: int):
+        """Удаляет ноду index за O(log n): на её место встаёт последняя нода."""
+        last = self.n - 1
+        if index != last:
+            v = last + self.size
+            self.update(index, self._weights[v], self._free_compute[v], self._free_network[v])
+        self.update(last, -1.0, float('-inf'), float('-inf'))
+        self.n -= 1
+
+    def weight(self, index: int) -> float:
+        return self._weights[index + self.size]
+
+    def argmax(self, demand_compute: float, demand_network: float, accept) -> int:
+        """
+        Ищет ноду с максимальным положительным весом (при равенстве - с меньшим индексом),
+        которая может принять задачу. Свободные ресурсы в дереве служат только для отсечения,
+        окончательное решение по ноде принимает accept(index).
+
+        :param demand_compute: Вычислительная сложность задачи.
+        :param demand_network: Объем данных задачи (байты).
+        :param accept: Точная проверка ноды, accept(index) -> bool.
+        :return: Индекс ноды или -1.
+        """
+        weights, free_compute, free_network = self._weights, self._free_compute, self._free_network
+        size = self.size
+        best_weight, best_index = 0.0, -1
+        stack = [1]
+        while stack:
+            v = stack.pop()
+            weight = weights[v]
+            if weight < best_weight or free_compute[v] < demand_compute or free_network[v] < demand_network:
+                continue
+            level = v.bit_length() - 1
+            start = (v - (1 << level)) * (size >> level)
+            if weight == best_weight and (best_index == -1 or start > best_index):
+                continue
+            if v >= size:
+                if accept(v - size):
+                    best_weight, best_index = weight, v - size
+                continue
+            left, right = 2 * v, 2 * v + 1
+            # сначала обходим поддерево с большим весом, при равенстве - левое
+            if weights[right] > weights[left]:
+                stack.append(left)
+                stack.append(right)
+            else:
+                stack.append(right)
+                stack.append(left)
+        return best_index
+
+
+class HashRing:
+    """
+    Кольцо согласованного хэширования: точки (хэш, владелец) по возрастанию хэша, разбитые
+    на блоки не длиннее 2 * load (как в sortedcontainers). Вставка и удаление точки стоят
+    O(log n + load) вместо сдвига всего списка точек, поиск следующей по кольцу точки - O(log n).
+
+    :param points: Начальные пары (хэш, владелец).
+    :param load: Целевой размер блока.
+    """
+
+    def __init__(self, points=(), load: int = 1000):
+        self.load = load
+        points = sorted(points, key=lambda point: point[0])
+        self._hashes = [[point for point, _ in points[i:i + load]] for i in range(0, len(points), load)]
+        self._owners = [[owner for _, owner in points[i:i + load]] for i in range(0, len(points), load)]
+        self._maxes = [hashes[-1] for hashes in self._hashes]   # наибольший хэш каждого блока
+        self._len = len(points)
+
+    def __len__(self):
+        return self._len
+
+    def insert(self, point: int, owner):
+        if not self._maxes:
+            self._hashes.append([point])
+            self._owners.append([owner])
+            self._maxes.append(point)
+            self._len = 1
+            return
+        block = min(bisect.bisect_left(self._maxes, point), len(self._maxes) - 1)
+        hashes, owners = self._hashes[block], self._owners[block]
+        position = bisect.bisect_left(hashes, point)
+        hashes.insert(position, point)
+        owners.insert(position, owner)
+        self._maxes[block] = hashes[-1]
+        self._len += 1
+        if len(hashes) > 2 * self.load:
+            half = len(hashes) // 2
+            self._hashes.insert(block + 1, hashes[half:])
+            self._owners.insert(block + 1, owners[half:])
+            del hashes[half:], owners[half:]
+            self._maxes.insert(block, hashes[-1])
+
+    def remove(self, point: int, owner):
+        """Удаляет точку point владельца owner (среди точек с тем же хэшем ищется нужный владелец)."""
+        block = bisect.bisect_left(self._maxes, point)
+        position = bisect.bisect_left(self._hashes[block], point)
+        while self._owners[block][position] != owner:
+            position += 1
+            if position == len(self._owners[block]):
+                block, position = block + 1, 0
+        hashes, owners = self._hashes[block], self._owners[block]
+        del hashes[position], owners[position]
+        self._len -= 1
+        if hashes:
+            self._maxes[block] = hashes[-1]
+        else:
+            del self._hashes[block], self._owners[block], self._maxes[block]
+
+    def successor(self, point: int):
+        """Владелец первой по часовой стрелке точки с хэшем больше point."""
+        block = bisect.bisect_right(self._maxes, point)
+        if block == len(self._maxes):
+            return self._owners[0][0]
+        return self._owners[block][bisect.bisect_right(self._hashes[block], point)]
+
+    def walk(self, point: int):
+        """Владельцы всех точек по часовой стрелке (один оборот), начиная с successor(point)."""
+        blocks = len(self._maxes)
+        if not blocks:
+            return
+        block = bisect.bisect_right(self._maxes, point)
+        start = 0
+        if block < blocks:
+            start = bisect.bisect_right(self._hashes[block], point)
+        else:
+            block = 0
+        for step in range(blocks + 1):
+            owners = self._owners[(block + step) % blocks]
+            stop = len(owners) if step < blocks else start
+            for position in range(start if step == 0 else 0, stop):
+                yield owners[position]
+
+
+class LogHistogram:
+    """
+    Гистограмма с логарифмическими корзинами фиксированного размера (в духе HDR Histogram):
+    память не зависит от числа значений, относительная ошибка квантиля - не больше ширины корзины
+    (10 ** (1 / buckets_per_decade) - 1, около 2.3% при 100 корзинах на порядок).
+
+    Значения меньше lowest попадают в первую корзину, больше highest - в последнюю;
+    точные минимум и максимум хранятся отдельно.
+
+    :param lowest: Нижняя граница диапазона (> 0).
+    :param highest: Верхняя граница диапазона.
+    :param buckets_per_decade: Число корзин на порядок величины.
+    """
+
+    def __init__(self, lowest: float = 1e-8, highest: float = 10.0, buckets_per_decade: int = 100):
+        if not 0 < lowest < highest:
+            raise ValueError("Нужно 0 < lowest < highest")
+        self.lowest = lowest
+        self.highest = highest
+        self.buckets_per_decade = buckets_per_decade
+        self._log_lowest = math.log10(lowest)
+        self._last = math.ceil((math.log10(highest) - self._log_lowest) * buckets_per_decade)
+        self.counts = np.zeros(self._last + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+
+    def bucket(self, value: float) -> int:
+        """Номер корзины значения."""
+        if value <= self.lowest:
+            return 0
+        return min(int((math.log10(value) - self._log_lowest) * self.buckets_per_decade), self._last)
+
+    def upper_bound(self, bucket: int) -> float:
+        """Верхняя граница корзины."""
+        return 10 ** (self._log_lowest + (bucket + 1) / self.buckets_per_decade)
+
+    def record(self, value: float, count: int = 1):
+        """Добавляет значение count раз."""
+        self.counts[self.bucket(value)] += count
+        self.count += count
+        self.total += value * count
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def merge(self, other: 'LogHistogram'):
+        """Добавляет значения другой гистограммы с теми же параметрами."""
+        if (other.lowest, other.highest, other.buckets_per_decade) != (self.lowest, self.highest,
+                                                                       self.buckets_per_decade):
+            raise ValueError("Гистограммы с разными корзинами нельзя объединить")
+        self.counts += other.counts
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, p: float) -> float:
+        """
+        Оценка квантиля p (от 0 до 1): верхняя граница корзины, в которую он попадает,
+        ограниченная точными минимумом и максимумом.
+        """
+        if self.count == 0:
+            return float('nan')
+        rank = max(1, math.ceil(p * self.count))
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(max(self.upper_bound(bucket), self.minimum), self.maximum)
+
+    def summary(self, quantiles=(0.5, 0.9, 0.99, 0.999)) -> dict:
+        """Число значений, среднее, минимум, максимум и квантили (p50, p99, ...)."""
+        result = {'count': self.count, 'mean': self.mean,
+                  'min': self.minimum if self.count else 0.0,
+                  'max': self.maximum if self.count else 0.0}
+        for p in quantiles:
+            result[f"p{p * 100:g}"] = self.quantile(p)
+        return result
+
+    def buckets(self):
+        """Непустые корзины: (нижняя граница, верхняя граница, число значений)."""
+        for bucket in np.flatnonzero(self.counts).tolist():
+            lower = self.lowest if bucket == 0 else self.upper_bound(bucket - 1)
+            yield lower, self.upper_bound(bucket), int(self.counts[bucket])
@@ -0,0 +1,119 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from distributor import (RoundRobin, WeightedRoundRobin, WeightedRoundRobinStatic, LeastConnection,
+                         LeastConnectionHeap, WeightedLeastConnection, PowerOfDChoices, ConsistentHash)
+from result_cache import job_key
+from server_pool import ServerPool
+from simulation import run_simulation
+
+# распределители доступны по имени класса, чтобы задание можно было передать в другой процесс
+DISTRIBUTORS = {distributor_class.__name__: distributor_class
+                for distributor_class in (RoundRobin, WeightedRoundRobin, WeightedRoundRobinStatic,
+                                          LeastConnection, LeastConnectionHeap, WeightedLeastConnection,
+                                          PowerOfDChoices, ConsistentHash)}
+
+
+def server_specs(servers) -> tuple:
+    """Параметры серверов (server_id, bu_power, bandwidth_bytes) без их состояния."""
+    return tuple((server.server_id, server.bu_power, server.bandwidth_bytes) for server in servers)
+
+
+def build_pool(specs, horizon: int = 0, precision: str = 'double', exact: bool = False) -> ServerPool:
+    """Создаёт новый пул серверов по параметрам из server_specs."""
+    server_ids, bu_power, bandwidth_bytes = zip(*specs)
+    return ServerPool(bu_power=bu_power, bandwidth_bytes=bandwidth_bytes, server_ids=server_ids,
+                      horizon=horizon, precision=precision, exact=exact)
+
+
+def make_jobs(configurations: dict, tasks_frequency: dict, distributor_names: list,
+              task_time: float, task_size: float, simulation_time: int, fast_forward: bool = True,
+              precision: str = 'double', exact: bool = False) -> list:
+    """
+    Задания перебора: конфигурация x частота прихода задач x распределитель.
+
+    :param configurations: Номер конфигурации -> список серверов.
+    :param tasks_frequency: Номер конфигурации -> частоты прихода задач (задач в секунду).
+    :param distributor_names: Имена классов распределителей (ключи DISTRIBUTORS).
+    :param precision: Точность историй пула ('double' или 'single').
+    :param exact: Точный целочисленный учёт нагрузки в пуле (см. ServerPool).
+    :return: Список заданий в порядке перебора.
+    """
+    jobs = []
+    for config, servers in configurations.items():
+        specs = server_specs(servers)
+        for tasks_per_second in tasks_frequency[config]:
+            for distributor_name in distributor_names:
+                jobs.append({'config': config,
+                             'tasks_per_second': tasks_per_second,
+                             'distributor': distributor_name,
+                             'servers': specs,
+                             'task_time': task_time,
+                             'task_size': task_size,
+                             'simulation_time': simulation_time,
+                             'fast_forward': fast_forward,
+                             'precision': precision,
+                             'exact': exact})
+    return jobs
+
+
+def run_job(job: dict) -> dict:
+    """
+    Выполняет одно задание на собственном пуле серверов.
+
+    :param job: Задание из make_jobs.
+    :return: Задание, серверы с результатами (node.Server), число отклонённых задач и сведения о прогоне.
+    """
+    pool = build_pool(job['servers'], job['simulation_time'], job['precision'], job['exact'])
+    distributor = DISTRIBUTORS[job['distributor']](pool)
+    tasks_per_second = job['tasks_per_second']
+    info = run_simulation(distributor, pool,
+                          [job['task_time']] * tasks_per_second, [job['task_size']] * tasks_per_second,
+                          job['simulation_time'], fast_forward=job['fast_forward'])
+    return {'job': job,
+            'servers': pool.to_servers(),
+            'rejected_tasks': distributor.rejected_tasks,
+            'simulated_seconds': info['simulated_seconds'],
+            'period': info['period']}
+
+
+def run_sweep(jobs: list, workers: int = None, cache=None) -> list:
+    """
+    Выполняет задания параллельно в отдельных процессах.
+
+    Каждое задание строит свой пул, поэтому задания не зависят друг от друга и от порядка выполнения.
+    Результаты возвращаются в порядке заданий, независимо от того, какой процесс закончил раньше.
+    Если передан кэш, ячейки с уже посчитанным ключом загружаются с диска, а не симулируются заново.
+
+    :param jobs: Задания из make_jobs.
+    :param workers: Число процессов; по умолчанию - число ядер, 1 - выполнить в текущем процессе.
+    :param cache: result_cache.ResultCache или None - считать всё заново.
+    :return: Результаты run_job в порядке jobs; поле cached показывает, взят ли результат из кэша.
+    """
+    results = [None] * len(jobs)
+    keys = [None] * len(jobs)
+    if cache is not None:
+        for index, job in enumerate(jobs):
+            keys[index] = job_key(job, DISTRIBUTORS[job['distributor']])
+            cached = cache.load(keys[index])
+            if cached is not None:
+                results[index] = dict(cached, job=job, cached=True)
+    missing = [index for index, result in enumerate(results) if result is None]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(missing))
+    if workers <= 1:
+        computed = [run_job(jobs[index]) for index in missing]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            computed = list(executor.map(run_job, [jobs[index] for index in missing]))
+
+    for index, result in zip(missing, computed):
+        result['cached'] = False
+        results[index] = result
+        if cache is not None:
+            cache.store(keys[index], result)
+    if cache is not None:
+        cache.evict()
+    return results
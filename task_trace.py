@@ -0,0 +1,172 @@
+import csv
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+# Формат трассы (.trace), все числа little-endian:
+#   заголовок HEADER_DTYPE (64 байта);
+#   offsets   int64[seconds + 1] - номер первой задачи каждой секунды (и общее число задач в конце);
+#   timestamp float64[count]     - моменты прихода задач (секунды), не убывают;
+#   compute   float64[count]     - вычислительная сложность задач;
+#   size      float64[count]     - объемы данных задач (байты).
+# Столбцы хранятся подряд, поэтому задачи одной секунды - непрерывные срезы каждого столбца.
+MAGIC = b'AACTRACE'
+VERSION = 1
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('reserved', '<u4'),
+                         ('count', '<u8'), ('seconds', '<u8'), ('start_time', '<f8'),
+                         ('padding', 'V24')])
+COLUMNS = ('timestamp', 'compute', 'size')
+
+
+class TraceWriter:
+    """
+    Потоковая запись трассы: задачи добавляются порциями (в порядке времени прихода),
+    столбцы пишутся во временные файлы и собираются в один файл при close().
+    Память ограничена размером порции.
+
+    :param filename: Имя файла трассы.
+    :param start_time: Начало секунды 0; по умолчанию - время прихода первой задачи.
+    """
+
+    def __init__(self, filename: str, start_time: float = None):
+        self.filename = filename
+        self.start_time = start_time
+        self.count = 0
+        self._seconds = []      # число задач по секундам
+        self._last_timestamp = -np.inf
+        folder = os.path.dirname(os.path.abspath(filename))
+        self._columns = {name: tempfile.TemporaryFile(dir=folder) for name in COLUMNS}
+
+    def append(self, timestamps, compute, sizes):
+        """Добавляет порцию задач (время прихода не должно убывать)."""
+        timestamps = np.asarray(timestamps, dtype='<f8')
+        if len(timestamps) == 0:
+            return
+        if timestamps[0] < self._last_timestamp or (np.diff(timestamps) < 0).any():
+            raise ValueError("Время прихода задач в трассе должно не убывать")
+        if self.start_time is None:
+            self.start_time = float(timestamps[0])
+        if timestamps[0] < self.start_time:
+            raise ValueError("Задача пришла раньше start_time")
+        self._last_timestamp = timestamps[-1]
+
+        seconds = np.floor(timestamps - self.start_time).astype(np.int64)
+        counts = np.bincount(seconds)
+        if len(counts) > len(self._seconds):
+            self._seconds.extend([0] * (len(counts) - len(self._seconds)))
+        for second in np.flatnonzero(counts).tolist():
+            self._seconds[second] += int(counts[second])
+
+        for name, values in zip(COLUMNS, (timestamps, compute, sizes)):
+            values = np.broadcast_to(np.asarray(values, dtype='<f8'), timestamps.shape)
+            self._columns[name].write(np.ascontiguousarray(values).tobytes())
+        self.count += len(timestamps)
+
+    def close(self):
+        """Записывает файл трассы и удаляет временные файлы."""
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = MAGIC
+        header['version'] = VERSION
+        header['count'] = self.count
+        header['seconds'] = len(self._seconds)
+        header['start_time'] = 0.0 if self.start_time is None else self.start_time
+        offsets = np.concatenate(([0], np.cumsum(self._seconds, dtype=np.int64))).astype('<i8')
+        with open(self.filename, 'wb') as file:
+            file.write(header.tobytes())
+            file.write(offsets.tobytes())
+            for name in COLUMNS:
+                column = self._columns[name]
+                column.seek(0)
+                shutil.copyfileobj(column, file)
+                column.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            for column in self._columns.values():
+                column.close()
+
+
+def convert_csv_to_trace(csv_file: str, trace_file: str, timestamp_column: str = 'timestamp',
+                         compute_column: str = 'compute_time', size_column: str = 'data_size',
+                         chunk_rows: int = 1_000_000, delimiter: str = ',', start_time: float = None) -> int:
+    """
+    Переводит CSV-лог балансировщика (с заголовком, строки в порядке времени прихода) в трассу.
+    Файл читается порциями по chunk_rows строк.
+
+    :param start_time: Начало секунды 0; по умолчанию - время прихода первой задачи.
+
+    :return: Число задач в трассе.
+    """
+    with open(csv_file, newline='') as file, TraceWriter(trace_file, start_time) as writer:
+        reader = csv.reader(file, delimiter=delimiter)
+        header = next(reader)
+        columns = [header.index(name) for name in (timestamp_column, compute_column, size_column)]
+        rows = []
+        for row in reader:
+            rows.append([row[column] for column in columns])
+            if len(rows) == chunk_rows:
+                values = np.array(rows, dtype=np.float64)
+                writer.append(values[:, 0], values[:, 1], values[:, 2])
+                rows = []
+        if rows:
+            values = np.array(rows, dtype=np.float64)
+            writer.append(values[:, 0], values[:, 1], values[:, 2])
+        return writer.count
+
+
+class Trace:
+    """
+    Трасса, отображённая в память (np.memmap): открывается мгновенно и не читается целиком,
+    задачи секунды выдаются представлениями столбцов без копирования.
+
+    Итерация выдает (секунда, сложности, объемы) - как workload.Workload, поэтому трассу можно
+    передать в simulation.run_workload; arrivals_stream() - порции для EventSimulation.
+
+    :param filename: Имя файла трассы.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        header = np.fromfile(filename, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header['magic'][0] != MAGIC:
+            raise ValueError(f"'{filename}' не является файлом трассы")
+        if header['version'][0] != VERSION:
+            raise ValueError(f"Неподдерживаемая версия трассы: {header['version'][0]}")
+        self.count = int(header['count'][0])
+        self.ticks = int(header['seconds'][0])
+        self.start_time = float(header['start_time'][0])
+
+        offset = HEADER_DTYPE.itemsize
+        self.offsets = np.memmap(filename, dtype='<i8', mode='r', offset=offset, shape=(self.ticks + 1,))
+        offset += self.offsets.nbytes
+        self.columns = {}
+        for name in COLUMNS:
+            self.columns[name] = (np.memmap(filename, dtype='<f8', mode='r', offset=offset, shape=(self.count,))
+                                  if self.count else np.zeros(0))
+            offset += 8 * self.count
+
+    def __len__(self):
+        return self.count
+
+    def second(self, second: int):
+        """Задачи секунды: (моменты прихода, сложности, объемы) - представления без копирования."""
+        start, stop = int(self.offsets[second]), int(self.offsets[second + 1])
+        return tuple(self.columns[name][start:stop] for name in COLUMNS)
+
+    def __iter__(self):
+        for second in range(self.ticks):
+            _, compute, sizes = self.second(second)
+            yield second, compute, sizes
+
+    def arrivals_stream(self):
+        """Порции (моменты прихода от start_time, сложности, объемы) по секундам для EventSimulation.run."""
+        for second in range(self.ticks):
+            timestamps, compute, sizes = self.second(second)
+            yield timestamps - self.start_time, compute, sizes
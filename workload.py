@@ -0,0 +1,259 @@
+import numpy as np
+
+# смесь задач 6 : 3 : 1 по времени выполнения (main_cycle.py): (сложность, доля в паттерне)
+MIX_6_3_1 = ((0.02, 6), (0.1, 3), (0.28, 1))
+
+
+class ConstantArrivals:
+    """Ровно rate задач каждый такт (как фиксированный tasks_per_second в main.py)."""
+
+    def __init__(self, rate: int):
+        self.rate = int(rate)
+
+    def counts(self, ticks: int, rng: np.random.Generator) -> np.ndarray:
+        return np.full(ticks, self.rate, dtype=np.int64)
+
+
+class PoissonArrivals:
+    """Пуассоновский поток: число задач за такт ~ Poisson(rate)."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+
+    def counts(self, ticks: int, rng: np.random.Generator) -> np.ndarray:
+        return rng.poisson(self.rate, ticks)
+
+
+class DiurnalArrivals:
+    """
+    Суточный профиль: пуассоновский поток с интенсивностью
+    mean_rate * (1 + amplitude * sin(2 pi * tick / period + phase)).
+
+    :param mean_rate: Средняя интенсивность (задач за такт).
+    :param amplitude: Относительный размах колебаний (от 0 до 1).
+    :param period: Период в тактах (по умолчанию сутки в секундах).
+    :param phase: Сдвиг фазы (радианы).
+    """
+
+    def __init__(self, mean_rate: float, amplitude: float = 0.5, period: int = 24 * 3600, phase: float = 0.0):
+        self.mean_rate = mean_rate
+        self.amplitude = amplitude
+        self.period = period
+        self.phase = phase
+        self._tick = 0
+
+    def counts(self, ticks: int, rng: np.random.Generator) -> np.ndarray:
+        t = self._tick + np.arange(ticks)
+        self._tick += ticks
+        rate = self.mean_rate * (1 + self.amplitude * np.sin(2 * np.pi * t / self.period + self.phase))
+        return rng.poisson(np.maximum(rate, 0.0))
+
+    def reset(self):
+        self._tick = 0
+
+
+class MMPPArrivals:
+    """
+    Всплески (MMPP - пуассоновский поток, модулированный марковской цепью) с шагом в один такт:
+    в каждом такте поток находится в одном из состояний со своей интенсивностью и покидает его
+    с вероятностью 1 / mean_durations[state], переходя в другое состояние с вероятностями transitions.
+
+    :param rates: Интенсивности состояний (задач за такт), например (200, 2000) - фон и всплеск.
+    :param mean_durations: Средняя длительность пребывания в каждом состоянии (тактов).
+    :param transitions: Матрица переходов при смене состояния (диагональ не используется);
+        по умолчанию - равновероятный переход в любое другое состояние.
+    """
+
+    def __init__(self, rates, mean_durations, transitions=None):
+        self.rates = np.asarray(rates, dtype=np.float64)
+        self.mean_durations = np.asarray(mean_durations, dtype=np.float64)
+        k = len(self.rates)
+        if transitions is None:
+            transitions = np.ones((k, k)) - np.eye(k)
+        transitions = np.array(transitions, dtype=np.float64)
+        np.fill_diagonal(transitions, 0.0)
+        self.transitions = transitions / np.maximum(transitions.sum(axis=1, keepdims=True), 1e-300)
+        self.state = 0
+
+    def counts(self, ticks: int, rng: np.random.Generator) -> np.ndarray:
+        states = np.empty(ticks, dtype=np.int64)
+        leave = rng.random(ticks)
+        choice = rng.random(ticks)
+        state = self.state
+        cumulative = np.cumsum(self.transitions, axis=1)
+        for tick in range(ticks):
+            states[tick] = state
+            if len(self.rates) > 1 and leave[tick] < 1 / self.mean_durations[state]:
+                state = min(int(np.searchsorted(cumulative[state], choice[tick], side='right')), len(self.rates) - 1)
+        self.state = state
+        return rng.poisson(self.rates[states])
+
+    def reset(self):
+        self.state = 0
+
+
+class FixedTasks:
+    """Все задачи одинаковы: сложность task_time и объем task_size."""
+
+    def __init__(self, task_time: float, task_size: float):
+        self.task_time = task_time
+        self.task_size = task_size
+
+    def generate(self, count: int, offset: int, rng: np.random.Generator):
+        return np.full(count, self.task_time), np.full(count, float(self.task_size))
+
+
+class PatternTasks:
+    """
+    Задачи по повторяющемуся паттерну сложностей, который начинается заново в каждом такте
+    (как generate_repeating_task_list в main_cycle.py).
+
+    :param mix: Пары (сложность, сколько раз подряд), по умолчанию 6 : 3 : 1.
+    :param task_size: Объем данных каждой задачи (байты).
+    """
+
+    def __init__(self, mix=MIX_6_3_1, task_size: float = 500):
+        self.pattern = np.repeat([time for time, _ in mix], [repeat for _, repeat in mix]).astype(np.float64)
+        self.task_size = task_size
+
+    def generate(self, count: int, offset: int, rng: np.random.Generator):
+        times = self.pattern[(offset + np.arange(count)) % len(self.pattern)]
+        return times, np.full(count, float(self.task_size))
+
+
+class HeavyTailedTasks:
+    """
+    Сложность и объем данных задач с тяжёлым хвостом: распределение Парето (тип I)
+    с заданными средним и показателем хвоста alpha (> 1; чем меньше, тем тяжелее хвост).
+
+    :param mean_time: Средняя сложность задачи.
+    :param mean_size: Средний объем данных (байты).
+    :param time_alpha: Показатель хвоста сложности.
+    :param size_alpha: Показатель хвоста объема.
+    :param max_time: Ограничение сложности сверху (None - без ограничения).
+    :param max_size: Ограничение объема сверху (None - без ограничения).
+    """
+
+    def __init__(self, mean_time: float, mean_size: float, time_alpha: float = 1.5, size_alpha: float = 1.2,
+                 max_time: float = None, max_size: float = None):
+        if time_alpha <= 1 or size_alpha <= 1:
+            raise ValueError("Для конечного среднего нужно alpha > 1")
+        self.time_scale = mean_time * (time_alpha - 1) / time_alpha
+        self.size_scale = mean_size * (size_alpha - 1) / size_alpha
+        self.time_alpha = time_alpha
+        self.size_alpha = size_alpha
+        self.max_time = max_time
+        self.max_size = max_size
+
+    def generate(self, count: int, offset: int, rng: np.random.Generator):
+        times = self.time_scale * (1 + rng.pareto(self.time_alpha, count))
+        sizes = self.size_scale * (1 + rng.pareto(self.size_alpha, count))
+        if self.max_time is not None:
+            np.minimum(times, self.max_time, out=times)
+        if self.max_size is not None:
+            np.minimum(sizes, self.max_size, out=sizes)
+        return times, sizes
+
+
+class Workload:
+    """
+    Поток задач: процесс прихода (сколько задач в такт) и генератор задач (их сложность и объем).
+
+    Итерация выдает порции (такт, сложности, объемы) в виде массивов NumPy; задачи такта
+    выдаются порциями не больше chunk_size, поэтому память ограничена размером порции,
+    а не общим числом задач. Каждый проход начинается с генератора np.random.default_rng(seed),
+    так что при одном seed поток повторяется.
+
+    :param arrivals: Процесс прихода (ConstantArrivals, PoissonArrivals, DiurnalArrivals, MMPPArrivals).
+    :param tasks: Генератор задач (FixedTasks, PatternTasks, HeavyTailedTasks).
+    :param ticks: Число тактов (секунд).
+    :param seed: Зерно генератора.
+    :param chunk_size: Наибольший размер порции.
+    :param counts_block: Сколько тактов процесса прихода генерировать за раз.
+    """
+
+    def __init__(self, arrivals, tasks, ticks: int, seed=None, chunk_size: int = 65536, counts_block: int = 1024):
+        self.arrivals = arrivals
+        self.tasks = tasks
+        self.ticks = ticks
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.counts_block = counts_block
+
+    def __iter__(self):
+        for tick, _, task_times, task_sizes in self._chunks():
+            yield tick, task_times, task_sizes
+
+    def _chunks(self):
+        """Порции (такт, число задач такта, сложности, объемы)."""
+        rng = np.random.default_rng(self.seed)
+        if hasattr(self.arrivals, 'reset'):
+            self.arrivals.reset()
+        for block_start in range(0, self.ticks, self.counts_block):
+            counts = self.arrivals.counts(min(self.counts_block, self.ticks - block_start), rng)
+            for tick, count in enumerate(counts.tolist(), start=block_start):
+                for offset in range(0, count, self.chunk_size):
+                    task_times, task_sizes = self.tasks.generate(min(self.chunk_size, count - offset), offset, rng)
+                    yield tick, count, task_times, task_sizes
+                if count == 0:
+                    yield tick, 0, np.zeros(0), np.zeros(0)
+
+    def arrivals_stream(self):
+        """
+        Порции (моменты прихода, сложности, объемы) для event_simulation.EventSimulation.run:
+        задачи такта приходят в равномерно распределённые моменты внутри такта
+        (для пуассоновского потока это точное распределение моментов прихода).
+
+        Моменты не убывают в пределах всего такта, даже если он разбит на несколько порций:
+        они строятся по порядку как последовательные минимумы оставшихся равномерных величин
+        (минимум k величин на [a, 1] равен 1 - (1 - a) * V ** (1 / k), V ~ U(0, 1]),
+        поэтому память, как и для задач, ограничена размером порции.
+        """
+        rng = np.random.default_rng(None if self.seed is None else [self.seed, 1])
+        current_tick = None
+        remaining = 0
+        log_gap = 0.0   # log(1 - последний выданный момент такта)
+        for tick, count, task_times, task_sizes in self._chunks():
+            if tick != current_tick:
+                current_tick, remaining, log_gap = tick, count, 0.0
+            size = len(task_times)
+            steps = log_gap + np.cumsum(np.log1p(-rng.random(size)) / (remaining - np.arange(size)))
+            if size:
+                log_gap = float(steps[-1])
+            remaining -= size
+            yield tick - np.expm1(steps), task_times, task_sizes
+
+
+def constant(tasks_per_second: int, task_time: float, task_size: float, ticks: int, **options) -> Workload:
+    """Одинаковые задачи с постоянной частотой (как main.py)."""
+    return Workload(ConstantArrivals(tasks_per_second), FixedTasks(task_time, task_size), ticks, **options)
+
+
+def mix_6_3_1(tasks_per_second: int, task_size: float, ticks: int, **options) -> Workload:
+    """Постоянная частота, сложности по паттерну 6 : 3 : 1 (0.02, 0.1, 0.28)."""
+    return Workload(ConstantArrivals(tasks_per_second), PatternTasks(MIX_6_3_1, task_size), ticks, **options)
+
+
+def poisson(rate: float, task_time: float, task_size: float, ticks: int, **options) -> Workload:
+    """Одинаковые задачи пуассоновским потоком."""
+    return Workload(PoissonArrivals(rate), FixedTasks(task_time, task_size), ticks, **options)
+
+
+def diurnal(mean_rate: float, task_time: float, task_size: float, ticks: int, amplitude: float = 0.5,
+            period: int = 24 * 3600, **options) -> Workload:
+    """Одинаковые задачи с суточным профилем интенсивности."""
+    return Workload(DiurnalArrivals(mean_rate, amplitude, period), FixedTasks(task_time, task_size), ticks, **options)
+
+
+def bursty(base_rate: float, burst_rate: float, task_time: float, task_size: float, ticks: int,
+           base_duration: float = 60, burst_duration: float = 5, **options) -> Workload:
+    """Одинаковые задачи потоком со всплесками (MMPP с двумя состояниями)."""
+    return Workload(MMPPArrivals((base_rate, burst_rate), (base_duration, burst_duration)),
+                    FixedTasks(task_time, task_size), ticks, **options)
+
+
+def heavy_tailed(rate: float, mean_time: float, mean_size: float, ticks: int, time_alpha: float = 1.5,
+                 size_alpha: float = 1.2, **options) -> Workload:
+    """Пуассоновский поток задач со сложностью и объемом с тяжёлым хвостом."""
+    return Workload(PoissonArrivals(rate), HeavyTailedTasks(mean_time, mean_size, time_alpha, size_alpha),
+                    ticks, **options)